@@ -1,6 +1,48 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate, pre_delete
 
 
 class PlanetariumConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "planetarium"
+
+    def ready(self):
+        from planetarium.daily_schedule import connect_schedule_signals
+        from planetarium.models import (
+            remember_reservation_tickets,
+            subtract_deleted_ticket,
+            subtract_reservation_tickets,
+            tickets_sold_changed
+        )
+        from planetarium.search import create_trigram_indexes
+        from planetarium.timing import connect_timing
+        from planetarium.versions import connect_version_signals
+
+        post_migrate.connect(create_trigram_indexes, sender=self)
+        post_delete.connect(
+            subtract_deleted_ticket,
+            sender=self.get_model("Ticket"),
+            dispatch_uid="planetarium:ticket:post_delete"
+        )
+        pre_delete.connect(
+            remember_reservation_tickets,
+            sender=self.get_model("Reservation"),
+            dispatch_uid="planetarium:reservation:pre_delete"
+        )
+        post_delete.connect(
+            subtract_reservation_tickets,
+            sender=self.get_model("Reservation"),
+            dispatch_uid="planetarium:reservation:post_delete"
+        )
+        connect_version_signals(
+            (
+                self.get_model("AstronomyShow"),
+                self.get_model("ShowTheme"),
+                self.get_model("ShowSpeaker"),
+                self.get_model("PlanetariumDome"),
+                self.get_model("ShowSession"),
+            ),
+            tickets_sold_changed
+        )
+        connect_schedule_signals(tickets_sold_changed)
+        connect_timing()
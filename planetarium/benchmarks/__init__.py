@@ -0,0 +1,82 @@
+"""
+Benchmarks of planetarium hot paths.
+
+Every benchmark is a function registered with @benchmark decorator,
+it gets number of repeats and returns list of results.
+All benchmarks run inside transaction which is rolled back at the end,
+so they can be run against any database:
+
+    python manage.py run_benchmarks [name ...] [--output results.json]
+
+Results saved with --output can be compared with results of other
+commit with --compare to find regressions.
+"""
+
+import statistics
+import time
+import tracemalloc
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Decorator to register benchmark function under given name"""
+    def register(function):
+        BENCHMARKS[name] = function
+        return function
+    return register
+
+
+def measure(case, function, repeat, setup=None):
+    """
+    Function to run function given number of times
+    and collect its timing and number of queries.
+    Setup is called before every run and isn't measured,
+    its result is passed to the function.
+    Peak memory is measured by one more run, tracing of allocations
+    slows code down, so it isn't traced while timing is measured.
+    """
+    timings = []
+    queries = 0
+
+    for _ in range(repeat):
+        argument = setup() if setup else None
+        # Log of queries is limited, full log isn't counted
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            function(argument)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries = len(captured)
+
+    argument = setup() if setup else None
+    tracemalloc.start()
+    try:
+        function(argument)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "case": case,
+        "repeat": repeat,
+        "p50_ms": round(statistics.median(timings), 3),
+        "p99_ms": round(timings[min(len(timings) - 1,
+                                    int(len(timings) * 0.99))], 3),
+        "queries": queries,
+        "peak_kb": round(peak_memory / 1024, 1),
+    }
+
+
+from planetarium.benchmarks import (  # noqa: E402,F401
+    endpoints,
+    list_serializers,
+    renderers,
+    reservations,
+    seat_allocation,
+    server_timing
+)
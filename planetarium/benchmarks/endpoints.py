@@ -0,0 +1,452 @@
+"""
+Benchmark of every action of planetarium and user API.
+
+Requests go through test clients with JWT of admin (of regular user
+for user endpoints), so authentication, permissions, views, serializers
+and rendering are measured without network. Data of the database is used
+as it is, when no tickets are sold yet, small data set is seeded
+(run with --scale to seed realistic volumes, look at planetarium.seeding).
+Catalog lists are served from response cache after the first run,
+the same as in production. Objects which are changed or deleted
+by cases are created by benchmark itself.
+
+Reservations can't be updated (nested tickets aren't writable),
+so only their list, retrieve, create and destroy are measured.
+Throttling is switched off, it's not what is measured.
+"""
+
+import datetime
+import io
+import itertools
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from planetarium.benchmarks import benchmark, measure
+from planetarium.booking import book_tickets
+from planetarium.holds import get_hold, hold_seats, release_hold
+from planetarium.models import (
+    AstronomyShow,
+    PlanetariumDome,
+    Reservation,
+    ShowSession,
+    ShowSpeaker,
+    ShowTheme,
+    Ticket
+)
+from planetarium.seeding import seed
+
+SMALL_SCALE = 0.01
+PASSWORD = "benchmark"
+FIRST_DAY = datetime.date(2100, 1, 1)
+
+
+def _url(name, *args):
+    return reverse(name, args=args)
+
+
+def _check(case, response, status_code):
+    """Function to stop benchmark which measures error responses"""
+    if response.status_code != status_code:
+        raise AssertionError(
+            f"{case}: expected {status_code}, got {response.status_code} "
+            f"{response.content[:300]!r}"
+        )
+    return response
+
+
+def _poster():
+    content = io.BytesIO()
+    Image.new("RGB", (800, 1200), "navy").save(content, "JPEG")
+    return SimpleUploadedFile(
+        "poster.jpg", content.getvalue(), content_type="image/jpeg"
+    )
+
+
+def _client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}"
+    )
+    return client
+
+
+class EndpointsBenchmark:
+
+    """
+    Cases of endpoints benchmark with objects they need.
+    Every case is measured by `request`, its url and data
+    are either values or functions of setup result.
+    """
+
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.results = []
+        self.numbers = itertools.count()
+
+        if not Ticket.objects.exists():
+            seed(SMALL_SCALE)
+        ticket = Ticket.objects.select_related(
+            "reservation",
+            "show_session__astronomy_show",
+            "show_session__planetarium_dome"
+        ).order_by("-id").first()
+        self.reservation = ticket.reservation
+        self.show_session = ticket.show_session
+        self.astronomy_show = ticket.show_session.astronomy_show
+        self.show_theme = ShowTheme.objects.order_by("-id").first()
+
+        self.admin = get_user_model().objects.create_superuser(
+            "benchmark-admin@benchmark.com", PASSWORD
+        )
+        self.user = get_user_model().objects.create_user(
+            "benchmark-user@benchmark.com", PASSWORD
+        )
+        self.admin_client = _client(self.admin)
+        self.user_client = _client(self.user)
+
+        self.planetarium_dome = PlanetariumDome.objects.create(
+            name="Benchmark dome", rows=30, seats_in_row=40
+        )
+        self.show_speaker = ShowSpeaker.objects.create(
+            first_name="Benchmark", last_name="Speaker", profession="Benchmark"
+        )
+        self.seats = self.iterate_seats()
+
+    def number(self):
+        return next(self.numbers)
+
+    def create_show_session(self):
+        """Function to create session of benchmark speaker on new day"""
+        show_session = ShowSession.objects.create(
+            astronomy_show=self.astronomy_show,
+            planetarium_dome=self.planetarium_dome,
+            show_day=FIRST_DAY + datetime.timedelta(days=self.number()),
+            time_start="10:00:00",
+            time_end="11:30:00"
+        )
+        show_session.show_speakers.add(self.show_speaker)
+        return ShowSession.objects.select_related("planetarium_dome").get(
+            pk=show_session.pk
+        )
+
+    def iterate_seats(self):
+        """Function to give free seats, every dome of them is new session"""
+        while True:
+            show_session = self.create_show_session()
+            for row in range(1, self.planetarium_dome.rows + 1):
+                for seat in range(1, self.planetarium_dome.seats_in_row + 1):
+                    yield show_session, row, seat
+
+    def request(
+            self,
+            case,
+            method,
+            url,
+            status_code,
+            data=None,
+            setup=None,
+            client=None,
+            format="json"
+    ):
+        client = client or self.admin_client
+        extra = {} if method == "get" else {"format": format}
+
+        def run(argument):
+            return _check(
+                case,
+                getattr(client, method)(
+                    url(argument) if callable(url) else url,
+                    data(argument) if callable(data) else data,
+                    **extra
+                ),
+                status_code
+            )
+
+        self.results.append(measure(case, run, self.repeat, setup=setup))
+
+    def request_model(self, prefix, url_name, instance, create, payload):
+        """
+        Function to measure all actions of model viewset.
+        create() returns new instance, payload(number) data for it.
+        """
+        list_url = _url(f"planetarium:{url_name}-list")
+        detail_url = _url(f"planetarium:{url_name}-detail", instance.pk)
+
+        self.request(f"{prefix}.list", "get", list_url, 200)
+        self.request(f"{prefix}.retrieve", "get", detail_url, 200)
+        self.request(
+            f"{prefix}.create", "post", list_url, 201,
+            data=payload, setup=self.number
+        )
+        updated = create()
+        updated_url = _url(f"planetarium:{url_name}-detail", updated.pk)
+        self.request(
+            f"{prefix}.update", "put", updated_url, 200,
+            data=payload, setup=self.number
+        )
+        self.request(
+            f"{prefix}.partial_update", "patch", updated_url, 200,
+            data=payload, setup=self.number
+        )
+        self.request(
+            f"{prefix}.destroy", "delete",
+            lambda pk: _url(f"planetarium:{url_name}-detail", pk), 204,
+            setup=lambda: create().pk
+        )
+
+    def catalog(self):
+        self.request_model(
+            "planetarium_domes",
+            "planetariumdome",
+            self.show_session.planetarium_dome,
+            lambda: PlanetariumDome.objects.create(
+                name=f"Benchmark dome {self.number()}",
+                rows=10,
+                seats_in_row=10
+            ),
+            lambda number: {
+                "name": f"Benchmark dome {number}",
+                "rows": 10,
+                "seats_in_row": 10
+            }
+        )
+        self.request_model(
+            "show_themes",
+            "showtheme",
+            self.show_theme,
+            lambda: ShowTheme.objects.create(
+                name=f"Benchmark theme {self.number()}"
+            ),
+            lambda number: {"name": f"Benchmark theme {number}"}
+        )
+        self.request_model(
+            "show_speakers",
+            "showspeaker",
+            self.show_speaker,
+            lambda: ShowSpeaker.objects.create(
+                first_name="Benchmark",
+                last_name=f"Speaker {self.number()}",
+                profession="Benchmark"
+            ),
+            lambda number: {
+                "first_name": "Benchmark",
+                "last_name": f"Speaker {number}",
+                "profession": "Benchmark"
+            }
+        )
+        self.request_model(
+            "astronomy_shows",
+            "astronomyshow",
+            self.astronomy_show,
+            lambda: AstronomyShow.objects.create(
+                title=f"Benchmark show {self.number()}",
+                description="Benchmark"
+            ),
+            lambda number: {
+                "title": f"Benchmark show {number}",
+                "show_themes": [self.show_theme.name],
+                "poster": None
+            }
+        )
+        with tempfile.TemporaryDirectory() as media_root, \
+                override_settings(MEDIA_ROOT=media_root):
+            self.request(
+                "astronomy_shows.upload_poster",
+                "post",
+                _url(
+                    "planetarium:astronomyshow-upload-poster",
+                    self.astronomy_show.pk
+                ),
+                200,
+                data=lambda poster: {"poster": poster},
+                setup=_poster,
+                format="multipart"
+            )
+        self.request(
+            "search.list", "get",
+            _url("planetarium:search-list") + "?q=Nebula", 200
+        )
+        self.request(
+            "cache_stats", "get", _url("planetarium:cache-stats"), 200
+        )
+
+    def show_sessions(self):
+        def payload(number):
+            return {
+                "astronomy_show": self.astronomy_show.title,
+                "planetarium_dome": self.planetarium_dome.name,
+                "show_speakers": [self.show_speaker.id],
+                "show_day": FIRST_DAY + datetime.timedelta(days=number),
+                "time_start": "10:00:00",
+                "time_end": "11:30:00",
+            }
+
+        self.request_model(
+            "show_sessions",
+            "showsession",
+            self.show_session,
+            self.create_show_session,
+            payload
+        )
+        self.request(
+            "show_sessions.list[keyset]", "get",
+            _url("planetarium:showsession-list") + "?cursor=", 200
+        )
+        self.request(
+            "show_sessions.seat_map", "get",
+            _url("planetarium:showsession-seat-map", self.show_session.pk),
+            200
+        )
+
+        holds = []
+
+        def hold(seat):
+            show_session, row, seat = seat
+            response = _check(
+                "show_sessions.hold",
+                self.admin_client.post(
+                    _url("planetarium:showsession-hold", show_session.pk),
+                    {"seats": [{"row": row, "seat": seat}]},
+                    format="json"
+                ),
+                201
+            )
+            holds.append(response.data["hold"])
+
+        self.results.append(
+            measure(
+                "show_sessions.hold", hold, self.repeat,
+                setup=lambda: next(self.seats)
+            )
+        )
+
+        def setup_hold():
+            show_session, row, seat = next(self.seats)
+            held = hold_seats(show_session, [(row, seat)], self.admin)
+            return _url(
+                "planetarium:showsession-release-hold",
+                show_session.pk,
+                held["hold"]
+            )
+
+        self.request(
+            "show_sessions.release_hold", "delete", lambda url: url, 204,
+            setup=setup_hold
+        )
+        # Holds are kept in cache, they aren't rolled back
+        for token in holds:
+            release_hold(get_hold(token))
+
+    def reservations(self):
+        list_url = _url("planetarium:reservation-list")
+
+        def tickets(seat):
+            show_session, row, seat = seat
+            return {
+                "tickets": [
+                    {"show_session": show_session.id, "row": row, "seat": seat}
+                ]
+            }
+
+        def create_reservation():
+            show_session, row, seat = next(self.seats)
+            reservation = Reservation.objects.create(
+                user=self.admin, show_session=show_session
+            )
+            book_tickets(
+                reservation,
+                [{"show_session": show_session, "row": row, "seat": seat}]
+            )
+            return reservation.pk
+
+        self.request("reservations.list", "get", list_url, 200)
+        self.request(
+            "reservations.list[keyset]", "get", list_url + "?cursor=", 200
+        )
+        self.request(
+            "reservations.retrieve", "get",
+            _url("planetarium:reservation-detail", self.reservation.pk), 200
+        )
+        self.request(
+            "reservations.create", "post", list_url, 201,
+            data=tickets, setup=lambda: next(self.seats)
+        )
+        self.request(
+            "reservations.create[best_available]", "post", list_url, 201,
+            data=lambda show_session: {
+                "best_available": {
+                    "show_session": show_session.id, "seats": 2
+                }
+            },
+            setup=self.create_show_session
+        )
+        self.request(
+            "reservations.destroy", "delete",
+            lambda pk: _url("planetarium:reservation-detail", pk), 204,
+            setup=create_reservation
+        )
+
+    def users(self):
+        email = self.user.email
+        refresh = RefreshToken.for_user(self.user)
+        anonymous_client = APIClient()
+
+        self.request(
+            "user.register", "post", _url("user:create"), 201,
+            data=lambda number: {
+                "email": f"benchmark{number}@benchmark.com",
+                "password": PASSWORD
+            },
+            setup=self.number,
+            client=anonymous_client
+        )
+        self.request(
+            "user.token", "post", _url("user:token_obtain_pair"), 200,
+            data={"email": email, "password": PASSWORD},
+            client=anonymous_client
+        )
+        self.request(
+            "user.token_refresh", "post", _url("user:token_refresh"), 200,
+            data={"refresh": str(refresh)},
+            client=anonymous_client
+        )
+        self.request(
+            "user.token_verify", "post", _url("user:token_verify"), 200,
+            data={"token": str(refresh.access_token)},
+            client=anonymous_client
+        )
+        me_url = _url("user:manage")
+        self.request("user.me", "get", me_url, 200, client=self.user_client)
+        self.request(
+            "user.me.update", "put", me_url, 200,
+            data={"email": email, "password": PASSWORD},
+            client=self.user_client
+        )
+        self.request(
+            "user.me.partial_update", "patch", me_url, 200,
+            data={"email": email},
+            client=self.user_client
+        )
+
+
+@benchmark("endpoints")
+def endpoints_benchmark(repeat):
+    """Measure every action of planetarium and user API"""
+    with mock.patch.object(APIView, "throttle_classes", []), \
+            override_settings(ALLOWED_HOSTS=["testserver"]):
+        endpoints = EndpointsBenchmark(repeat)
+        endpoints.catalog()
+        endpoints.show_sessions()
+        endpoints.reservations()
+        endpoints.users()
+
+    return endpoints.results
@@ -0,0 +1,164 @@
+"""
+Benchmark of model serializers vs projection serializers of lists
+and of normalized show sessions list.
+
+Every case reads ROWS_COUNT rows and builds their representation,
+so time and peak memory include building model instances or dicts
+of values() rows, divided by ROWS_COUNT they are cost per row.
+Held seats are read from cache by both serializers.
+"""
+
+import datetime
+
+from planetarium.benchmarks import benchmark, measure
+from planetarium.models import (
+    AstronomyShow,
+    DailySchedule,
+    PlanetariumDome,
+    Reservation,
+    ShowSession,
+    ShowSessionTicketCounter,
+    ShowSpeaker,
+    Ticket
+)
+from planetarium.serializers import (
+    DailyScheduleProjectionSerializer,
+    DailyScheduleSerializer,
+    ReservationListProjectionSerializer,
+    ReservationListSerializer,
+    ShowSessionListProjectionSerializer,
+    ShowSessionListSerializer,
+    ShowSessionNormalizedSerializer
+)
+from planetarium.views import ShowSessionViewSet
+
+ROWS_COUNT = 1000
+SPEAKERS_PER_SHOW_SESSION = 2
+TICKETS_PER_RESERVATION = 3
+
+
+def _sample_data():
+    """Function to create show sessions with speakers and reservations"""
+    planetarium_dome = PlanetariumDome.objects.create(
+        name="Benchmark dome", rows=20, seats_in_row=30
+    )
+    astronomy_show = AstronomyShow.objects.create(
+        title="Benchmark show", description="Benchmark"
+    )
+    show_speakers = ShowSpeaker.objects.bulk_create(
+        ShowSpeaker(
+            first_name="Benchmark",
+            last_name=f"Speaker {number}",
+            profession="Benchmark"
+        )
+        for number in range(SPEAKERS_PER_SHOW_SESSION)
+    )
+    show_sessions = ShowSession.objects.bulk_create(
+        ShowSession(
+            astronomy_show=astronomy_show,
+            planetarium_dome=planetarium_dome,
+            show_day=datetime.date(2000, 1, 1) + datetime.timedelta(
+                days=number
+            ),
+            time_start="10:00:00",
+            time_end="11:00:00"
+        )
+        for number in range(ROWS_COUNT)
+    )
+    through = ShowSession.show_speakers.through
+    through.objects.bulk_create(
+        through(showsession_id=show_session.id, showspeaker=show_speaker)
+        for show_session in show_sessions
+        for show_speaker in show_speakers
+    )
+
+    reservations = Reservation.objects.bulk_create(
+        Reservation(show_session=show_session)
+        for show_session in show_sessions
+    )
+    Ticket.objects.bulk_create(
+        Ticket(
+            reservation=reservation,
+            show_session_id=reservation.show_session_id,
+            row=1,
+            seat=seat
+        )
+        for reservation in reservations
+        for seat in range(1, TICKETS_PER_RESERVATION + 1)
+    )
+
+    show_session_ids = [show_session.id for show_session in show_sessions]
+    ShowSessionTicketCounter.rebuild(show_session_ids)
+    DailySchedule.refresh(show_session_ids)
+    return show_session_ids
+
+
+@benchmark("list_serializers")
+def list_serializers_benchmark(repeat):
+    """Compare model and projection serializers of list endpoints"""
+    show_session_ids = _sample_data()
+    show_sessions = ShowSessionViewSet.queryset.filter(
+        id__in=show_session_ids
+    ).order_by("-show_day", "-time_start", "-time_end", "id")
+    daily_schedule = DailySchedule.objects.filter(
+        show_session_id__in=show_session_ids
+    ).order_by("-show_day", "-time_start", "-time_end", "show_session_id")
+    reservations = Reservation.objects.filter(
+        show_session_id__in=show_session_ids
+    ).select_related(
+        "user", "show_session__astronomy_show"
+    ).prefetch_related("tickets")
+
+    cases = (
+        (
+            "show_sessions",
+            show_sessions,
+            ShowSessionListSerializer,
+            ShowSessionListProjectionSerializer
+        ),
+        (
+            "daily_schedule",
+            daily_schedule,
+            DailyScheduleSerializer,
+            DailyScheduleProjectionSerializer
+        ),
+        (
+            "reservations",
+            reservations,
+            ReservationListSerializer,
+            ReservationListProjectionSerializer
+        ),
+    )
+
+    results = []
+    # Functions are measured right away, so they see variables of the loop
+    for name, queryset, serializer_class, projection_class in cases:
+        results.append(
+            measure(
+                f"{name}.serializer[{ROWS_COUNT}]",
+                lambda _: serializer_class(queryset.all(), many=True).data,
+                repeat
+            )
+        )
+        results.append(
+            measure(
+                f"{name}.projection[{ROWS_COUNT}]",
+                lambda _: projection_class(
+                    projection_class.project(queryset), many=True
+                ).data,
+                repeat
+            )
+        )
+
+    results.append(
+        measure(
+            f"show_sessions.normalized[{ROWS_COUNT}]",
+            lambda _: ShowSessionNormalizedSerializer(
+                ShowSessionNormalizedSerializer.project(show_sessions),
+                many=True
+            ).data,
+            repeat
+        )
+    )
+
+    return results
@@ -0,0 +1,67 @@
+"""
+Benchmark of renderers of list responses.
+
+Data of show sessions and reservations lists is built once with
+model serializers, then the same data is rendered by DRF JSONRenderer,
+orjson FastJSONRenderer and MessagePackRenderer, so only rendering
+is measured. Every case reports size of rendered payload in bytes.
+"""
+
+from rest_framework.renderers import JSONRenderer
+
+from planetarium.benchmarks import benchmark, measure
+from planetarium.benchmarks.list_serializers import ROWS_COUNT, _sample_data
+from planetarium.models import Reservation
+from planetarium.renderers import FastJSONRenderer, MessagePackRenderer
+from planetarium.serializers import (
+    ReservationListSerializer,
+    ShowSessionListSerializer
+)
+from planetarium.views import ShowSessionViewSet
+
+RENDERERS = (
+    ("json", JSONRenderer),
+    ("orjson", FastJSONRenderer),
+    ("msgpack", MessagePackRenderer),
+)
+
+
+@benchmark("renderers")
+def renderers_benchmark(repeat):
+    """Compare render time and payload size of list responses"""
+    show_session_ids = _sample_data()
+    cases = (
+        (
+            "show_sessions",
+            ShowSessionListSerializer(
+                ShowSessionViewSet.queryset.filter(id__in=show_session_ids),
+                many=True
+            ).data
+        ),
+        (
+            "reservations",
+            ReservationListSerializer(
+                Reservation.objects.filter(
+                    show_session_id__in=show_session_ids
+                ).select_related(
+                    "user", "show_session__astronomy_show"
+                ).prefetch_related("tickets"),
+                many=True
+            ).data
+        ),
+    )
+
+    results = []
+    # Functions are measured right away, so they see variables of the loop
+    for name, data in cases:
+        for renderer_name, renderer_class in RENDERERS:
+            renderer = renderer_class()
+            result = measure(
+                f"{name}.{renderer_name}[{ROWS_COUNT}]",
+                lambda _: renderer.render(data, renderer.media_type),
+                repeat
+            )
+            result["bytes"] = len(renderer.render(data, renderer.media_type))
+            results.append(result)
+
+    return results
@@ -0,0 +1,82 @@
+"""Benchmark of reservation creation paths"""
+
+import itertools
+
+from planetarium.benchmarks import benchmark, measure
+from planetarium.booking import book_tickets
+from planetarium.models import (
+    AstronomyShow,
+    PlanetariumDome,
+    Reservation,
+    ShowSession,
+    Ticket
+)
+
+SEATS_COUNTS = (1, 10, 100)
+
+
+def _sample_show_session(planetarium_dome, astronomy_show, day_number):
+    return ShowSession.objects.create(
+        astronomy_show=astronomy_show,
+        planetarium_dome=planetarium_dome,
+        show_day=f"2000-01-{day_number % 28 + 1:02d}",
+        time_start="10:00:00",
+        time_end="11:00:00"
+    )
+
+
+def _create_one_by_one(reservation, tickets_data):
+    """Path which was used before bulk booking"""
+    for ticket_data in tickets_data:
+        Ticket.objects.create(reservation=reservation, **ticket_data)
+
+
+@benchmark("reservations")
+def reservations_benchmark(repeat):
+    """Compare one by one and bulk creation of tickets for reservation"""
+    planetarium_dome = PlanetariumDome.objects.create(
+        name="Benchmark dome", rows=10, seats_in_row=10
+    )
+    astronomy_show = AstronomyShow.objects.create(
+        title="Benchmark show", description="Benchmark"
+    )
+    day_numbers = itertools.count()
+    results = []
+
+    for seats_count in SEATS_COUNTS:
+        def setup():
+            show_session = ShowSession.objects.select_related(
+                "planetarium_dome"
+            ).get(
+                pk=_sample_show_session(
+                    planetarium_dome, astronomy_show, next(day_numbers)
+                ).pk
+            )
+            return [
+                {
+                    "show_session": show_session,
+                    "row": index // 10 + 1,
+                    "seat": index % 10 + 1
+                }
+                for index in range(seats_count)
+            ]
+
+        for case, create_tickets in (
+                ("one_by_one", _create_one_by_one),
+                ("bulk", book_tickets),
+        ):
+            results.append(
+                measure(
+                    f"{case}[{seats_count}]",
+                    lambda tickets_data: create_tickets(
+                        Reservation.objects.create(
+                            show_session=tickets_data[0]["show_session"]
+                        ),
+                        tickets_data
+                    ),
+                    repeat,
+                    setup=setup
+                )
+            )
+
+    return results
@@ -0,0 +1,44 @@
+"""Benchmark of best available seats search"""
+
+import random
+
+from planetarium.benchmarks import benchmark, measure
+from planetarium.seat_map import SeatMap
+
+DOMES = {
+    "small": (10, 10),
+    "largest": (60, 80),
+}
+OCCUPANCIES = (0.5, 0.9)
+BLOCK_SIZES = (2, 6)
+
+
+@benchmark("seat_allocation")
+def seat_allocation_benchmark(repeat):
+    """Search of adjacent seats on randomly occupied seat maps"""
+    results = []
+
+    for dome, (rows, seats_in_row) in DOMES.items():
+        for occupancy in OCCUPANCIES:
+            seat_map = SeatMap(rows, seats_in_row)
+            rng = random.Random(0)
+            for row, seat in rng.sample(
+                    [
+                        (row, seat)
+                        for row in range(1, rows + 1)
+                        for seat in range(1, seats_in_row + 1)
+                    ],
+                    int(seat_map.capacity * occupancy)
+            ):
+                seat_map.mark(row, seat)
+
+            for count in BLOCK_SIZES:
+                results.append(
+                    measure(
+                        f"{dome}[{occupancy:.0%}, {count} seats]",
+                        lambda _: seat_map.find_best_block(count),
+                        repeat
+                    )
+                )
+
+    return results
@@ -0,0 +1,157 @@
+"""
+Benchmark of overhead of ServerTimingMiddleware.
+
+The same requests are sent through handler without the middleware,
+with it measuring requests without header (not sampled requests)
+and with header in every response. Differences of whole requests
+are smaller than noise, so cost of the middleware itself is measured
+too: it wraps view which does nothing and runs one query.
+Throttling is switched off, it's not what is measured.
+"""
+
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from planetarium.benchmarks import benchmark, measure
+from planetarium.booking import book_tickets
+from planetarium.models import (
+    AstronomyShow,
+    PlanetariumDome,
+    Reservation,
+    ShowSession,
+    ShowSpeaker
+)
+from planetarium.timing import ServerTimingMiddleware
+
+MIDDLEWARE = "planetarium.timing.ServerTimingMiddleware"
+CALLS = 1000
+SHOW_SESSIONS_COUNT = 20
+
+
+def _sample_data():
+    planetarium_dome = PlanetariumDome.objects.create(
+        name="Benchmark dome", rows=20, seats_in_row=30
+    )
+    astronomy_show = AstronomyShow.objects.create(
+        title="Benchmark show", description="Benchmark"
+    )
+    show_speaker = ShowSpeaker.objects.create(
+        first_name="Benchmark", last_name="Speaker", profession="Benchmark"
+    )
+    show_sessions = ShowSession.objects.bulk_create(
+        ShowSession(
+            astronomy_show=astronomy_show,
+            planetarium_dome=planetarium_dome,
+            show_day=f"2000-01-{number % 28 + 1:02d}",
+            time_start="10:00:00",
+            time_end="11:00:00"
+        )
+        for number in range(SHOW_SESSIONS_COUNT)
+    )
+    for show_session in show_sessions:
+        show_session.show_speakers.add(show_speaker)
+
+    show_session = ShowSession.objects.select_related(
+        "planetarium_dome"
+    ).get(pk=show_sessions[0].pk)
+    book_tickets(
+        Reservation.objects.create(show_session=show_session),
+        [
+            {"show_session": show_session, "row": row, "seat": seat}
+            for row in range(1, 11)
+            for seat in range(1, 31)
+        ]
+    )
+    return show_session
+
+
+def _view(request):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    return HttpResponse()
+
+
+def _client(headers, **settings_overrides):
+    """Function to create client which handler loads given settings"""
+    client = APIClient()
+    client.credentials(**headers)
+    with override_settings(**settings_overrides):
+        # Middleware is loaded on the first request
+        client.get(reverse("planetarium:showsession-list"))
+    return client
+
+
+@benchmark("server_timing")
+def server_timing_benchmark(repeat):
+    """Compare requests without and with ServerTimingMiddleware"""
+    show_session = _sample_data()
+    user = get_user_model().objects.create_user(
+        "benchmark@benchmark.com", "benchmark"
+    )
+    headers = {
+        "HTTP_AUTHORIZATION": (
+            f"Bearer {RefreshToken.for_user(user).access_token}"
+        )
+    }
+    urls = {
+        "list": reverse("planetarium:showsession-list"),
+        "detail": reverse(
+            "planetarium:showsession-detail", args=(show_session.id,)
+        ),
+        "seat_map": reverse(
+            "planetarium:showsession-seat-map", args=(show_session.id,)
+        ),
+    }
+
+    request = RequestFactory().get("/")
+    request.user = user
+    with override_settings(PLANETARIUM_SERVER_TIMING_SAMPLE_RATE=0):
+        middleware = ServerTimingMiddleware(_view)
+
+    results = []
+    for case, handler in (("view", _view), ("middleware", middleware)):
+        results.append(
+            measure(
+                f"{case}[{CALLS}]",
+                lambda _: [handler(request) for _ in range(CALLS)],
+                repeat
+            )
+        )
+
+    with mock.patch.object(APIView, "throttle_classes", []), \
+            override_settings(ALLOWED_HOSTS=["testserver"]):
+        clients = {
+            "off": _client(
+                headers,
+                MIDDLEWARE=[
+                    middleware for middleware in settings.MIDDLEWARE
+                    if middleware != MIDDLEWARE
+                ]
+            ),
+            "on": _client(
+                headers, PLANETARIUM_SERVER_TIMING_SAMPLE_RATE=0
+            ),
+            "on[header]": _client(
+                headers, PLANETARIUM_SERVER_TIMING_SAMPLE_RATE=1
+            ),
+        }
+        for endpoint, url in urls.items():
+            for case, client in clients.items():
+                results.append(
+                    measure(
+                        f"{endpoint}_{case}",
+                        lambda _: client.get(url),
+                        repeat
+                    )
+                )
+
+    return results
@@ -0,0 +1,139 @@
+"""
+Bulk creation of tickets for reservation.
+
+Instead of saving every ticket separately (uniqueness SELECT,
+planetarium dome lookup and INSERT for each seat) all seats are
+validated against their domes at once, conflicts with already
+sold tickets are found with one query and tickets are inserted
+with one bulk INSERT.
+
+Concurrent reservations of the same show session are serialized
+by lock of show session row (ShowSession.lock_for_booking),
+so seats are checked and inserted without races. Seats which were
+sold or held by somebody else are reported with 409 response
+(SeatsConflict) instead of failing on unique constraint.
+"""
+
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from rest_framework.exceptions import ValidationError
+
+from planetarium.exceptions import SeatsConflict
+from planetarium.holds import find_held_seats
+from planetarium.models import ShowSession, ShowSessionTicketCounter, Ticket
+from planetarium.seat_map import build_seat_map
+
+
+def validate_tickets(tickets_data):
+    """
+    Function to validate all requested tickets at once.
+    Raise one ValidationError which lists every incorrect
+    or repeated seat by position of ticket in request.
+    Returns requested (show_session_id, row, seat).
+    """
+    errors = [{} for _ in tickets_data]
+    requested = {}
+
+    for index, ticket_data in enumerate(tickets_data):
+        show_session = ticket_data["show_session"]
+        row, seat = ticket_data["row"], ticket_data["seat"]
+
+        try:
+            Ticket.validate_ticket(
+                row, seat, show_session.planetarium_dome, ValidationError
+            )
+        except ValidationError as error:
+            errors[index] = error.detail
+            continue
+
+        key = (show_session.id, row, seat)
+        if key in requested:
+            errors[index] = {
+                "seat": [f"Seat (row: {row}, seat: {seat}) "
+                         f"is requested more than once."]
+            }
+            continue
+        requested[key] = index
+
+    if any(errors):
+        raise ValidationError({"tickets": errors})
+
+    return list(requested)
+
+
+def find_lost_seats(requested, hold_token=None):
+    """
+    Function to find which of requested seats are already sold
+    or held by other hold (look at planetarium.holds)
+    """
+    lost = Ticket.find_taken_seats(requested)
+
+    seats_by_show_session = defaultdict(list)
+    for show_session_id, row, seat in requested:
+        seats_by_show_session[show_session_id].append((row, seat))
+
+    for show_session_id, seats in seats_by_show_session.items():
+        lost.update(
+            (show_session_id, row, seat)
+            for row, seat in find_held_seats(
+                show_session_id, seats, hold_token
+            )
+        )
+
+    return lost
+
+
+def book_tickets(reservation, tickets_data, hold_token=None):
+    """
+    Function to create all tickets of reservation with one INSERT.
+    Must be called inside transaction together with reservation creation.
+    Seats of hold with hold_token can be booked.
+    """
+    requested = validate_tickets(tickets_data)
+
+    ShowSession.lock_for_booking(
+        {show_session_id for show_session_id, _, _ in requested}
+    )
+    lost = find_lost_seats(requested, hold_token)
+    if lost:
+        raise SeatsConflict(lost)
+
+    try:
+        # Tickets created without lock (e.g. raw SQL)
+        # still fail on unique constraint
+        with transaction.atomic():
+            tickets = Ticket.objects.bulk_create(
+                [
+                    Ticket(reservation=reservation, **ticket_data)
+                    for ticket_data in tickets_data
+                ]
+            )
+    except IntegrityError:
+        raise SeatsConflict(Ticket.find_taken_seats(requested))
+
+    ShowSessionTicketCounter.add_tickets(tickets)
+
+    return tickets
+
+
+def allocate_best_available(show_session, count):
+    """
+    Function to choose the best block of `count` adjacent free seats
+    of show session (look at SeatMap.find_best_block).
+    Must be called inside transaction, show session stays locked,
+    so chosen seats can't be taken by others until they are booked.
+    """
+    ShowSession.lock_for_booking([show_session.id])
+    seat_map, _ = build_seat_map(show_session)
+
+    block = seat_map.find_best_block(count)
+    if block is None:
+        raise SeatsConflict(
+            [], f"There are no {count} adjacent seats available."
+        )
+
+    return [
+        {"show_session": show_session, "row": row, "seat": seat}
+        for row, seat in block
+    ]
@@ -0,0 +1,98 @@
+"""
+Response cache for catalog endpoints.
+
+Cached data of response is stored in Django cache (local memory
+or shared backend, see CACHES setting) under key which includes
+versions of all models response depends on (see planetarium.versions).
+Saving, deleting or changing many-to-many relations of model bumps
+its version, so all responses built from old data are never read again
+and expire by themselves.
+"""
+
+import hashlib
+
+from django.conf import settings
+from rest_framework.response import Response
+
+from planetarium.versions import get_cache, get_collection_versions
+
+KEY_PREFIX = "planetarium"
+STATS = ("hits", "misses")
+
+
+def get_timeout():
+    return getattr(settings, "PLANETARIUM_CACHE_TIMEOUT", 300)
+
+
+def record(stat):
+    cache = get_cache()
+    key = f"{KEY_PREFIX}:stats:{stat}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+def get_stats():
+    """Function to get hit and miss counters of response cache"""
+    cache = get_cache()
+    counters = cache.get_many([f"{KEY_PREFIX}:stats:{stat}" for stat in STATS])
+    return {
+        stat: counters.get(f"{KEY_PREFIX}:stats:{stat}", 0) for stat in STATS
+    }
+
+
+class CachedResponseMixin:
+
+    """
+    Mixin for viewsets to cache data of list and retrieve responses.
+    cache_dependencies - models which data is shown in responses
+    """
+
+    cache_dependencies = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_response_cache_key(self, request, kwargs):
+        """Key depends on action, serializer, query params and versions"""
+        versions = get_collection_versions(self.cache_dependencies)
+        # Absolute URLs of responses depend on scheme and host
+        varying = repr((
+            request.scheme,
+            request.get_host(),
+            sorted(request.query_params.lists()),
+            sorted(kwargs.items()),
+            versions,
+        ))
+        return ":".join((
+            KEY_PREFIX,
+            "response",
+            self.__class__.__name__,
+            self.action,
+            self.get_serializer_class().__name__,
+            hashlib.md5(varying.encode()).hexdigest(),
+        ))
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        cache = get_cache()
+        key = self.get_response_cache_key(request, kwargs)
+
+        data = cache.get(key)
+        if data is not None:
+            record("hits")
+            response = Response(data)
+            response["X-Cache"] = "HIT"
+            return response
+
+        record("misses")
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, get_timeout())
+        response["X-Cache"] = "MISS"
+        return response
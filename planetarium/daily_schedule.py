@@ -0,0 +1,135 @@
+"""
+Incremental updates of daily schedule.
+
+DailySchedule keeps one row per show session with everything shown
+in show sessions list. Rows are rebuilt in the same transaction
+as the change of their sources:
+
+- show session is saved or its speakers are changed;
+- show, dome or speaker of show sessions is saved or speaker is deleted;
+- tickets are sold or cancelled, then tickets available are changed
+  by delta without rebuilding the row.
+
+Deleted show sessions lose their rows by cascade. Data changed
+bypassing models (e.g. bulk_create, COPY or queryset.update)
+is repaired with `python manage.py rebuild_daily_schedule`.
+"""
+
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete
+)
+
+from planetarium.models import (
+    AstronomyShow,
+    DailySchedule,
+    PlanetariumDome,
+    ShowSession,
+    ShowSpeaker
+)
+
+KEY_PREFIX = "planetarium:daily_schedule"
+
+# Fields of models which are shown in daily schedule,
+# saving of other fields (e.g. poster of show) doesn't rebuild rows
+SOURCE_FIELDS = {
+    AstronomyShow: ("title",),
+    PlanetariumDome: ("name", "rows", "seats_in_row"),
+    ShowSpeaker: ("first_name", "last_name", "profession"),
+}
+
+SHOW_SESSIONS_OF = {
+    AstronomyShow: "astronomy_show",
+    PlanetariumDome: "planetarium_dome",
+    ShowSpeaker: "show_speakers",
+}
+
+
+def get_show_session_ids(model, pk):
+    """Function to get subquery of ids of show sessions of source object"""
+    return ShowSession.objects.filter(
+        **{SHOW_SESSIONS_OF[model]: pk}
+    ).values("id")
+
+
+def refresh_show_session(sender, instance, **kwargs):
+    DailySchedule.refresh([instance.pk])
+
+
+def refresh_source(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        return
+    if update_fields is not None and not (
+            set(update_fields) & set(SOURCE_FIELDS[sender])
+    ):
+        return
+    DailySchedule.refresh(get_show_session_ids(sender, instance.pk))
+
+
+def remember_show_sessions(sender, instance, **kwargs):
+    # Relations are deleted with speaker, its sessions are found before
+    instance._daily_schedule_ids = list(
+        get_show_session_ids(sender, instance.pk).values_list(
+            "id", flat=True
+        )
+    )
+
+
+def refresh_remembered(sender, instance, **kwargs):
+    DailySchedule.refresh(getattr(instance, "_daily_schedule_ids", []))
+
+
+def refresh_show_speakers(sender, instance, action, reverse, pk_set,
+                          **kwargs):
+    if not reverse:
+        if action.startswith("post_"):
+            DailySchedule.refresh([instance.pk])
+        return
+
+    if action == "pre_clear":
+        remember_show_sessions(ShowSpeaker, instance)
+    elif action == "post_clear":
+        refresh_remembered(ShowSpeaker, instance)
+    elif action.startswith("post_") and pk_set:
+        DailySchedule.refresh(pk_set)
+
+
+def add_tickets_sold(sender, show_session_id, delta=None, **kwargs):
+    if delta:
+        DailySchedule.add_tickets_sold(show_session_id, delta)
+
+
+def connect_schedule_signals(tickets_sold_changed):
+    """Function to keep daily schedule up to date with its sources"""
+    post_save.connect(
+        refresh_show_session,
+        sender=ShowSession,
+        dispatch_uid=f"{KEY_PREFIX}:show_session"
+    )
+    m2m_changed.connect(
+        refresh_show_speakers,
+        sender=ShowSession.show_speakers.through,
+        dispatch_uid=f"{KEY_PREFIX}:show_speakers"
+    )
+    for model in SOURCE_FIELDS:
+        post_save.connect(
+            refresh_source,
+            sender=model,
+            dispatch_uid=f"{KEY_PREFIX}:{model._meta.label_lower}"
+        )
+    pre_delete.connect(
+        remember_show_sessions,
+        sender=ShowSpeaker,
+        dispatch_uid=f"{KEY_PREFIX}:show_speaker:pre_delete"
+    )
+    post_delete.connect(
+        refresh_remembered,
+        sender=ShowSpeaker,
+        dispatch_uid=f"{KEY_PREFIX}:show_speaker:post_delete"
+    )
+    tickets_sold_changed.connect(
+        add_tickets_sold,
+        dispatch_uid=f"{KEY_PREFIX}:tickets_sold"
+    )
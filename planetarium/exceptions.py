@@ -0,0 +1,27 @@
+"""Exceptions of planetarium API"""
+
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class SeatsConflict(APIException):
+
+    """
+    Raised when requested seats were sold or held by somebody else
+    in the meantime, response lists all lost seats
+    """
+
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Some of requested seats are already taken."
+    default_code = "seats_conflict"
+
+    def __init__(self, seats, detail=None):
+        super().__init__()
+        self.seats = sorted(seats)
+        self.detail = {
+            "detail": detail or self.default_detail,
+            "seats": [
+                {"show_session": show_session_id, "row": row, "seat": seat}
+                for show_session_id, row, seat in self.seats
+            ],
+        }
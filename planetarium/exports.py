@@ -0,0 +1,112 @@
+"""
+Streaming export of reservations as CSV or JSON Lines.
+
+Export has one row per ticket with its reservation, show session,
+show and dome. Rows are read with queryset.iterator(), which uses
+server-side cursor on PostgreSQL, so only CHUNK_SIZE rows are fetched
+at once, and every row is encoded and sent right away. Memory use
+doesn't depend on number of exported rows.
+
+Rows are ordered by creation of reservations, so file of the next
+night can be compared with the previous one line by line.
+"""
+
+import csv
+import json
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from planetarium.models import Ticket
+
+CHUNK_SIZE = 2000
+
+# Columns of export and fields of ticket they are read from
+COLUMNS = (
+    ("reservation", "reservation_id"),
+    ("created_at", "reservation__created_at"),
+    ("user", "reservation__user__email"),
+    ("ticket", "id"),
+    ("show_session", "show_session_id"),
+    ("show_day", "show_session__show_day"),
+    ("time_start", "show_session__time_start"),
+    ("astronomy_show", "show_session__astronomy_show__title"),
+    ("planetarium_dome", "show_session__planetarium_dome__name"),
+    ("row", "row"),
+    ("seat", "seat"),
+)
+
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+
+def get_start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def filter_tickets(date_from=None, date_to=None, show=None, show_title=None):
+    """
+    Function to get tickets of reservations created from date_from
+    to date_to inclusive, optionally of one show or shows by title
+    """
+    tickets = Ticket.objects.all()
+    # Bounds are datetimes, so index of reservations' creation is used
+    if date_from:
+        tickets = tickets.filter(
+            reservation__created_at__gte=get_start_of_day(date_from)
+        )
+    if date_to:
+        tickets = tickets.filter(
+            reservation__created_at__lt=get_start_of_day(
+                date_to + timedelta(days=1)
+            )
+        )
+    if show:
+        tickets = tickets.filter(show_session__astronomy_show_id=show)
+    if show_title:
+        tickets = tickets.filter(
+            show_session__astronomy_show__title__icontains=show_title
+        )
+    return tickets.order_by("reservation__created_at", "reservation_id", "id")
+
+
+def iterate_rows(tickets, chunk_size=CHUNK_SIZE):
+    """Function to read rows of export from server-side cursor"""
+    return tickets.values_list(
+        *(field for _, field in COLUMNS)
+    ).iterator(chunk_size=chunk_size)
+
+
+class Echo:
+
+    """File-like object which returns written line instead of storing it"""
+
+    def write(self, value):
+        return value
+
+
+def to_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow([column for column, _ in COLUMNS])
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def to_jsonl(rows):
+    columns = [column for column, _ in COLUMNS]
+    for row in rows:
+        yield json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+def export_reservations(file_format, chunk_size=CHUNK_SIZE, **filters):
+    """
+    Function to get generator of lines of export in file_format,
+    filters are the arguments of filter_tickets
+    """
+    rows = iterate_rows(filter_tickets(**filters), chunk_size)
+    if file_format == "jsonl":
+        return to_jsonl(rows)
+    return to_csv(rows)
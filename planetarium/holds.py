@@ -0,0 +1,286 @@
+"""
+Time-limited holds of seats during checkout.
+
+Hold reserves seats of one show session for PLANETARIUM_SEAT_HOLD_MINUTES
+in Django cache (local memory or shared Redis, see CACHES setting),
+nothing is written to database until reservation is created from hold.
+
+Every held seat has its own key created with atomic cache.add,
+so only one hold gets the seat, and it expires by itself with the hold.
+To show held seats without reading all seat keys, every show session
+has index of its held seats with their expiry time. Index is rewritten
+on every hold and release under lock of show session (key created with
+cache.add), so concurrent holds don't overwrite each other's seats.
+Expired entries are swept at that time and skipped when index is read.
+
+Holds lapse without any write, so expiry times of all holds are kept
+in one more key, and time of the last lapse is part of versions
+of responses which subtract held seats (see ShowSessionViewSet).
+"""
+
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from rest_framework.exceptions import ValidationError
+
+from planetarium.exceptions import SeatsConflict
+from planetarium.models import ShowSession, Ticket, tickets_sold_changed
+from planetarium.versions import get_cache
+
+KEY_PREFIX = "planetarium:hold"
+EXPIRIES_KEY = f"{KEY_PREFIX}:expiries"
+
+# Locks expire by themselves if their owner dies
+LOCK_TIMEOUT = 5
+LOCK_WAIT = 0.005
+
+
+def get_timeout():
+    return getattr(settings, "PLANETARIUM_SEAT_HOLD_MINUTES", 10) * 60
+
+
+def hold_key(token):
+    return f"{KEY_PREFIX}:{token}"
+
+
+def seat_key(show_session_id, row, seat):
+    return f"{KEY_PREFIX}:seat:{show_session_id}:{row}:{seat}"
+
+
+def index_key(show_session_id):
+    return f"{KEY_PREFIX}:index:{show_session_id}"
+
+
+def index_lock_key(show_session_id):
+    return f"{KEY_PREFIX}:index:{show_session_id}:lock"
+
+
+@contextmanager
+def cache_lock(key):
+    """Function to wait for lock kept in cache under key"""
+    cache = get_cache()
+    owner = uuid.uuid4().hex
+    while not cache.add(key, owner, LOCK_TIMEOUT):
+        time.sleep(LOCK_WAIT)
+    try:
+        yield
+    finally:
+        if cache.get(key) == owner:
+            cache.delete(key)
+
+
+def active_seats(index, now=None):
+    """Function to get not expired {(row, seat): token} of index"""
+    if not index:
+        return {}
+    now = now or time.time()
+    return {
+        seat: token
+        for seat, (token, expires_at) in index["seats"].items()
+        if expires_at > now
+    }
+
+
+def update_index(show_session_id, token, seats, expires_at=None):
+    """
+    Function to add seats of hold to index of show session
+    (or remove them when expires_at is None) and sweep expired ones
+    """
+    cache = get_cache()
+    key = index_key(show_session_id)
+    with cache_lock(index_lock_key(show_session_id)):
+        now = time.time()
+        index = cache.get(key) or {"revision": 0, "seats": {}}
+
+        held = {
+            seat: (held_token, held_expires_at)
+            for seat, (held_token, held_expires_at) in index["seats"].items()
+            if held_expires_at > now and held_token != token
+        }
+        if expires_at is not None:
+            held.update({seat: (token, expires_at) for seat in seats})
+
+        if held:
+            cache.set(
+                key,
+                {"revision": time.time_ns(), "seats": held},
+                int(
+                    max(expires_at for _, expires_at in held.values()) - now
+                ) + 1
+            )
+        else:
+            cache.delete(key)
+
+    update_expiries(token, expires_at)
+    tickets_sold_changed.send(
+        sender=ShowSession, show_session_id=show_session_id
+    )
+
+
+def read_expiries(cache):
+    """
+    Function to read expiries of holds as {"lapsed": time of the last
+    swept lapse, "holds": {token: expires_at}}
+    """
+    expiries = cache.get(EXPIRIES_KEY)
+    if expiries is None:
+        # Like evicted versions, lost expiries are taken as lapsed now
+        expiries = {"lapsed": time.time(), "holds": {}}
+        cache.add(EXPIRIES_KEY, expiries, timeout=None)
+    return expiries
+
+
+def last_lapse(expiries, now):
+    """Function to get time of the last lapse of hold before now"""
+    return max(
+        [expiries["lapsed"]]
+        + [
+            expires_at for expires_at in expiries["holds"].values()
+            if expires_at <= now
+        ]
+    )
+
+
+def update_expiries(token, expires_at=None):
+    """
+    Function to add expiry of hold to expiries of all holds
+    (or remove it when expires_at is None) and sweep lapsed ones
+    """
+    cache = get_cache()
+    with cache_lock(f"{EXPIRIES_KEY}:lock"):
+        now = time.time()
+        expiries = read_expiries(cache)
+        holds = {
+            held_token: held_expires_at
+            for held_token, held_expires_at in expiries["holds"].items()
+            if held_expires_at > now and held_token != token
+        }
+        if expires_at is not None:
+            holds[token] = expires_at
+        cache.set(
+            EXPIRIES_KEY,
+            {"lapsed": last_lapse(expiries, now), "holds": holds},
+            timeout=None
+        )
+
+
+def get_holds_version():
+    """
+    Function to get time in microseconds of the last lapse of hold,
+    it's read together with versions of models (see planetarium.versions)
+    """
+    return int(last_lapse(read_expiries(get_cache()), time.time()) * 1_000_000)
+
+
+def get_held_seats(show_session_id):
+    """
+    Function to get held seats of show session
+    as ({(row, seat): token}, revision of index)
+    """
+    index = get_cache().get(index_key(show_session_id))
+    return active_seats(index), index["revision"] if index else 0
+
+
+def count_held_seats(show_session_ids):
+    """Function to count held seats of several show sessions at once"""
+    indexes = get_cache().get_many(
+        [index_key(show_session_id) for show_session_id in show_session_ids]
+    )
+    now = time.time()
+    return {
+        show_session_id: len(
+            active_seats(indexes.get(index_key(show_session_id)), now)
+        )
+        for show_session_id in show_session_ids
+    }
+
+
+def find_held_seats(show_session_id, seats, token=None):
+    """Function to find which of seats are held by other holds"""
+    keys = {
+        seat_key(show_session_id, row, seat): (row, seat)
+        for row, seat in seats
+    }
+    return {
+        keys[key]
+        for key, held_token in get_cache().get_many(list(keys)).items()
+        if held_token != token
+    }
+
+
+def hold_seats(show_session, seats, user):
+    """
+    Function to hold seats [(row, seat), ...] of show session for user.
+    Raise SeatsConflict with all seats which are sold or held
+    by somebody else, in that case no seat is held.
+    """
+    seats = list(dict.fromkeys(seats))
+    for row, seat in seats:
+        Ticket.validate_ticket(
+            row, seat, show_session.planetarium_dome, ValidationError
+        )
+
+    lost = {
+        (row, seat)
+        for _, row, seat in Ticket.find_taken_seats(
+            [(show_session.id, row, seat) for row, seat in seats]
+        )
+    }
+
+    cache = get_cache()
+    timeout = get_timeout()
+    token = uuid.uuid4().hex
+    expires_at = time.time() + timeout
+    acquired = []
+    for row, seat in seats:
+        if (row, seat) in lost:
+            continue
+        key = seat_key(show_session.id, row, seat)
+        if cache.add(key, token, timeout):
+            acquired.append(key)
+        else:
+            lost.add((row, seat))
+
+    if lost:
+        cache.delete_many(acquired)
+        raise SeatsConflict(
+            [(show_session.id, row, seat) for row, seat in lost]
+        )
+
+    hold = {
+        "hold": token,
+        "user": user.id,
+        "show_session": show_session.id,
+        "seats": seats,
+        "expires_at": expires_at,
+    }
+    cache.set(hold_key(token), hold, timeout)
+    update_index(show_session.id, token, seats, expires_at)
+    return hold
+
+
+def get_hold(token):
+    """Function to get hold by its token, None if it's expired"""
+    hold = get_cache().get(hold_key(token))
+    if hold is None or hold["expires_at"] <= time.time():
+        return None
+    return hold
+
+
+def release_hold(hold):
+    """Function to free seats of hold which are still held by it"""
+    cache = get_cache()
+    keys = [
+        seat_key(hold["show_session"], row, seat)
+        for row, seat in hold["seats"]
+    ]
+    cache.delete_many(
+        [
+            key for key, token in cache.get_many(keys).items()
+            if token == hold["hold"]
+        ]
+    )
+    cache.delete(hold_key(hold["hold"]))
+    update_index(hold["show_session"], hold["hold"], hold["seats"])
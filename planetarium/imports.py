@@ -0,0 +1,291 @@
+"""
+Bulk import of show sessions from CSV or JSON Lines.
+
+File is parsed row by row, so it's never loaded into memory whole.
+Rows are validated and inserted in batches:
+
+- shows (by title), domes (by name) and speakers (by id)
+  of the batch are resolved with one query each;
+- speakers' and domes' working time is checked in memory with
+  SpeakerScheduleIndex / DomeScheduleIndex loaded once per batch,
+  so sessions overlapping existing ones or earlier rows are rejected;
+- valid sessions and their speakers are inserted with bulk_create.
+
+Rejected rows don't stop the import, they are reported with their
+numbers (line of JSON Lines file, data row of CSV file) and errors.
+
+CSV file has header with columns astronomy_show, planetarium_dome,
+show_day, time_start, time_end and show_speakers (ids separated by ";"),
+JSON Lines file has objects with the same keys.
+"""
+
+import csv
+import io
+import json
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from rest_framework import serializers
+
+from planetarium import versions
+from planetarium.models import (
+    AstronomyShow,
+    DailySchedule,
+    PlanetariumDome,
+    ShowSession,
+    ShowSpeaker
+)
+from planetarium.scheduling import DomeScheduleIndex, SpeakerScheduleIndex
+from planetarium.serializers import ShowSessionImportRowSerializer
+
+BATCH_SIZE = 1000
+FORMATS = ("csv", "jsonl")
+SPEAKERS_SEPARATOR = ";"
+
+
+def get_format(file_name, file_format=None):
+    """Function to get format of file from its name if it isn't given"""
+    if file_format is None:
+        file_format = file_name.rsplit(".", 1)[-1].lower()
+        if file_format == "ndjson":
+            file_format = "jsonl"
+    if file_format not in FORMATS:
+        raise ValueError(
+            f"Unknown format of file {file_name}, "
+            f"should be one of: {', '.join(FORMATS)}"
+        )
+    return file_format
+
+
+def read_rows(file, file_format):
+    """
+    Function to parse rows of binary or text file one by one,
+    yields (number of row, data or None, error or None).
+    File which isn't UTF-8 is reported as error of the row
+    where decoding failed, the rest of file isn't read.
+    """
+    if isinstance(file.read(0), bytes):
+        file = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+
+    if file_format == "csv":
+        reader = csv.DictReader(file)
+        number = 0
+        while True:
+            number += 1
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except UnicodeDecodeError as error:
+                yield number, None, {"file": f"Invalid UTF-8: {error}."}
+                return
+            except csv.Error as error:
+                yield number, None, {"row": f"Invalid CSV: {error}."}
+                continue
+            if None in row:
+                yield number, None, {"row": "Too many values."}
+                continue
+            speakers = row.get("show_speakers") or ""
+            row["show_speakers"] = [
+                speaker.strip()
+                for speaker in speakers.split(SPEAKERS_SEPARATOR)
+                if speaker.strip()
+            ]
+            yield number, row, None
+
+    lines = iter(file)
+    number = 0
+    while True:
+        number += 1
+        try:
+            line = next(lines)
+        except StopIteration:
+            return
+        except UnicodeDecodeError as error:
+            yield number, None, {"file": f"Invalid UTF-8: {error}."}
+            return
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            yield number, None, {"row": f"Invalid JSON: {error}."}
+            continue
+        if not isinstance(row, dict):
+            yield number, None, {"row": "JSON object is expected."}
+            continue
+        yield number, row, None
+
+
+class ShowSessionImport:
+
+    """Import of show sessions in batches with report of rejected rows"""
+
+    def __init__(self, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+        # One serializer validates all rows, its fields are built once
+        self.row_serializer = ShowSessionImportRowSerializer()
+        self.created = 0
+        self.errors = []
+
+    @property
+    def report(self):
+        return {
+            "created": self.created,
+            "failed": len(self.errors),
+            "errors": self.errors,
+        }
+
+    def run(self, rows):
+        """Function to import rows given as (number, data, error)"""
+        batch = []
+        for number, data, error in rows:
+            if error is not None:
+                self.reject(number, error)
+                continue
+
+            try:
+                data = self.row_serializer.run_validation(data)
+            except serializers.ValidationError as error:
+                self.reject(number, serializers.as_serializer_error(error))
+                continue
+
+            batch.append((number, data))
+            if len(batch) >= self.batch_size:
+                self.import_batch(batch)
+                batch = []
+
+        if batch:
+            self.import_batch(batch)
+        return self.report
+
+    def reject(self, number, errors):
+        self.errors.append({"row": number, "errors": errors})
+
+    def import_batch(self, batch):
+        """
+        Function to resolve, validate and insert sessions of batch,
+        every lookup is one query for the whole batch
+        """
+        astronomy_shows = dict(
+            AstronomyShow.objects.filter(
+                title__in={data["astronomy_show"] for _, data in batch}
+            ).values_list("title", "id")
+        )
+        planetarium_domes = {}
+        for planetarium_dome in PlanetariumDome.objects.filter(
+                name__in={data["planetarium_dome"] for _, data in batch}
+        ):
+            planetarium_domes.setdefault(
+                planetarium_dome.name, []
+            ).append(planetarium_dome)
+        show_speakers = ShowSpeaker.objects.in_bulk(
+            {speaker for _, data in batch for speaker in data["show_speakers"]}
+        )
+
+        show_days = [data["show_day"] for _, data in batch]
+        date_from, date_to = min(show_days), max(show_days)
+        speaker_index = SpeakerScheduleIndex.load(
+            date_from, date_to, show_speakers=list(show_speakers)
+        )
+        dome_index = DomeScheduleIndex.load(
+            date_from,
+            date_to,
+            planetarium_domes=[
+                planetarium_dome.id
+                for domes in planetarium_domes.values()
+                for planetarium_dome in domes
+            ]
+        )
+
+        show_sessions = []
+        for number, data in batch:
+            errors = {}
+            astronomy_show_id = astronomy_shows.get(data["astronomy_show"])
+            if astronomy_show_id is None:
+                errors["astronomy_show"] = [
+                    f"Astronomy show {data['astronomy_show']} doesn't exist."
+                ]
+            domes = planetarium_domes.get(data["planetarium_dome"], [])
+            if len(domes) != 1:
+                errors["planetarium_dome"] = [
+                    f"Planetarium dome {data['planetarium_dome']} "
+                    + ("doesn't exist." if not domes else "is ambiguous.")
+                ]
+            missing = [
+                speaker for speaker in data["show_speakers"]
+                if speaker not in show_speakers
+            ]
+            if missing:
+                errors["show_speakers"] = [
+                    f"Show speaker {speaker} doesn't exist."
+                    for speaker in missing
+                ]
+            if errors:
+                self.reject(number, errors)
+                continue
+
+            speakers = [
+                show_speakers[speaker]
+                for speaker in dict.fromkeys(data["show_speakers"])
+            ]
+            show_session = ShowSession(
+                astronomy_show_id=astronomy_show_id,
+                planetarium_dome=domes[0],
+                show_day=data["show_day"],
+                time_start=data["time_start"],
+                time_end=data["time_end"]
+            )
+            try:
+                dome_index.validate_planetarium_dome(
+                    domes[0],
+                    show_session.show_day,
+                    show_session.time_start,
+                    show_session.time_end
+                )
+                speaker_index.validate_show_speakers(
+                    speakers,
+                    show_session.show_day,
+                    show_session.time_start,
+                    show_session.time_end
+                )
+            except ValidationError as error:
+                self.reject(number, {"non_field_errors": error.messages})
+                continue
+
+            dome_index.add_show_session(domes[0], show_session)
+            speaker_index.add_show_session(speakers, show_session)
+            show_sessions.append((show_session, speakers))
+
+        if show_sessions:
+            self.insert(show_sessions)
+
+    def insert(self, show_sessions):
+        """
+        Function to insert sessions with their speakers, bulk_create
+        skips signals, so daily schedule and versions are updated here
+        """
+        through = ShowSession.show_speakers.through
+        with transaction.atomic():
+            created = ShowSession.objects.bulk_create(
+                show_session for show_session, _ in show_sessions
+            )
+            through.objects.bulk_create(
+                through(showsession_id=show_session.id, showspeaker=speaker)
+                for show_session, speakers in show_sessions
+                for speaker in speakers
+            )
+            DailySchedule.refresh(
+                [show_session.id for show_session in created]
+            )
+            versions.invalidate(ShowSession)
+
+        self.created += len(created)
+
+
+def import_show_sessions(file, file_format, batch_size=BATCH_SIZE):
+    """
+    Function to import show sessions from file,
+    returns report {"created": n, "failed": n, "errors": [...]}
+    """
+    return ShowSessionImport(batch_size).run(read_rows(file, file_format))
@@ -0,0 +1,20 @@
+"""Command to store show session of reservations created without it"""
+
+from django.core.management.base import BaseCommand
+
+from planetarium.models import Reservation
+
+
+class Command(BaseCommand):
+    help = (
+        "Set show session of reservations which don't have it "
+        "from their tickets. Run it once after adding the column."
+    )
+
+    def handle(self, *args, **options):
+        updated = Reservation.backfill_show_sessions()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Stored show session of {updated} reservations"
+            )
+        )
@@ -0,0 +1,124 @@
+"""Command to explain queries of API endpoints and propose indexes"""
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from planetarium.query_plans import (
+    MIN_ROWS,
+    format_index,
+    format_operation,
+    format_plan,
+    get_cases,
+    inspect,
+    isolated_caches
+)
+from planetarium.seeding import seed
+
+
+class Rollback(Exception):
+    """Raised to roll back seeded data"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Run GET requests to API endpoints, explain their queries with "
+        "EXPLAIN (ANALYZE, BUFFERS) and propose missing indexes. "
+        "Nothing is saved to database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "cases",
+            nargs="*",
+            help="Names of cases or their prefixes (default: all)"
+        )
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=0,
+            help=(
+                "Seed synthetic data of this scale before explaining "
+                "(default: use data of database)"
+            )
+        )
+        parser.add_argument(
+            "--min-rows",
+            type=int,
+            default=MIN_ROWS,
+            help=(
+                "Sequential scans of smaller tables aren't problems "
+                f"(default: {MIN_ROWS})"
+            )
+        )
+        parser.add_argument(
+            "--plans",
+            action="store_true",
+            help="Print plans of all queries"
+        )
+
+    def handle(self, *args, **options):
+        # Seeding bumps versions of models too
+        try:
+            with isolated_caches(), transaction.atomic():
+                if options["scale"]:
+                    seed(options["scale"])
+                    with connection.cursor() as cursor:
+                        cursor.execute("ANALYZE")
+                self.explain(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def explain(self, options):
+        cases = [
+            (case, url) for case, url in get_cases()
+            if not options["cases"] or any(
+                case.startswith(prefix) for prefix in options["cases"]
+            )
+        ]
+        if not cases:
+            self.stdout.write(self.style.WARNING(
+                "Nothing to explain, database has no tickets"
+            ))
+            return
+
+        indexes = {}
+        results = inspect(cases, options["min_rows"])
+        for case, explained in results.items():
+            problems = sum(len(query.problems) for query in explained)
+            total = sum(
+                query.plan.get("Execution Time", 0) for query in explained
+            )
+            self.stdout.write(
+                self.style.MIGRATE_HEADING(case)
+                + f" {len(explained)} queries, {total:.3f} ms"
+                + (
+                    self.style.ERROR(f", {problems} problems")
+                    if problems else ""
+                )
+            )
+            for query in explained:
+                if options["plans"]:
+                    self.stdout.write(f"  {query.sql}")
+                    for line in format_plan(query.plan):
+                        self.stdout.write(f"    {line}")
+                for problem in query.problems:
+                    self.stdout.write(self.style.WARNING(
+                        f"  {problem.kind}: {problem.message}"
+                    ))
+                    if problem.index:
+                        indexes[problem.index[2]] = problem.index
+
+        if not indexes:
+            self.stdout.write(self.style.SUCCESS("No missing indexes found"))
+            return
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Proposed indexes"))
+        for index in indexes.values():
+            self.stdout.write(f"  {format_index(*index)}")
+        self.stdout.write(
+            "Add them to Meta.indexes of models and run makemigrations, "
+            "or add operations to migration:"
+        )
+        for index in indexes.values():
+            self.stdout.write(f"  {format_operation(*index)}")
@@ -0,0 +1,79 @@
+"""Command to import show sessions from CSV or JSON Lines file"""
+
+import json
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from planetarium.imports import (
+    BATCH_SIZE,
+    FORMATS,
+    get_format,
+    import_show_sessions
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Import show sessions from CSV or JSON Lines file in batches. "
+        "Valid rows are created, rejected rows are reported."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            dest="file_format",
+            help="Format of file (default: by file extension)"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help=(
+                "Rows validated and inserted together "
+                f"(default: {BATCH_SIZE})"
+            )
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate rows without saving sessions"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            file_format = get_format(options["path"], options["file_format"])
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        # Batches are committed one by one like imports through API,
+        # the whole dry run is rolled back
+        atomic = (
+            transaction.atomic() if options["dry_run"] else nullcontext()
+        )
+        try:
+            with open(options["path"], "rb") as file, atomic:
+                report = import_show_sessions(
+                    file, file_format, options["batch_size"]
+                )
+                if options["dry_run"]:
+                    transaction.set_rollback(True)
+        except OSError as error:
+            raise CommandError(str(error))
+
+        for error in report["errors"]:
+            self.stdout.write(
+                self.style.ERROR(
+                    f"  row {error['row']}: {json.dumps(error['errors'])}"
+                )
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                ("Validated " if options["dry_run"] else "Created ")
+                + f"{report['created']} show sessions, "
+                f"{report['failed']} rows rejected"
+            )
+        )
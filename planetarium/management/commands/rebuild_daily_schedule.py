@@ -0,0 +1,30 @@
+"""Command to rebuild daily schedule of show sessions from its sources"""
+
+from django.core.management.base import BaseCommand
+
+from planetarium.models import DailySchedule
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild rows of daily schedule from show sessions, shows, domes, "
+        "speakers and counters of tickets. Use it for repair after "
+        "they were changed bypassing models."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--show-session",
+            type=int,
+            nargs="+",
+            dest="show_session_ids",
+            help="Ids of show sessions to rebuild (default: all)"
+        )
+
+    def handle(self, *args, **options):
+        rows = DailySchedule.refresh(options["show_session_ids"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt daily schedule of {len(rows)} show sessions"
+            )
+        )
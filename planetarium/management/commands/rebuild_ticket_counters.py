@@ -0,0 +1,33 @@
+"""Command to recount tickets sold for show sessions from tickets"""
+
+from django.core.management.base import BaseCommand
+
+from planetarium.models import DailySchedule, ShowSessionTicketCounter
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild counters of tickets sold for show sessions from tickets. "
+        "Use it for repair after tickets were changed bypassing models."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--show-session",
+            type=int,
+            nargs="+",
+            dest="show_session_ids",
+            help="Ids of show sessions to rebuild (default: all)"
+        )
+
+    def handle(self, *args, **options):
+        counters = ShowSessionTicketCounter.rebuild(
+            options["show_session_ids"]
+        )
+        # Tickets available of daily schedule are counted from counters
+        DailySchedule.refresh(options["show_session_ids"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt tickets sold for {len(counters)} show sessions"
+            )
+        )
@@ -0,0 +1,172 @@
+"""Command to run benchmarks of planetarium hot paths"""
+
+import json
+import subprocess
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from planetarium.benchmarks import BENCHMARKS
+from planetarium.seeding import seed
+
+
+class Rollback(Exception):
+    """Raised to roll back everything benchmark created"""
+
+
+def get_commit():
+    """Function to get commit of working tree, None outside of git"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def find_regressions(results, baseline, threshold):
+    """
+    Function to compare results with baseline results of the same cases,
+    case regresses when its p50 is slower more than by threshold percent
+    or it makes more queries
+    """
+    regressions = []
+    for name, cases in results.items():
+        baseline_cases = {
+            result["case"]: result
+            for result in baseline.get(name, [])
+        }
+        for result in cases:
+            before = baseline_cases.get(result["case"])
+            if before is None:
+                continue
+            if result["p50_ms"] > before["p50_ms"] * (1 + threshold / 100):
+                regressions.append(
+                    f"{name} {result['case']}: p50 {before['p50_ms']:.3f} "
+                    f"-> {result['p50_ms']:.3f} ms"
+                )
+            if result["queries"] > before["queries"]:
+                regressions.append(
+                    f"{name} {result['case']}: queries {before['queries']} "
+                    f"-> {result['queries']}"
+                )
+    return regressions
+
+
+class Command(BaseCommand):
+    help = "Run benchmarks, nothing they create is saved to database"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "names",
+            nargs="*",
+            help=f"Benchmarks to run: {', '.join(BENCHMARKS)} (default: all)"
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="How many times every case is run"
+        )
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=0,
+            help=(
+                "Seed synthetic data of this scale before benchmarks, "
+                "1 is thousands of shows and sessions and a million "
+                "of tickets (default: use data of database)"
+            )
+        )
+        parser.add_argument(
+            "--output",
+            help="Save results to JSON file"
+        )
+        parser.add_argument(
+            "--compare",
+            help="JSON file with results of other commit, fail on regressions"
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=20,
+            help="Percent of p50 slowdown which is regression (default: 20)"
+        )
+
+    def handle(self, *args, **options):
+        names = options["names"] or list(BENCHMARKS)
+        unknown = set(names) - set(BENCHMARKS)
+        if unknown:
+            raise CommandError(f"Unknown benchmarks: {', '.join(unknown)}")
+
+        baseline = None
+        if options["compare"]:
+            with open(options["compare"]) as file:
+                baseline = json.load(file)["benchmarks"]
+
+        results = {}
+        try:
+            with transaction.atomic():
+                if options["scale"]:
+                    counts = seed(options["scale"])
+                    self.stdout.write(
+                        "Seeded " + ", ".join(
+                            f"{count} {name}" for name, count in counts.items()
+                        )
+                    )
+                for name in names:
+                    results[name] = self.run_benchmark(name, options["repeat"])
+                raise Rollback
+        except Rollback:
+            pass
+
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(
+                    {
+                        "commit": get_commit(),
+                        "created_at": timezone.now().isoformat(),
+                        "repeat": options["repeat"],
+                        "scale": options["scale"],
+                        "benchmarks": results,
+                    },
+                    file,
+                    indent=2
+                )
+
+        if baseline is not None:
+            regressions = find_regressions(
+                results, baseline, options["threshold"]
+            )
+            for regression in regressions:
+                self.stdout.write(self.style.ERROR(f"  {regression}"))
+            if regressions:
+                raise CommandError(f"{len(regressions)} regressions found")
+            self.stdout.write(self.style.SUCCESS("No regressions found"))
+
+    def run_benchmark(self, name, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(name))
+        try:
+            with transaction.atomic():
+                results = BENCHMARKS[name](repeat)
+                raise Rollback
+        except Rollback:
+            pass
+
+        for result in results:
+            line = (
+                f"  {result['case']:<40} "
+                f"p50 {result['p50_ms']:>9.3f} ms  "
+                f"p99 {result['p99_ms']:>9.3f} ms  "
+                f"queries {result['queries']:>5}  "
+                f"peak {result['peak_kb']:>9.1f} KB"
+            )
+            # Cases of payloads report their size
+            if "bytes" in result:
+                line += f"  size {result['bytes']:>9} B"
+            self.stdout.write(line)
+        return results
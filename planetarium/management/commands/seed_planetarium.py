@@ -0,0 +1,58 @@
+"""Command to fill database with synthetic planetarium data"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from planetarium.seeding import VOLUMES, seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Create synthetic domes, themes, speakers, shows, sessions, "
+        "users, reservations and tickets. The same seed and volumes "
+        "give the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1,
+            help=(
+                "Multiplier of default volumes: "
+                + ", ".join(
+                    f"{volume} {name}" for name, volume in VOLUMES.items()
+                )
+            )
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Random seed, data of different seeds can be loaded together"
+        )
+        for name in VOLUMES:
+            parser.add_argument(
+                f"--{name.replace('_', '-')}",
+                type=int,
+                dest=name,
+                help=f"Number of {name.replace('_', ' ')} (overrides scale)"
+            )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        counts = seed(
+            options["scale"],
+            options["seed"],
+            **{name: options[name] for name in VOLUMES}
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Created "
+                + ", ".join(
+                    f"{count} {name}" for name, count in counts.items()
+                )
+                + f" in {time.perf_counter() - started:.1f} s"
+            )
+        )
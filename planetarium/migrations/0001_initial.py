@@ -0,0 +1,118 @@
+# Generated by Django 5.0.6 on 2026-10-18 06:58
+
+import django.db.models.deletion
+import planetarium.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AstronomyShow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=30, unique=True)),
+                ('description', models.TextField()),
+                ('poster', models.ImageField(blank=True, null=True, upload_to=planetarium.models.astronomy_show_image_file_path)),
+                ('poster_variants', models.JSONField(blank=True, editable=False, null=True)),
+            ],
+            options={
+                'ordering': ['title'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ShowSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('show_day', models.DateField()),
+                ('time_start', models.TimeField()),
+                ('time_end', models.TimeField()),
+                ('astronomy_show', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='show_sessions', to='planetarium.astronomyshow')),
+            ],
+            options={
+                'ordering': ['-show_day', '-time_start', '-time_end'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PlanetariumDome',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=30)),
+                ('rows', models.IntegerField()),
+                ('seats_in_row', models.IntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ShowSessionTicketCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('tickets_sold', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ShowSpeaker',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_name', models.CharField(max_length=30)),
+                ('last_name', models.CharField(max_length=30)),
+                ('profession', models.CharField(max_length=30)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ShowTheme',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=30, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Ticket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('row', models.IntegerField()),
+                ('seat', models.IntegerField()),
+            ],
+            options={
+                'ordering': ['row', 'seat'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySchedule',
+            fields=[
+                ('show_session', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='daily_schedule', serialize=False, to='planetarium.showsession')),
+                ('show_day', models.DateField()),
+                ('time_start', models.TimeField()),
+                ('time_end', models.TimeField()),
+                ('astronomy_show_title', models.CharField(max_length=30)),
+                ('planetarium_dome_name', models.CharField(max_length=30)),
+                ('show_speakers', models.JSONField(default=list)),
+                ('tickets_available', models.IntegerField()),
+            ],
+            options={
+                'ordering': ['-show_day', '-time_start', '-time_end'],
+            },
+        ),
+        migrations.AddField(
+            model_name='showsession',
+            name='planetarium_dome',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='planetarium_dome', to='planetarium.planetariumdome'),
+        ),
+        migrations.CreateModel(
+            name='Reservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('show_session', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reservations', to='planetarium.showsession')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
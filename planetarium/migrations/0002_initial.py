@@ -0,0 +1,82 @@
+# Generated by Django 5.0.6 on 2026-10-18 06:58
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('planetarium', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='showsessionticketcounter',
+            name='show_session',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ticket_counters', to='planetarium.showsession'),
+        ),
+        migrations.AddIndex(
+            model_name='showspeaker',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('first_name', 'last_name', 'profession', config='simple'), name='showspeaker_search_idx'),
+        ),
+        migrations.AddField(
+            model_name='showsession',
+            name='show_speakers',
+            field=models.ManyToManyField(blank=True, related_name='speakers_show', to='planetarium.showspeaker'),
+        ),
+        migrations.AddIndex(
+            model_name='showtheme',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('name', config='simple'), name='showtheme_search_idx'),
+        ),
+        migrations.AddField(
+            model_name='astronomyshow',
+            name='show_themes',
+            field=models.ManyToManyField(related_name='show_themes', to='planetarium.showtheme'),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='reservation',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tickets', to='planetarium.reservation'),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='show_session',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tickets', to='planetarium.showsession'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyschedule',
+            index=models.Index(fields=['-show_day', '-time_start', '-time_end', 'show_session'], name='dailyschedule_day_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['-created_at', 'id'], name='reservation_created_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='showsessionticketcounter',
+            unique_together={('show_session', 'shard')},
+        ),
+        migrations.AddIndex(
+            model_name='showsession',
+            index=models.Index(fields=['-show_day', '-time_start', '-time_end', 'id'], name='showsession_schedule_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='astronomyshow',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('title', config='simple'), name='astronomyshow_search_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='ticket',
+            unique_together={('show_session', 'row', 'seat')},
+        ),
+    ]
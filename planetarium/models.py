@@ -1,9 +1,16 @@
 """All models of Planetarium project"""
 
 import os
+import random
 import uuid
-
-from django.db import models
+from collections import Counter
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import models, transaction
+from django.db.models import Exists, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
 from django.utils.text import slugify
 from django.core.exceptions import ValidationError
 
@@ -26,6 +33,16 @@ class ShowSpeaker(models.Model):
     last_name = models.CharField(max_length=30)
     profession = models.CharField(max_length=30)
 
+    class Meta:
+        indexes = [
+            GinIndex(
+                SearchVector(
+                    "first_name", "last_name", "profession", config="simple"
+                ),
+                name="showspeaker_search_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
@@ -44,6 +61,14 @@ class ShowTheme(models.Model):
         unique=True
     )
 
+    class Meta:
+        indexes = [
+            GinIndex(
+                SearchVector("name", config="simple"),
+                name="showtheme_search_idx"
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -61,6 +86,11 @@ class AstronomyShow(models.Model):
         null=True,
         upload_to=astronomy_show_image_file_path
     )
+    poster_variants = models.JSONField(
+        blank=True,
+        null=True,
+        editable=False
+    )
     show_themes = models.ManyToManyField(
         ShowTheme,
         related_name="show_themes"
@@ -68,6 +98,12 @@ class AstronomyShow(models.Model):
 
     class Meta:
         ordering = ["title"]
+        indexes = [
+            GinIndex(
+                SearchVector("title", config="simple"),
+                name="astronomyshow_search_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -121,46 +157,348 @@ class ShowSession(models.Model):
             "-time_start",
             "-time_end"
         ]
+        indexes = [
+            models.Index(
+                fields=["-show_day", "-time_start", "-time_end", "id"],
+                name="showsession_schedule_idx"
+            ),
+        ]
 
     @staticmethod
-    def validate_show_speakers(show_speakers, show_day, time_start, time_end):
+    def validate_show_speakers(
+            show_speakers,
+            show_day,
+            time_start,
+            time_end,
+            exclude_show_session_id=None
+    ):
         """
         Function to validate whether speakers which should host the show
         will host different session in same time.
         It's important for normal sessions handling.
+        All speakers are checked with one query, sessions overlap
+        when each of them starts before the other one ends.
+        """
+        if None in (show_day, time_start, time_end):
+            return
+
+        conflicts = ShowSession.show_speakers.through.objects.filter(
+            showspeaker__in=show_speakers,
+            showsession__show_day=show_day,
+            showsession__time_start__lt=time_end,
+            showsession__time_end__gt=time_start,
+        )
+        if exclude_show_session_id is not None:
+            conflicts = conflicts.exclude(
+                showsession_id=exclude_show_session_id
+            )
+
+        conflict = conflicts.select_related("showspeaker").first()
+        if conflict:
+            speaker = conflict.showspeaker
+            raise ValidationError(
+                f"Speaker {speaker.first_name} {speaker.last_name} "
+                f"has another show scheduled on the same day and time."
+            )
+
+    @staticmethod
+    def lock_for_booking(show_session_ids, using=None):
+        """
+        Function to lock show sessions until the end of transaction,
+        so seats of one session are checked and booked by one
+        transaction at a time. Rows are locked in order of id,
+        so transactions booking several sessions don't deadlock.
+        NO KEY UPDATE lock doesn't block foreign key checks of other rows.
+        """
+        list(
+            ShowSession.objects.using(using)
+            .select_for_update(no_key=True)
+            .filter(id__in=show_session_ids)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+    @staticmethod
+    def get_show_speakers_data(show_session_ids=None):
+        """
+        Function to take full names and professions of speakers
+        of show sessions with one query, ordered by speaker id.
+        Returns {show_session_id: [{"full_name", "profession"}]}
         """
-        for speaker in show_speakers:
-            other_speaker_shows = speaker.speakers_show.filter(
-                show_day=show_day
+        show_speakers = ShowSession.show_speakers.through.objects.order_by(
+            "showsession_id", "showspeaker_id"
+        )
+        if show_session_ids is not None:
+            show_speakers = show_speakers.filter(
+                showsession_id__in=show_session_ids
             )
-            for other_show in other_speaker_shows:
-                if (
-                        time_start <= other_show.time_start <= time_end or
-                        time_start <= other_show.time_end <= time_end
-                ):
-                    raise ValidationError(
-                        f"Speaker {speaker.first_name} {speaker.last_name} "
-                        f"has another show scheduled on the same day and time."
-                    )
+
+        speakers = {}
+        for show_session_id, first_name, last_name, profession in (
+                show_speakers.values_list(
+                    "showsession_id",
+                    "showspeaker__first_name",
+                    "showspeaker__last_name",
+                    "showspeaker__profession"
+                )
+        ):
+            speakers.setdefault(show_session_id, []).append({
+                "full_name": f"{first_name} {last_name}",
+                "profession": profession,
+            })
+        return speakers
 
     def clean(self):
+        if self.pk is None:
+            # New session doesn't have speakers yet,
+            # they are validated before adding
+            return
+
         self.validate_show_speakers(
             self.show_speakers.all(),
             self.show_day,
             self.time_start,
-            self.time_end
+            self.time_end,
+            exclude_show_session_id=self.pk
         )
 
-    def save(self, *args, **kwargs):
-        super(ShowSession, self).save(*args, **kwargs)
-        self.clean()
-
     def __str__(self):
         return (f"{self.astronomy_show.title} "
                 f"{str(self.show_day)} at"
                 f" {self.time_start}")
 
 
+# Sent with show_session_id when tickets of show session are sold or cancelled
+# (with delta of tickets sold) or its seats are held (without delta)
+tickets_sold_changed = Signal()
+
+
+class ShowSessionTicketCounter(models.Model):
+
+    """
+    Shard of counter of tickets sold for show session.
+    Counter is split into several rows, so concurrent reservations
+    for the same session don't wait for each other on one row lock.
+    Sum of all shards of session is number of its tickets.
+    """
+
+    SHARDS = 8
+
+    show_session = models.ForeignKey(
+        ShowSession,
+        on_delete=models.CASCADE,
+        related_name="ticket_counters"
+    )
+    shard = models.PositiveSmallIntegerField()
+    tickets_sold = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("show_session", "shard")
+
+    @classmethod
+    def add(cls, show_session_id, delta):
+        """Function to change tickets sold of show session by delta"""
+        if not delta:
+            return
+
+        shard = random.randrange(cls.SHARDS)
+        counter = cls.objects.filter(
+            show_session_id=show_session_id, shard=shard
+        )
+        if not counter.update(tickets_sold=F("tickets_sold") + delta):
+            if delta < 0:
+                # Any shard can be decreased, shards aren't created for it:
+                # when show session is deleted, its counters may be
+                # deleted before its tickets
+                cls.objects.filter(
+                    pk__in=cls.objects.filter(
+                        show_session_id=show_session_id
+                    ).values("pk")[:1]
+                ).update(tickets_sold=F("tickets_sold") + delta)
+            else:
+                cls.objects.bulk_create(
+                    [cls(show_session_id=show_session_id, shard=shard)],
+                    ignore_conflicts=True
+                )
+                counter.update(tickets_sold=F("tickets_sold") + delta)
+
+        tickets_sold_changed.send(
+            sender=ShowSession, show_session_id=show_session_id, delta=delta
+        )
+
+    @classmethod
+    def add_tickets(cls, tickets):
+        """Function to count tickets per show session"""
+        cls.add_many(Counter(ticket.show_session_id for ticket in tickets))
+
+    @classmethod
+    def add_many(cls, deltas):
+        """
+        Function to change tickets sold of several show sessions
+        by {show_session_id: delta}, one update per show session
+        """
+        for show_session_id in sorted(deltas):
+            cls.add(show_session_id, deltas[show_session_id])
+
+    @classmethod
+    def tickets_sold_expression(cls, show_session_ref="pk"):
+        """
+        Expression with sum of all shards of show session
+        for annotating show sessions queryset
+        """
+        return Coalesce(
+            Subquery(
+                cls.objects.filter(show_session_id=OuterRef(show_session_ref))
+                .order_by()
+                .values("show_session_id")
+                .annotate(total=Sum("tickets_sold"))
+                .values("total")
+            ),
+            0
+        )
+
+    @classmethod
+    def rebuild(cls, show_session_ids=None):
+        """
+        Function to recount tickets sold from tickets themselves.
+        All shards of session are replaced with the only one.
+        """
+        tickets = Ticket.objects.order_by()
+        counters = cls.objects.all()
+        if show_session_ids is not None:
+            tickets = tickets.filter(show_session_id__in=show_session_ids)
+            counters = counters.filter(show_session_id__in=show_session_ids)
+
+        with transaction.atomic():
+            counters.delete()
+            return cls.objects.bulk_create(
+                cls(
+                    show_session_id=show_session_id,
+                    shard=0,
+                    tickets_sold=tickets_sold
+                )
+                for show_session_id, tickets_sold in tickets.values(
+                    "show_session_id"
+                ).annotate(
+                    tickets_sold=models.Count("id")
+                ).values_list("show_session_id", "tickets_sold")
+            )
+
+
+class DailySchedule(models.Model):
+
+    """
+    Projection of show session for schedule of the day.
+    Row keeps everything shown in show sessions list (show title,
+    dome name, speakers and tickets available), so sessions of the day
+    are read by range of one index without joins and aggregation.
+    Rows are updated by signals when their sources are changed
+    (look at planetarium.daily_schedule).
+    """
+
+    show_session = models.OneToOneField(
+        ShowSession,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="daily_schedule"
+    )
+    show_day = models.DateField()
+    time_start = models.TimeField()
+    time_end = models.TimeField()
+    astronomy_show_title = models.CharField(max_length=30)
+    planetarium_dome_name = models.CharField(max_length=30)
+    show_speakers = models.JSONField(default=list)
+    tickets_available = models.IntegerField()
+
+    class Meta:
+        ordering = [
+            "-show_day",
+            "-time_start",
+            "-time_end"
+        ]
+        indexes = [
+            models.Index(
+                fields=[
+                    "-show_day", "-time_start", "-time_end", "show_session"
+                ],
+                name="dailyschedule_day_idx"
+            ),
+        ]
+
+    @classmethod
+    def refresh(cls, show_session_ids=None):
+        """
+        Function to build rows of show sessions from their sources,
+        existing rows are overwritten
+        """
+        show_sessions = ShowSession.objects.order_by().annotate(
+            astronomy_show_title=F("astronomy_show__title"),
+            planetarium_dome_name=F("planetarium_dome__name"),
+            tickets_available=(
+                F("planetarium_dome__rows")
+                * F("planetarium_dome__seats_in_row")
+                - ShowSessionTicketCounter.tickets_sold_expression()
+            )
+        )
+        if show_session_ids is not None:
+            show_sessions = show_sessions.filter(id__in=show_session_ids)
+        speakers = ShowSession.get_show_speakers_data(show_session_ids)
+
+        return cls.objects.bulk_create(
+            (
+                cls(
+                    show_session_id=show_session_id,
+                    show_day=show_day,
+                    time_start=time_start,
+                    time_end=time_end,
+                    astronomy_show_title=astronomy_show_title,
+                    planetarium_dome_name=planetarium_dome_name,
+                    show_speakers=speakers.get(show_session_id, []),
+                    tickets_available=tickets_available
+                )
+                for (
+                    show_session_id,
+                    show_day,
+                    time_start,
+                    time_end,
+                    astronomy_show_title,
+                    planetarium_dome_name,
+                    tickets_available
+                ) in show_sessions.values_list(
+                    "id",
+                    "show_day",
+                    "time_start",
+                    "time_end",
+                    "astronomy_show_title",
+                    "planetarium_dome_name",
+                    "tickets_available"
+                )
+            ),
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["show_session"],
+            update_fields=[
+                "show_day",
+                "time_start",
+                "time_end",
+                "astronomy_show_title",
+                "planetarium_dome_name",
+                "show_speakers",
+                "tickets_available",
+            ]
+        )
+
+    @classmethod
+    def add_tickets_sold(cls, show_session_id, delta):
+        """
+        Function to change tickets available of show session,
+        its row is locked by booking transaction already
+        """
+        cls.objects.filter(show_session_id=show_session_id).update(
+            tickets_available=F("tickets_available") - delta
+        )
+
+
 class Reservation(models.Model):
 
     """
@@ -178,12 +516,42 @@ class Reservation(models.Model):
         null=True,
         blank=True
     )
+    show_session = models.ForeignKey(
+        ShowSession,
+        on_delete=models.SET_NULL,
+        related_name="reservations",
+        null=True,
+        blank=True
+    )
+
+    @classmethod
+    def backfill_show_sessions(cls):
+        """
+        Function to set show session of reservations created before
+        it was stored, it's taken from any of their tickets
+        with one UPDATE. Returns number of updated reservations.
+        """
+        # Without ordering ticket is found by index of reservation
+        tickets = Ticket.objects.filter(
+            reservation=OuterRef("pk")
+        ).order_by()
+        return cls.objects.filter(
+            Exists(tickets), show_session__isnull=True
+        ).update(
+            show_session_id=Subquery(tickets.values("show_session_id")[:1])
+        )
 
     def __str__(self):
         return str(self.created_at)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["-created_at", "id"],
+                name="reservation_created_idx"
+            ),
+        ]
 
 
 class Ticket(models.Model):
@@ -206,6 +574,27 @@ class Ticket(models.Model):
         related_name="tickets"
     )
 
+    @staticmethod
+    def find_taken_seats(seats):
+        """
+        Function to find which of (show_session_id, row, seat)
+        are already taken using one query
+        """
+        if not seats:
+            return set()
+
+        show_session_ids = {show_session_id for show_session_id, _, _ in seats}
+        rows = {row for _, row, _ in seats}
+        seat_numbers = {seat for _, _, seat in seats}
+
+        candidates = Ticket.objects.filter(
+            show_session_id__in=show_session_ids,
+            row__in=rows,
+            seat__in=seat_numbers
+        ).order_by().values_list("show_session_id", "row", "seat")
+
+        return set(candidates) & set(seats)
+
     @staticmethod
     def validate_ticket(row, seat, planetarium_dome, error_to_raise):
         """
@@ -250,10 +639,16 @@ class Ticket(models.Model):
             using=None,
             update_fields=None,
     ):
-        self.full_clean()
-        return super(Ticket, self).save(
-            force_insert, force_update, using, update_fields
-        )
+        adding = self._state.adding
+        with transaction.atomic(using=using):
+            if adding:
+                ShowSession.lock_for_booking([self.show_session_id], using)
+            self.full_clean()
+            super(Ticket, self).save(
+                force_insert, force_update, using, update_fields
+            )
+            if adding:
+                ShowSessionTicketCounter.add(self.show_session_id, 1)
 
     def __str__(self):
         return (
@@ -263,3 +658,41 @@ class Ticket(models.Model):
     class Meta:
         unique_together = ("show_session", "row", "seat")
         ordering = ["row", "seat"]
+
+
+def subtract_deleted_ticket(sender, instance, origin=None, **kwargs):
+    """
+    Function to return seat of ticket deleted by itself or with queryset
+    of tickets. Tickets deleted with their reservations (reservation,
+    its queryset or user) are returned by reservations at once,
+    counters of deleted show sessions are deleted with them.
+    """
+    if isinstance(origin, models.QuerySet):
+        origin = origin.model
+    elif origin is not None:
+        origin = type(origin)
+    if origin is Ticket:
+        ShowSessionTicketCounter.add(instance.show_session_id, -1)
+
+
+def remember_reservation_tickets(sender, instance, **kwargs):
+    # Tickets are deleted before reservation, they are counted before
+    instance._tickets_sold = dict(
+        Ticket.objects.filter(reservation_id=instance.pk)
+        .order_by()
+        .values("show_session_id")
+        .annotate(count=models.Count("id"))
+        .values_list("show_session_id", "count")
+    )
+
+
+def subtract_reservation_tickets(sender, instance, **kwargs):
+    """Function to return seats of deleted reservation per show session"""
+    ShowSessionTicketCounter.add_many(
+        {
+            show_session_id: -count
+            for show_session_id, count in getattr(
+                instance, "_tickets_sold", {}
+            ).items()
+        }
+    )
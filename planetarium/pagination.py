@@ -0,0 +1,185 @@
+"""
+Pagination classes of planetarium API.
+
+Page number pagination counts all rows and scans OFFSET rows
+for every page, so deep pages become slower and slower.
+With `cursor` query parameter (empty for the first page)
+the same endpoints switch to keyset pagination: next page is
+selected by values of ordering fields of the last row,
+so every page costs the same and no COUNT is run.
+"""
+
+import base64
+import json
+import operator
+from functools import reduce
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class PageNumberOrKeysetPagination(PageNumberPagination):
+
+    """
+    Page number pagination with opt-in keyset mode.
+    Keyset ordering must end with unique field (usually "id").
+    """
+
+    keyset_ordering = ()
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        queryset, position, reverse = self.keyset_queryset(queryset, request)
+        return self.keyset_page(
+            list(queryset[:self.page_size + 1]), position, reverse
+        )
+
+    def keyset_queryset(self, queryset, request):
+        """
+        Function to order queryset by keyset and filter rows
+        after position of cursor, returns it with position and direction
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(
+            request.query_params[self.cursor_query_param],
+            queryset.model
+        )
+
+        ordering = [
+            (name.lstrip("-"), name.startswith("-") != reverse)
+            for name in self.keyset_ordering
+        ]
+        queryset = queryset.order_by(
+            *[f"-{name}" if descending else name
+              for name, descending in ordering]
+        )
+        if position is not None:
+            queryset = queryset.filter(
+                self.after_position(ordering, position)
+            )
+        return queryset, position, reverse
+
+    def keyset_page(self, results, position, reverse):
+        """
+        Function to cut page from rows read by keyset queryset
+        (one row more than page size) and remember its neighbours
+        """
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        self.next_position = self.previous_position = None
+        if results:
+            if has_more or reverse:
+                self.next_position = self.position_of(results[-1])
+            if position is not None and (has_more or not reverse):
+                self.previous_position = self.position_of(results[0])
+
+        return results
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+
+        return Response({
+            "next": self.get_cursor_link(self.next_position, reverse=False),
+            "previous": self.get_cursor_link(
+                self.previous_position, reverse=True
+            ),
+            "results": data,
+        })
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": (
+                    "Switch to keyset pagination, "
+                    "empty value for the first page"
+                ),
+                "schema": {"type": "string"},
+            }
+        ]
+
+    @staticmethod
+    def after_position(ordering, position):
+        """
+        Function to build filter of rows which go after position
+        in given ordering, e.g. for (-a, b) after (x, y):
+        a < x OR (a = x AND b > y)
+        """
+        conditions = []
+        equal = Q()
+        for (name, descending), value in zip(ordering, position):
+            lookup = "lt" if descending else "gt"
+            conditions.append(equal & Q(**{f"{name}__{lookup}": value}))
+            equal &= Q(**{name: value})
+        return reduce(operator.or_, conditions)
+
+    def position_of(self, instance):
+        # Rows of values() projections are dicts
+        if isinstance(instance, dict):
+            return [
+                instance[name.lstrip("-")] for name in self.keyset_ordering
+            ]
+        return [
+            getattr(instance, name.lstrip("-"))
+            for name in self.keyset_ordering
+        ]
+
+    def decode_cursor(self, encoded, model):
+        """Function to get position and direction from opaque cursor"""
+        if not encoded:
+            return None, False
+
+        try:
+            decoded = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            values, reverse = decoded["p"], bool(decoded["r"])
+            if len(values) != len(self.keyset_ordering):
+                raise ValueError
+            position = [
+                model._meta.get_field(name.lstrip("-")).to_python(value)
+                for name, value in zip(self.keyset_ordering, values)
+            ]
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position, reverse
+
+    @staticmethod
+    def encode_cursor(position, reverse):
+        data = {
+            "p": [
+                value.isoformat() if hasattr(value, "isoformat") else value
+                for value in position
+            ],
+            "r": int(reverse),
+        }
+        return base64.urlsafe_b64encode(
+            json.dumps(data, separators=(",", ":")).encode()
+        ).decode()
+
+    def get_cursor_link(self, position, reverse):
+        if position is None:
+            return None
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(
+            url,
+            self.cursor_query_param,
+            self.encode_cursor(position, reverse)
+        )
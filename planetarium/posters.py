@@ -0,0 +1,131 @@
+"""
+Processing of astronomy show posters.
+
+Uploaded poster is stored as is and upload request returns at once.
+After commit poster is re-encoded in background worker pool
+into variants of several sizes, each in JPEG and WebP formats.
+When all variants are stored, their paths are saved
+in AstronomyShow.poster_variants:
+
+    {"thumbnail": {"jpeg": path, "webp": path}, "card": {...}, ...}
+"""
+
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from PIL import Image, ImageOps
+
+from planetarium.models import AstronomyShow
+
+POSTER_VARIANTS = {
+    "thumbnail": (160, 160),
+    "card": (480, 480),
+    "full": (1600, 1600),
+}
+
+POSTER_FORMATS = {
+    "jpeg": ("JPEG", "jpg", {"quality": 85, "optimize": True}),
+    "webp": ("WEBP", "webp", {"quality": 80, "method": 4}),
+}
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "PLANETARIUM_POSTER_WORKERS", 2),
+            thread_name_prefix="poster"
+        )
+    return _executor
+
+
+def schedule_poster_processing(astronomy_show, old_variants=None):
+    """
+    Function to process new poster in worker pool after commit
+    and delete variants of previous poster.
+    Until new variants are ready clients should use original poster.
+    """
+    storage = astronomy_show.poster.storage
+
+    def submit():
+        delete_variants(storage, old_variants or {})
+        get_executor().submit(process_poster_job, astronomy_show.id)
+
+    transaction.on_commit(submit)
+
+
+def process_poster_job(astronomy_show_id):
+    """Worker job, it uses its own database connection"""
+    try:
+        process_poster(astronomy_show_id)
+    except Exception:
+        logger.exception(
+            "Poster of astronomy show %s wasn't processed", astronomy_show_id
+        )
+    finally:
+        connection.close()
+
+
+def encode_variant(image, size, image_format, options):
+    variant = image.copy()
+    variant.thumbnail(size, Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    variant.save(buffer, format=image_format, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def process_poster(astronomy_show_id):
+    """Function to create all variants of poster and save their paths"""
+    astronomy_show = AstronomyShow.objects.get(pk=astronomy_show_id)
+    if not astronomy_show.poster:
+        return
+
+    poster = astronomy_show.poster
+    storage = poster.storage
+    directory, filename = os.path.split(poster.name)
+    stem, _ = os.path.splitext(filename)
+
+    with poster.open("rb") as poster_file:
+        image = ImageOps.exif_transpose(Image.open(poster_file))
+        image = image.convert("RGB")
+
+    variants = {}
+    for variant_name, size in POSTER_VARIANTS.items():
+        variants[variant_name] = {}
+        for format_name, (image_format, extension, options) in (
+                POSTER_FORMATS.items()
+        ):
+            variants[variant_name][format_name] = storage.save(
+                os.path.join(
+                    directory,
+                    "variants",
+                    f"{stem}-{variant_name}.{extension}"
+                ),
+                encode_variant(image, size, image_format, options)
+            )
+
+    with transaction.atomic():
+        astronomy_show = AstronomyShow.objects.select_for_update().get(
+            pk=astronomy_show_id
+        )
+        if astronomy_show.poster.name != poster.name:
+            # Poster was replaced while this one was processed
+            delete_variants(storage, variants)
+            return
+        astronomy_show.poster_variants = variants
+        astronomy_show.save(update_fields=["poster_variants"])
+
+
+def delete_variants(storage, variants):
+    for formats in variants.values():
+        for path in formats.values():
+            storage.delete(path)
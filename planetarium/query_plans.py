@@ -0,0 +1,415 @@
+"""
+Query plan inspection of API endpoints.
+
+Every case is a real GET request to an endpoint, all SELECT queries it
+runs (querysets of viewset with filters, prefetches, counts of pagination)
+are captured and run again with EXPLAIN (ANALYZE, BUFFERS). Plans are
+checked for:
+
+- sequential scans of big tables (seq_scan);
+- sorts which spill to disk (disk_sort);
+- filters which throw away most of rows read by index (filtered_rows);
+
+and indexes which would help are proposed, existing indexes
+(including ones with the same leading columns) aren't proposed again.
+Plans are meaningful on database of realistic size, look at
+planetarium.seeding. Inspection bumps versions of models, so cached
+responses aren't used, it runs with caches replaced by local memory
+ones, so versions in the shared cache of running servers aren't changed.
+"""
+
+import re
+from collections import namedtuple
+from contextlib import contextmanager
+from unittest import mock
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+
+from planetarium import versions
+from planetarium.models import Ticket
+
+Problem = namedtuple("Problem", ("kind", "table", "message", "index"))
+Explained = namedtuple("Explained", ("sql", "plan", "problems"))
+
+# Tables with less rows are read faster without index
+MIN_ROWS = 1000
+IDENTIFIER = re.compile(r"\b([a-z_][a-z0-9_]*)\b")
+
+
+def get_cases():
+    """
+    Function to get (name, url) of GET requests to all list, retrieve
+    and extra actions with their filters, objects are taken from database
+    """
+    ticket = Ticket.objects.select_related(
+        "show_session__astronomy_show"
+    ).order_by("-id").first()
+    if ticket is None:
+        return []
+
+    show_session = ticket.show_session
+    astronomy_show = show_session.astronomy_show
+    date = show_session.show_day.isoformat()
+    title = astronomy_show.title.split()[-1]
+
+    def url(name, *args, **params):
+        query = "&".join(f"{key}={value}" for key, value in params.items())
+        return reverse(f"planetarium:{name}", args=args) + (
+            f"?{query}" if params else ""
+        )
+
+    return [
+        ("show_sessions.list", url("showsession-list")),
+        ("show_sessions.list[date]", url("showsession-list", date=date)),
+        (
+            "show_sessions.list[show_title]",
+            url("showsession-list", show_title=title)
+        ),
+        (
+            "show_sessions.list[date,show_title]",
+            url("showsession-list", date=date, show_title=title)
+        ),
+        ("show_sessions.list[keyset]", url("showsession-list", cursor="")),
+        (
+            "show_sessions.retrieve",
+            url("showsession-detail", show_session.id)
+        ),
+        (
+            "show_sessions.seat_map",
+            url("showsession-seat-map", show_session.id)
+        ),
+        ("reservations.list", url("reservation-list")),
+        (
+            "reservations.list[show_title]",
+            url("reservation-list", show_title=title)
+        ),
+        (
+            "reservations.retrieve",
+            url("reservation-detail", ticket.reservation_id)
+        ),
+        ("astronomy_shows.list", url("astronomyshow-list")),
+        (
+            "astronomy_shows.list[title]",
+            url("astronomyshow-list", title=title)
+        ),
+        (
+            "astronomy_shows.retrieve",
+            url("astronomyshow-detail", astronomy_show.id)
+        ),
+        ("show_speakers.list", url("showspeaker-list")),
+        ("show_themes.list", url("showtheme-list")),
+        ("planetarium_domes.list", url("planetariumdome-list")),
+        ("search.list", url("search-list", q=title)),
+    ]
+
+
+@contextmanager
+def isolated_caches():
+    """Context manager to replace all caches with local memory ones"""
+    with override_settings(CACHES={
+        alias: {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": f"planetarium-query-plans-{alias}",
+        }
+        for alias in settings.CACHES
+    }):
+        try:
+            yield
+        finally:
+            for cache in caches.all():
+                cache.clear()
+
+
+def capture_queries(client, url):
+    """Function to get SELECT queries of request without repeats"""
+    # New versions of models, so cached responses aren't used
+    for model in apps.get_app_config("planetarium").get_models():
+        versions.bump(model)
+
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(url)
+    if response.status_code != 200:
+        raise ValueError(f"{url}: response {response.status_code}")
+
+    return list(dict.fromkeys(
+        query["sql"] for query in captured
+        if query["sql"].lstrip().upper().startswith("SELECT")
+    ))
+
+
+def explain(sql):
+    """Function to run query with EXPLAIN ANALYZE and get its JSON plan"""
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")
+        return cursor.fetchone()[0][0]
+
+
+def shorten(expression, width=100):
+    """Function to cut long expressions, e.g. lists of prefetched ids"""
+    if len(expression) <= width:
+        return expression
+    return expression[:width - 3] + "..."
+
+
+def iterate_nodes(plan, depth=0):
+    yield plan, depth
+    for child in plan.get("Plans", []):
+        yield from iterate_nodes(child, depth + 1)
+
+
+def format_plan(plan):
+    """Function to describe plan in short lines, one per node"""
+    lines = []
+    for node, depth in iterate_nodes(plan["Plan"]):
+        relation = node.get("Relation Name")
+        index = node.get("Index Name")
+        lines.append(
+            "  " * depth
+            + node["Node Type"]
+            + (f" on {relation}" if relation else "")
+            + (f" using {index}" if index else "")
+            + f" (rows {node.get('Actual Rows', 0)}"
+            + f" x {node.get('Actual Loops', 1)},"
+            + f" {node.get('Actual Total Time', 0):.3f} ms)"
+        )
+    return lines
+
+
+class IndexAdvisor:
+
+    """Checks plans and proposes indexes missing in database"""
+
+    def __init__(self, min_rows=MIN_ROWS):
+        self.min_rows = min_rows
+        self.models = {
+            model._meta.db_table: model for model in apps.get_models()
+        }
+        self.tables = {}
+
+    def get_table(self, table):
+        """Function to get (number of rows, indexes) of table"""
+        if table not in self.tables:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class "
+                    "WHERE relname = %s",
+                    [table]
+                )
+                row = cursor.fetchone()
+                indexes = [
+                    list(zip(
+                        constraint["columns"],
+                        constraint.get("orders") or ["ASC"] * len(
+                            constraint["columns"]
+                        )
+                    ))
+                    for constraint in connection.introspection.get_constraints(
+                        cursor, table
+                    ).values()
+                    if constraint["index"] or constraint["primary_key"]
+                    or constraint["unique"]
+                ]
+            self.tables[table] = (max(row[0], 0) if row else 0, indexes)
+        return self.tables[table]
+
+    def columns(self, table, expression):
+        """Function to find columns of table used in expression"""
+        model = self.models.get(table)
+        if model is None or not expression:
+            return []
+        table_columns = {field.column for field in model._meta.concrete_fields}
+        return list(dict.fromkeys(
+            name for name in IDENTIFIER.findall(expression)
+            if name in table_columns
+        ))
+
+    def is_indexed(self, table, columns):
+        """
+        Function to check whether some index starts with given
+        (column, order) pairs, index read backwards counts too
+        """
+        _, indexes = self.get_table(table)
+        reverse = {"ASC": "DESC", "DESC": "ASC", None: None}
+        backwards = [(column, reverse[order]) for column, order in columns]
+        names = [column for column, _ in columns]
+        for index in indexes:
+            leading = index[:len(columns)]
+            if leading in (columns, backwards):
+                return True
+            if all(order is None for _, order in columns) and (
+                    [column for column, _ in leading] == names
+            ):
+                return True
+        return False
+
+    def propose(self, table, columns):
+        """Function to get models.Index definition for columns of table"""
+        model = self.models[table]
+        fields = {
+            field.column: field.name for field in model._meta.concrete_fields
+        }
+        names = [
+            ("-" if order == "DESC" else "") + fields[column]
+            for column, order in columns
+        ]
+        name = "_".join(
+            [model._meta.model_name]
+            + [fields[column] for column, _ in columns]
+        )[:26] + "_idx"
+        return model, names, name
+
+    def missing_index(self, table, columns):
+        if not columns or table not in self.models:
+            return None
+        if self.is_indexed(table, columns):
+            return None
+        return self.propose(table, columns)
+
+    def check(self, plan):
+        """Function to find problems of plan"""
+        problems = []
+        for node, _ in iterate_nodes(plan["Plan"]):
+            node_type = node["Node Type"]
+            table = node.get("Relation Name")
+
+            if node_type.endswith("Seq Scan") and table:
+                rows, _ = self.get_table(table)
+                if rows >= self.min_rows:
+                    expression = node.get("Filter", "")
+                    index = None
+                    if "~~" not in expression:
+                        index = self.missing_index(
+                            table,
+                            [
+                                (column, None)
+                                for column in self.columns(table, expression)
+                            ]
+                        )
+                    problems.append(Problem(
+                        "seq_scan",
+                        table,
+                        f"Seq Scan on {table} ({rows} rows)"
+                        + (
+                            f" filter {shorten(expression)}" if expression
+                            else ", whole table is read"
+                        )
+                        + (
+                            ", pattern match needs trigram index"
+                            if "~~" in expression else ""
+                        ),
+                        index
+                    ))
+
+            if node_type == "Sort":
+                sort_key = ", ".join(node.get("Sort Key", []))
+                if "external" in node.get("Sort Method", ""):
+                    problems.append(Problem(
+                        "disk_sort",
+                        table,
+                        f"Sort spills to disk ({node.get('Sort Space Used')}"
+                        f" kB) by {sort_key}",
+                        self.sort_index(node)
+                    ))
+                elif node.get("Actual Rows", 0) >= self.min_rows:
+                    problems.append(Problem(
+                        "sort",
+                        table,
+                        f"Sort of {node['Actual Rows']} rows by {sort_key}",
+                        self.sort_index(node)
+                    ))
+
+            removed = node.get("Rows Removed by Filter", 0)
+            if table and node.get("Index Name") and removed >= max(
+                    self.min_rows,
+                    node.get("Actual Rows", 0) * node.get("Actual Loops", 1)
+            ):
+                columns = self.columns(table, node.get("Index Cond")) + [
+                    column
+                    for column in self.columns(table, node.get("Filter"))
+                ]
+                problems.append(Problem(
+                    "filtered_rows",
+                    table,
+                    f"{node['Index Name']} on {table} reads {removed} rows "
+                    f"removed by filter {shorten(node.get('Filter'))}",
+                    self.missing_index(
+                        table,
+                        [(column, None) for column in dict.fromkeys(columns)]
+                    )
+                ))
+
+        return problems
+
+    def sort_index(self, sort):
+        """
+        Function to propose index which gives rows of scanned table
+        in order of sort, so sort isn't needed
+        """
+        tables = {
+            node.get("Relation Name")
+            for node, _ in iterate_nodes(sort)
+            if node.get("Relation Name")
+        }
+        if len(tables) != 1:
+            return None
+        table = tables.pop()
+
+        columns = []
+        for key in sort.get("Sort Key", []):
+            parts = key.split()
+            column = parts[0].split(".")[-1].strip('"')
+            if column not in self.columns(table, column):
+                return None
+            columns.append((column, "DESC" if "DESC" in parts[1:] else "ASC"))
+        return self.missing_index(table, columns)
+
+
+def inspect(cases=None, min_rows=MIN_ROWS):
+    """
+    Function to explain queries of all cases.
+    Returns {case: [Explained, ...]}.
+    """
+    advisor = IndexAdvisor(min_rows)
+    admin = get_user_model()(email="explain@planetarium.local")
+    admin.is_staff = admin.is_superuser = True
+    client = APIClient()
+    client.force_authenticate(admin)
+
+    results = {}
+    with isolated_caches(), \
+            mock.patch.object(APIView, "throttle_classes", []), \
+            override_settings(
+                ALLOWED_HOSTS=["testserver"],
+                PLANETARIUM_SERVER_TIMING_SAMPLE_RATE=0
+            ):
+        for case, url in cases or get_cases():
+            results[case] = []
+            for sql in capture_queries(client, url):
+                plan = explain(sql)
+                results[case].append(
+                    Explained(sql, plan, advisor.check(plan))
+                )
+    return results
+
+
+def format_index(model, fields, name):
+    return (
+        f"{model._meta.label}: models.Index("
+        f"fields={fields!r}, name={name!r})".replace("'", '"')
+    )
+
+
+def format_operation(model, fields, name):
+    return (
+        f"migrations.AddIndex(model_name={model._meta.model_name!r}, "
+        f"index=models.Index(fields={fields!r}, name={name!r}))"
+    ).replace("'", '"')
@@ -0,0 +1,93 @@
+"""
+Renderers and parsers of planetarium API.
+
+Responses are negotiated by Accept header (or ?format=):
+
+- application/json is rendered with orjson, output is the same bytes
+  as of DRF JSONRenderer, which is used for indented and ASCII-only
+  JSON and for data orjson can't encode;
+- application/msgpack is MessagePack with the same data as JSON,
+  dates, times and decimals are strings like in JSON.
+
+Request bodies can be sent as MessagePack as well.
+"""
+
+import msgpack
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+# Datetimes are encoded by DRF encoder, orjson formats them other way
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    """JSON renderer which encodes compact JSON with orjson"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=ORJSON_OPTIONS
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # The same escaping of line separators as of JSONRenderer
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(
+                b"\xe2\x80\xa8", b"\\u2028"
+            ).replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class NormalizedJSONRenderer(FastJSONRenderer):
+
+    """
+    JSON renderer chosen with ?format=normalized. Views which offer it
+    reference related objects by id and side-load every object once
+    in "included" instead of embedding it in every row.
+    """
+
+    format = "normalized"
+
+
+class MessagePackRenderer(BaseRenderer):
+
+    """Renderer of MessagePack for terminals which poll the API often"""
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+    encoder_class = JSONRenderer.encoder_class
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=self.encoder_class().default)
+
+
+class MessagePackParser(BaseParser):
+
+    """Parser of MessagePack request bodies"""
+
+    media_type = "application/msgpack"
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        # Other msgpack versions raise TypeError or bare UnpackException
+        except (ValueError, TypeError, msgpack.UnpackException) as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
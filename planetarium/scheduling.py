@@ -0,0 +1,190 @@
+"""
+In-memory index of speakers' working time.
+
+Used by batch callers (e.g. validating schedule for a whole week)
+instead of ShowSession.validate_show_speakers for every session:
+all sessions of the date range are loaded with one query,
+after that every check is done in memory.
+"""
+
+import bisect
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+
+from planetarium.models import ShowSession
+
+
+class SpeakerScheduleIndex:
+
+    """Sessions of speakers grouped by (speaker id, show day)"""
+
+    def __init__(self):
+        self._intervals = defaultdict(list)
+
+    @classmethod
+    def load(cls, date_from, date_to, show_speakers=None):
+        """
+        Function to load index of all speakers' sessions
+        between two dates (both included) with one query
+        """
+        index = cls()
+        through = ShowSession.show_speakers.through.objects.filter(
+            showsession__show_day__range=(date_from, date_to)
+        )
+        if show_speakers is not None:
+            through = through.filter(showspeaker__in=show_speakers)
+
+        for speaker_id, show_day, time_start, time_end, session_id in (
+                through.values_list(
+                    "showspeaker_id",
+                    "showsession__show_day",
+                    "showsession__time_start",
+                    "showsession__time_end",
+                    "showsession_id",
+                )
+        ):
+            index.add(speaker_id, show_day, time_start, time_end, session_id)
+
+        return index
+
+    def add(
+            self,
+            speaker_id,
+            show_day,
+            time_start,
+            time_end,
+            show_session_id=None
+    ):
+        """Function to add session of speaker to index"""
+        bisect.insort(
+            self._intervals[(speaker_id, show_day)],
+            (time_start, time_end, show_session_id),
+            key=lambda interval: interval[0]
+        )
+
+    def find_conflict(
+            self,
+            speaker_id,
+            show_day,
+            time_start,
+            time_end,
+            exclude_show_session_id=None
+    ):
+        """
+        Function to find session of speaker which overlaps given time.
+        Sessions overlap when each of them starts before the other one ends.
+        """
+        intervals = self._intervals.get((speaker_id, show_day), [])
+        started_before_end = bisect.bisect_left(
+            intervals, time_end, key=lambda interval: interval[0]
+        )
+        for other_start, other_end, other_id in intervals[:started_before_end]:
+            if other_end > time_start and (
+                    other_id is None or other_id != exclude_show_session_id
+            ):
+                return other_start, other_end, other_id
+        return None
+
+    def validate_show_speakers(
+            self,
+            show_speakers,
+            show_day,
+            time_start,
+            time_end,
+            exclude_show_session_id=None
+    ):
+        """
+        Same validation as ShowSession.validate_show_speakers,
+        but without queries to database
+        """
+        for speaker in show_speakers:
+            if self.find_conflict(
+                    speaker.pk,
+                    show_day,
+                    time_start,
+                    time_end,
+                    exclude_show_session_id
+            ):
+                raise ValidationError(
+                    f"Speaker {speaker.first_name} {speaker.last_name} "
+                    f"has another show scheduled on the same day and time."
+                )
+
+    def add_show_session(self, show_speakers, show_session):
+        """Function to add just validated session for all its speakers"""
+        for speaker in show_speakers:
+            self.add(
+                speaker.pk,
+                show_session.show_day,
+                show_session.time_start,
+                show_session.time_end,
+                show_session.pk
+            )
+
+
+class DomeScheduleIndex(SpeakerScheduleIndex):
+
+    """
+    Sessions of planetarium domes grouped by (dome id, show day),
+    one dome runs one session at a time
+    """
+
+    @classmethod
+    def load(cls, date_from, date_to, planetarium_domes=None):
+        """
+        Function to load index of all domes' sessions
+        between two dates (both included) with one query
+        """
+        index = cls()
+        show_sessions = ShowSession.objects.filter(
+            show_day__range=(date_from, date_to)
+        ).order_by()
+        if planetarium_domes is not None:
+            show_sessions = show_sessions.filter(
+                planetarium_dome__in=planetarium_domes
+            )
+
+        for dome_id, show_day, time_start, time_end, session_id in (
+                show_sessions.values_list(
+                    "planetarium_dome_id",
+                    "show_day",
+                    "time_start",
+                    "time_end",
+                    "id",
+                )
+        ):
+            index.add(dome_id, show_day, time_start, time_end, session_id)
+
+        return index
+
+    def validate_planetarium_dome(
+            self,
+            planetarium_dome,
+            show_day,
+            time_start,
+            time_end,
+            exclude_show_session_id=None
+    ):
+        """Function to validate whether dome is free in given time"""
+        if self.find_conflict(
+                planetarium_dome.pk,
+                show_day,
+                time_start,
+                time_end,
+                exclude_show_session_id
+        ):
+            raise ValidationError(
+                f"Planetarium dome {planetarium_dome.name} "
+                f"has another show scheduled on the same day and time."
+            )
+
+    def add_show_session(self, planetarium_dome, show_session):
+        """Function to add just validated session of dome"""
+        self.add(
+            planetarium_dome.pk,
+            show_session.show_day,
+            show_session.time_start,
+            show_session.time_end,
+            show_session.pk
+        )
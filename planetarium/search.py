@@ -0,0 +1,129 @@
+"""
+Ranked fuzzy search over shows, speakers and themes.
+
+Words of query are matched as prefixes with PostgreSQL full-text search,
+which uses GIN indexes declared on models (search_vector function
+must build the same expression as the index to use it).
+When pg_trgm extension is installed, misspelled words are found too
+by trigram word similarity with GIN trigram indexes created after
+migrations (see create_trigram_indexes), and similarity is added to rank.
+"""
+
+import logging
+import operator
+import re
+from functools import reduce
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity
+)
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Q
+
+from planetarium.models import AstronomyShow, ShowSpeaker, ShowTheme
+
+SEARCH_CONFIG = "simple"
+
+SEARCH_FIELDS = {
+    AstronomyShow: ("title",),
+    ShowSpeaker: ("first_name", "last_name", "profession"),
+    ShowTheme: ("name",),
+}
+
+_trigram_available = {}
+
+logger = logging.getLogger(__name__)
+
+
+def search_vector(*fields):
+    """Full-text vector of fields, the same as used in models indexes"""
+    return SearchVector(*fields, config=SEARCH_CONFIG)
+
+
+def prefix_query(text):
+    """Function to build tsquery where every word of text is a prefix"""
+    words = re.findall(r"[^\W_]+", text)
+    return " & ".join(f"{word}:*" for word in words)
+
+
+def trigram_available(using="default"):
+    """Function to check once per database whether pg_trgm is installed"""
+    if using not in _trigram_available:
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"
+            )
+            _trigram_available[using] = cursor.fetchone() is not None
+    return _trigram_available[using]
+
+
+def search(queryset, text):
+    """
+    Function to filter queryset by text in searched fields of its model
+    and order it by relevance (annotated as search_rank)
+    """
+    fields = SEARCH_FIELDS[queryset.model]
+    query_text = prefix_query(text)
+    if not query_text:
+        return queryset.none()
+
+    query = SearchQuery(query_text, config=SEARCH_CONFIG, search_type="raw")
+    condition = Q(search_vector=query)
+    rank = SearchRank(search_vector(*fields), query)
+
+    if trigram_available(queryset.db):
+        condition = reduce(
+            operator.or_,
+            [
+                Q(**{f"{field}__trigram_word_similar": text})
+                for field in fields
+            ],
+            condition
+        )
+        rank = reduce(
+            operator.add,
+            [TrigramWordSimilarity(text, field) for field in fields],
+            rank
+        )
+
+    return (
+        queryset.annotate(search_vector=search_vector(*fields))
+        .filter(condition)
+        .annotate(search_rank=rank)
+        .order_by("-search_rank", "pk")
+    )
+
+
+def search_astronomy_shows(text):
+    """Ids of astronomy shows found by text, for filtering related models"""
+    return search(AstronomyShow.objects.all(), text).values("pk")
+
+
+def create_trigram_indexes(using="default", **kwargs):
+    """
+    Function to install pg_trgm and create GIN trigram indexes
+    for searched fields. It's connected to post_migrate signal,
+    if extension can't be installed, search works without typo tolerance.
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return
+
+    try:
+        with transaction.atomic(using=using):
+            with connection.cursor() as cursor:
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                for model, fields in SEARCH_FIELDS.items():
+                    table = model._meta.db_table
+                    for field in fields:
+                        cursor.execute(
+                            f"CREATE INDEX IF NOT EXISTS {table}_{field}_trgm "
+                            f"ON {table} USING gin ({field} gin_trgm_ops)"
+                        )
+    except DatabaseError as error:
+        logger.warning("Search works without trigram indexes: %s", error)
+
+    _trigram_available.pop(using, None)
@@ -0,0 +1,172 @@
+"""
+Compact occupancy map of planetarium dome seats for a show session.
+
+Seats are stored as a packed bitmap in row-major order:
+bit index of seat is (row - 1) * seats_in_row + (seat - 1),
+the most significant bit of every byte goes first.
+Set bit means that seat is taken: sold or held during checkout.
+"""
+
+import base64
+
+from planetarium.holds import get_held_seats
+from planetarium.models import Ticket
+
+# Versions are kept positive and fit into 63 bits
+VERSION_MASK = (1 << 62) - 1
+
+
+class SeatMap:
+
+    """Bitmap of taken seats for one planetarium dome"""
+
+    def __init__(self, rows: int, seats_in_row: int):
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        self.bits = bytearray((rows * seats_in_row + 7) // 8)
+        self.taken = 0
+        self.held = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.rows * self.seats_in_row
+
+    @property
+    def available(self) -> int:
+        return self.capacity - self.taken - self.held
+
+    def _index(self, row: int, seat: int) -> int:
+        """Function to get bit index of seat in bitmap"""
+        return (row - 1) * self.seats_in_row + (seat - 1)
+
+    def contains(self, row: int, seat: int) -> bool:
+        """Function to check whether seat exists in the dome"""
+        return 1 <= row <= self.rows and 1 <= seat <= self.seats_in_row
+
+    def is_taken(self, row: int, seat: int) -> bool:
+        index = self._index(row, seat)
+        return bool(self.bits[index >> 3] & (0x80 >> (index & 7)))
+
+    def mark(self, row: int, seat: int, held: bool = False) -> None:
+        """
+        Function to mark seat as taken (sold or held),
+        seats out of the dome are ignored
+        """
+        if not self.contains(row, seat) or self.is_taken(row, seat):
+            return
+        index = self._index(row, seat)
+        self.bits[index >> 3] |= 0x80 >> (index & 7)
+        if held:
+            self.held += 1
+        else:
+            self.taken += 1
+
+    def to_base64(self) -> str:
+        return base64.b64encode(bytes(self.bits)).decode("ascii")
+
+    def row_order(self):
+        """Rows from the center of the dome to its edges"""
+        center = (self.rows + 1) / 2
+        return sorted(
+            range(1, self.rows + 1), key=lambda row: (abs(row - center), row)
+        )
+
+    def find_best_block(self, count: int):
+        """
+        Function to find `count` adjacent free seats in one row,
+        rows closer to the center of the dome are preferred,
+        in a row block closest to the middle of the row is chosen.
+        Returns [(row, seat), ...] or None if there is no such block.
+
+        Every row is checked with a few integer bit operations:
+        bit of block start is set only if all `count` seats are free.
+        """
+        width = self.seats_in_row
+        if not 1 <= count <= width:
+            return None
+
+        total_bits = len(self.bits) * 8
+        bitmap = int.from_bytes(self.bits, "big")
+        row_mask = (1 << width) - 1
+        middle = (width - count) / 2
+
+        for row in self.row_order():
+            shift = total_bits - row * width
+            free = ~(bitmap >> shift) & row_mask
+
+            starts = free
+            for offset in range(1, count):
+                starts &= free << offset
+            starts &= row_mask
+            if not starts:
+                continue
+
+            best_seat = None
+            while starts:
+                position = starts.bit_length() - 1
+                starts ^= 1 << position
+                seat = width - position
+                if best_seat is None or (
+                        abs(seat - 1 - middle) < abs(best_seat - 1 - middle)
+                ):
+                    best_seat = seat
+            return [
+                (row, seat) for seat in range(best_seat, best_seat + count)
+            ]
+
+        return None
+
+
+def tickets_seats(show_session):
+    """Queryset of (row, seat, id) of all tickets of show session"""
+    return Ticket.objects.filter(
+        show_session_id=show_session.id
+    ).order_by().values_list("row", "seat", "id")
+
+
+def fill_seat_map(show_session, tickets, held_seats, holds_revision):
+    """
+    Function to mark seats of tickets and held seats on seat map
+    of show session and count its version
+    """
+    planetarium_dome = show_session.planetarium_dome
+    seat_map = SeatMap(planetarium_dome.rows, planetarium_dome.seats_in_row)
+
+    last_ticket_id = 0
+    tickets_count = 0
+    for row, seat, ticket_id in tickets:
+        seat_map.mark(row, seat)
+        tickets_count += 1
+        last_ticket_id = max(last_ticket_id, ticket_id)
+
+    for row, seat in held_seats:
+        seat_map.mark(row, seat, held=True)
+
+    version = hash((
+        last_ticket_id * (seat_map.capacity + 1) + tickets_count,
+        holds_revision,
+        seat_map.held,
+    )) & VERSION_MASK
+
+    return seat_map, version
+
+
+def build_seat_map(show_session):
+    """
+    Function to build seat map of show session with one query
+    over (show_session, row, seat) unique index of tickets
+    and one read of held seats from cache.
+    Show session must have planetarium_dome already loaded.
+
+    Returns seat map and its version. Version is built from
+    the biggest ticket id, the number of tickets and state of holds,
+    so it changes whenever any ticket of the session is sold
+    or cancelled and whenever seats are held or released.
+    """
+    held_seats, holds_revision = get_held_seats(show_session.id)
+    return fill_seat_map(
+        show_session,
+        tickets_seats(show_session),
+        held_seats,
+        holds_revision
+    )
@@ -0,0 +1,393 @@
+"""
+Synthetic planetarium data of realistic volume.
+
+Rows are generated from random seed, so the same seed and volumes
+give the same data. Catalog is loaded with bulk INSERTs in batches,
+reservations and tickets (millions of rows) are streamed to PostgreSQL
+with COPY, nothing is saved one by one. Generated data respects
+model invariants:
+
+- show sessions of every day are laid out on grid of time slots
+  and domes, so sessions of one dome don't overlap;
+- speakers of sessions are checked with SpeakerScheduleIndex,
+  so no speaker hosts two sessions at the same time;
+- seats of tickets are sampled without repeats from seats of dome,
+  so they are in ranges of Ticket.validate_ticket and unique;
+- tickets counters of show sessions are rebuilt from tickets.
+
+Names are prefixed with seed, so data of different seeds can be
+loaded into the same database.
+"""
+
+import datetime
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+
+from planetarium import versions
+from planetarium.models import (
+    AstronomyShow,
+    DailySchedule,
+    PlanetariumDome,
+    Reservation,
+    ShowSession,
+    ShowSessionTicketCounter,
+    ShowSpeaker,
+    ShowTheme,
+    Ticket
+)
+from planetarium.scheduling import SpeakerScheduleIndex
+
+# Volumes of scale 1, they are multiplied by scale
+VOLUMES = {
+    "planetarium_domes": 20,
+    "show_themes": 100,
+    "show_speakers": 400,
+    "astronomy_shows": 2000,
+    "show_sessions": 10000,
+    "users": 1000,
+    "reservations": 300000,
+    "tickets": 1000000,
+}
+
+BATCH_SIZE = 5000
+SHOW_SESSIONS_CHUNK = 1000
+START_DAY = datetime.date(2030, 1, 1)
+# Sessions last 90 minutes, one slot every two hours
+SLOTS = [
+    (datetime.time(hour), datetime.time(hour + 1, 30))
+    for hour in range(9, 22, 2)
+]
+MAX_SPEAKERS_IN_SESSION = 2
+# Reservations are made up to this number of days before session
+MAX_DAYS_IN_ADVANCE = 60
+
+WORDS = (
+    "Andromeda", "Aurora", "Comet", "Cosmos", "Eclipse", "Galaxy",
+    "Horizon", "Meteor", "Moon", "Nebula", "Orbit", "Planet",
+    "Pulsar", "Quasar", "Saturn", "Star", "Sun", "Universe",
+)
+FIRST_NAMES = (
+    "Anna", "Bohdan", "Carl", "Diana", "Edwin", "Fiona",
+    "Galina", "Henry", "Iryna", "Johannes", "Kateryna", "Lev",
+)
+LAST_NAMES = (
+    "Brahe", "Copernicus", "Galilei", "Hubble", "Kepler",
+    "Leavitt", "Messier", "Newton", "Sagan", "Struve",
+)
+PROFESSIONS = (
+    "Astronomer", "Astrophysicist", "Cosmologist",
+    "Planetary scientist", "Science writer",
+)
+
+
+def get_volumes(scale=1, **volumes):
+    """Function to get volumes of scale, given volumes override them"""
+    scaled = {
+        name: max(1, int(volume * scale)) for name, volume in VOLUMES.items()
+    }
+    scaled.update(
+        (name, volume) for name, volume in volumes.items()
+        if volume is not None
+    )
+    return scaled
+
+
+def next_ids(model, count):
+    """Function to take count values of primary key sequence of model"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, %s)) "
+            "FROM generate_series(1, %s)",
+            [model._meta.db_table, model._meta.pk.column, count]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def copy_rows(model, fields, rows):
+    """Function to load rows of given fields of model with COPY"""
+    quote_name = connection.ops.quote_name
+    columns = ", ".join(
+        quote_name(model._meta.get_field(field).column) for field in fields
+    )
+    with connection.cursor() as cursor:
+        with cursor.cursor.copy(
+            f"COPY {quote_name(model._meta.db_table)} ({columns}) FROM STDIN"
+        ) as copy:
+            for row in rows:
+                copy.write_row(row)
+
+
+def _seed_catalog(rng, prefix, volumes):
+    """Function to create domes, themes, speakers and astronomy shows"""
+    planetarium_domes = PlanetariumDome.objects.bulk_create(
+        PlanetariumDome(
+            name=f"{prefix} dome {number}",
+            rows=rng.randint(10, 30),
+            seats_in_row=rng.randint(10, 40)
+        )
+        for number in range(volumes["planetarium_domes"])
+    )
+    show_themes = ShowTheme.objects.bulk_create(
+        ShowTheme(name=f"{prefix} {rng.choice(WORDS)} {number}")
+        for number in range(volumes["show_themes"])
+    )
+    # Sessions of all domes of one slot need different speakers,
+    # with twice more speakers than they need free ones are found fast
+    show_speakers = ShowSpeaker.objects.bulk_create(
+        (
+            ShowSpeaker(
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=f"{rng.choice(LAST_NAMES)} {number}",
+                profession=rng.choice(PROFESSIONS)
+            )
+            for number in range(
+                max(
+                    volumes["show_speakers"],
+                    2 * MAX_SPEAKERS_IN_SESSION * len(planetarium_domes)
+                )
+            )
+        ),
+        batch_size=BATCH_SIZE
+    )
+    astronomy_shows = AstronomyShow.objects.bulk_create(
+        (
+            AstronomyShow(
+                title=f"{prefix} {rng.choice(WORDS)} {number}",
+                description=" ".join(rng.choices(WORDS, k=20))
+            )
+            for number in range(volumes["astronomy_shows"])
+        ),
+        batch_size=BATCH_SIZE
+    )
+    AstronomyShow.show_themes.through.objects.bulk_create(
+        (
+            AstronomyShow.show_themes.through(
+                astronomyshow=astronomy_show, showtheme=show_theme
+            )
+            for astronomy_show in astronomy_shows
+            for show_theme in rng.sample(
+                show_themes, min(len(show_themes), rng.randint(1, 3))
+            )
+        ),
+        batch_size=BATCH_SIZE
+    )
+    return planetarium_domes, show_themes, show_speakers, astronomy_shows
+
+
+def _choose_speakers(rng, index, show_speakers, show_session):
+    """Function to choose random speakers who are free at time of session"""
+    chosen = []
+    count = rng.randint(1, MAX_SPEAKERS_IN_SESSION)
+    while len(chosen) < count:
+        show_speaker = rng.choice(show_speakers)
+        if show_speaker not in chosen and index.find_conflict(
+                show_speaker.pk,
+                show_session.show_day,
+                show_session.time_start,
+                show_session.time_end
+        ) is None:
+            chosen.append(show_speaker)
+
+    index.add_show_session(chosen, show_session)
+    return chosen
+
+
+def _seed_show_sessions(
+        rng, volumes, planetarium_domes, show_speakers, astronomy_shows
+):
+    """
+    Function to create show sessions with their speakers.
+    Session number n is in dome n % domes of slot n // domes.
+    """
+    index = SpeakerScheduleIndex()
+    show_sessions = []
+    speakers = []
+
+    for number in range(volumes["show_sessions"]):
+        cell, dome_number = divmod(number, len(planetarium_domes))
+        day, slot = divmod(cell, len(SLOTS))
+        time_start, time_end = SLOTS[slot]
+
+        show_session = ShowSession(
+            astronomy_show=rng.choice(astronomy_shows),
+            planetarium_dome=planetarium_domes[dome_number],
+            show_day=START_DAY + datetime.timedelta(days=day),
+            time_start=time_start,
+            time_end=time_end
+        )
+        show_sessions.append(show_session)
+        speakers.append(
+            _choose_speakers(rng, index, show_speakers, show_session)
+        )
+
+    show_sessions = ShowSession.objects.bulk_create(
+        show_sessions, batch_size=BATCH_SIZE
+    )
+    ShowSession.show_speakers.through.objects.bulk_create(
+        (
+            ShowSession.show_speakers.through(
+                showsession=show_session, showspeaker=show_speaker
+            )
+            for show_session, session_speakers in zip(show_sessions, speakers)
+            for show_speaker in session_speakers
+        ),
+        batch_size=BATCH_SIZE
+    )
+    return show_sessions
+
+
+def _sell_seats(rng, show_session, count, reservation_size, user_ids):
+    """
+    Function to sell count random seats of show session.
+    Returns reservations (created_at, user_id, show_session_id) and tickets
+    (row, seat, show_session_id, number of reservation).
+    """
+    planetarium_dome = show_session.planetarium_dome
+    starts_at = datetime.datetime.combine(
+        show_session.show_day,
+        show_session.time_start,
+        tzinfo=datetime.timezone.utc
+    )
+    places = rng.sample(range(planetarium_dome.capacity), count)
+    reservations = []
+    tickets = []
+
+    while places:
+        size = rng.randint(1, 2 * reservation_size - 1)
+        reservations.append(
+            (
+                starts_at - datetime.timedelta(
+                    seconds=rng.randrange(MAX_DAYS_IN_ADVANCE * 86400)
+                ),
+                rng.choice(user_ids),
+                show_session.id
+            )
+        )
+        tickets.extend(
+            (
+                place // planetarium_dome.seats_in_row + 1,
+                place % planetarium_dome.seats_in_row + 1,
+                show_session.id,
+                len(reservations) - 1
+            )
+            for place in places[:size]
+        )
+        del places[:size]
+
+    return reservations, tickets
+
+
+def _seed_tickets(rng, volumes, show_sessions, user_ids):
+    """
+    Function to sell tickets of show sessions in chunks of sessions,
+    so only tickets of one chunk are kept in memory.
+    Sessions are filled evenly to reach volume of tickets.
+    """
+    capacity = sum(
+        show_session.planetarium_dome.capacity
+        for show_session in show_sessions
+    )
+    fill = min(1.0, volumes["tickets"] / capacity)
+    reservation_size = max(
+        1, round(volumes["tickets"] / volumes["reservations"])
+    )
+    counts = {"reservations": 0, "tickets": 0}
+
+    for start in range(0, len(show_sessions), SHOW_SESSIONS_CHUNK):
+        chunk = show_sessions[start:start + SHOW_SESSIONS_CHUNK]
+        reservations = []
+        tickets = []
+
+        for show_session in chunk:
+            capacity = show_session.planetarium_dome.capacity
+            session_reservations, session_tickets = _sell_seats(
+                rng,
+                show_session,
+                min(capacity, round(capacity * fill * rng.uniform(0.5, 1.5))),
+                reservation_size,
+                user_ids
+            )
+            offset = len(reservations)
+            reservations.extend(session_reservations)
+            tickets.extend(
+                (row, seat, show_session_id, offset + number)
+                for row, seat, show_session_id, number in session_tickets
+            )
+
+        reservation_ids = next_ids(Reservation, len(reservations))
+        copy_rows(
+            Reservation,
+            ("id", "created_at", "user_id", "show_session_id"),
+            (
+                (reservation_id, *reservation)
+                for reservation_id, reservation
+                in zip(reservation_ids, reservations)
+            )
+        )
+        copy_rows(
+            Ticket,
+            ("row", "seat", "show_session_id", "reservation_id"),
+            (
+                (row, seat, show_session_id, reservation_ids[number])
+                for row, seat, show_session_id, number in tickets
+            )
+        )
+        show_session_ids = [show_session.id for show_session in chunk]
+        ShowSessionTicketCounter.rebuild(show_session_ids)
+        DailySchedule.refresh(show_session_ids)
+
+        counts["reservations"] += len(reservations)
+        counts["tickets"] += len(tickets)
+
+    return counts
+
+
+def seed(scale=1, random_seed=0, **volumes):
+    """
+    Function to create synthetic data of given scale (look at VOLUMES),
+    volumes can be overridden by name.
+    Returns number of created rows of every kind.
+    """
+    volumes = get_volumes(scale, **volumes)
+    rng = random.Random(random_seed)
+    prefix = f"S{random_seed}"
+
+    with transaction.atomic():
+        (
+            planetarium_domes, show_themes, show_speakers, astronomy_shows
+        ) = _seed_catalog(rng, prefix, volumes)
+        users = get_user_model().objects.bulk_create(
+            (
+                get_user_model()(
+                    email=f"user{number}@{prefix.lower()}.seed",
+                    password=make_password(None)
+                )
+                for number in range(volumes["users"])
+            ),
+            batch_size=BATCH_SIZE
+        )
+        show_sessions = _seed_show_sessions(
+            rng, volumes, planetarium_domes, show_speakers, astronomy_shows
+        )
+        counts = _seed_tickets(
+            rng, volumes, show_sessions, [user.id for user in users] + [None]
+        )
+
+    for model in (
+            PlanetariumDome, ShowTheme, ShowSpeaker, AstronomyShow,
+            ShowSession, Reservation
+    ):
+        versions.bump(model)
+
+    return {
+        "planetarium_domes": len(planetarium_domes),
+        "show_themes": len(show_themes),
+        "show_speakers": len(show_speakers),
+        "astronomy_shows": len(astronomy_shows),
+        "users": len(users),
+        "show_sessions": len(show_sessions),
+        **counts,
+    }
@@ -8,10 +8,12 @@ Serializers usually separate on three pert:
 
 
 from django.db import transaction
+from django.db.models import F
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
 from planetarium.models import (
+    DailySchedule,
     ShowTheme,
     AstronomyShow,
     ShowSpeaker,
@@ -20,6 +22,8 @@ from planetarium.models import (
     ShowSession,
     PlanetariumDome
 )
+from planetarium.booking import allocate_best_available, book_tickets
+from planetarium.holds import count_held_seats, get_hold, release_hold
 
 
 class ShowThemeSerializer(serializers.ModelSerializer):
@@ -76,8 +80,31 @@ class ShowSpeakerDetailSerializer(ShowSpeakerSerializer):
         )
 
 
+class PosterVariantsField(serializers.ReadOnlyField):
+    """
+    URLs of poster variants by size and format,
+    null until poster is processed (look at planetarium.posters)
+    """
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        storage = AstronomyShow._meta.get_field("poster").storage
+        request = self.context.get("request")
+        urls = {}
+        for variant_name, formats in value.items():
+            urls[variant_name] = {}
+            for format_name, path in formats.items():
+                url = storage.url(path)
+                if request is not None:
+                    url = request.build_absolute_uri(url)
+                urls[variant_name][format_name] = url
+        return urls
+
+
 class AstronomyShowSerializer(serializers.ModelSerializer):
     show_themes = ShowThemeSerializer(many=True)
+    poster_variants = PosterVariantsField()
 
     class Meta:
         model = AstronomyShow
@@ -86,6 +113,7 @@ class AstronomyShowSerializer(serializers.ModelSerializer):
             "title",
             "description",
             "poster",
+            "poster_variants",
             "show_themes",
         )
 
@@ -103,6 +131,7 @@ class AstronomyShowListSerializer(AstronomyShowSerializer):
             "title",
             "show_themes",
             "poster",
+            "poster_variants",
         )
 
     def create(self, validated_data):
@@ -125,15 +154,18 @@ class AstronomyShowDetailSerializer(AstronomyShowSerializer):
             "title",
             "description",
             "poster",
+            "poster_variants",
             "show_themes",
         )
 
 
 class AstronomyShowPosterSerializer(serializers.ModelSerializer):
+    poster_variants = PosterVariantsField()
+
     class Meta:
         model = AstronomyShow
         fields = (
-            "id", "poster"
+            "id", "poster", "poster_variants"
         )
 
 
@@ -145,7 +177,78 @@ class PlanetariumDomeSerializer(serializers.ModelSerializer):
         )
 
 
-class ShowSessionSerializer(serializers.ModelSerializer):
+class ProjectionListSerializer(serializers.ListSerializer):
+
+    """List of projection rows, related data of all rows is read at once"""
+
+    def to_representation(self, data):
+        rows = list(data)
+        self.child.prepare(rows)
+        return [self.child.to_representation(row) for row in rows]
+
+
+class ProjectionSerializer(serializers.BaseSerializer):
+
+    """
+    Read only serializer of rows of values() projection for hot list
+    endpoints. Rows are plain dicts, so model instances and fields
+    of ModelSerializer aren't built for every row. Subclasses project
+    queryset to columns they need, read data of the page from other
+    tables in prepare() and build representation of row by hand,
+    it must be the same as of the serializer they replace.
+    """
+
+    # Columns of rows: fields and {name: expression} of joined ones
+    columns = ()
+    column_expressions = {}
+
+    class Meta:
+        list_serializer_class = ProjectionListSerializer
+
+    @classmethod
+    def project(cls, queryset):
+        """Function to turn queryset into rows read by serializer"""
+        return queryset.prefetch_related(None).values(
+            *cls.columns, **cls.column_expressions
+        )
+
+    def prepare(self, rows):
+        """Function to read data of rows from other tables at once"""
+
+
+class HeldSeatsMixin:
+    """
+    Mixin for serializers of show sessions which subtracts seats
+    held during checkout from tickets available
+    """
+
+    def to_representation(self, instance):
+        representation = super().to_representation(instance)
+        if "tickets_available" in representation:
+            representation["tickets_available"] -= self.get_held_seats(
+                instance
+            )
+        return representation
+
+    def get_held_seats(self, instance):
+        """
+        Function to take number of seats held during checkout,
+        they are read for all show sessions of the list at once
+        """
+        held_seats = self.context.setdefault("held_seats", {})
+        if instance.pk not in held_seats:
+            show_sessions = [instance]
+            if isinstance(self.parent, serializers.ListSerializer):
+                show_sessions = self.parent.instance
+            held_seats.update(
+                count_held_seats(
+                    [show_session.pk for show_session in show_sessions]
+                )
+            )
+        return held_seats[instance.pk]
+
+
+class ShowSessionSerializer(HeldSeatsMixin, serializers.ModelSerializer):
     astronomy_show = serializers.SlugRelatedField(
         slug_field="title",
         queryset=AstronomyShow.objects.all(),
@@ -200,13 +303,23 @@ class ShowSessionSerializer(serializers.ModelSerializer):
 
     def validate(self, data):
         """Function to call method for validating show speakers working time"""
-        show_speakers = data.get("show_speakers", [])
-        show_day = data.get("show_day")
-        time_start = data.get("time_start")
-        time_end = data.get("time_end")
+        instance = self.instance
+        show_speakers = data.get(
+            "show_speakers",
+            instance.show_speakers.all() if instance else []
+        )
+        show_day = data.get("show_day", getattr(instance, "show_day", None))
+        time_start = data.get(
+            "time_start", getattr(instance, "time_start", None)
+        )
+        time_end = data.get("time_end", getattr(instance, "time_end", None))
 
         ShowSession.validate_show_speakers(
-            show_speakers, show_day, time_start, time_end
+            show_speakers,
+            show_day,
+            time_start,
+            time_end,
+            exclude_show_session_id=instance.pk if instance else None
         )
 
         return data
@@ -249,15 +362,287 @@ class ShowSessionListSerializer(ShowSessionSerializer):
         return representation
 
 
+class DailyScheduleSerializer(HeldSeatsMixin, serializers.ModelSerializer):
+    """
+    Serializer of show sessions list which reads rows of daily schedule,
+    representation is the same as of ShowSessionListSerializer
+    """
+    astronomy_show = serializers.CharField(source="astronomy_show_title")
+    planetarium_dome = serializers.CharField(source="planetarium_dome_name")
+
+    class Meta:
+        model = DailySchedule
+        fields = ShowSessionListSerializer.Meta.fields
+        read_only_fields = fields
+
+
+class ShowSessionListProjectionSerializer(ProjectionSerializer):
+    """
+    Fast variant of ShowSessionListSerializer for list action,
+    show and dome are joined, speakers of the page are read
+    with one query and held seats are subtracted like in HeldSeatsMixin
+    """
+    id_column = "id"
+    columns = ("id", "show_day", "time_start", "time_end", "tickets_available")
+    column_expressions = {
+        "astronomy_show_title": F("astronomy_show__title"),
+        "planetarium_dome_name": F("planetarium_dome__name"),
+    }
+
+    def prepare(self, rows):
+        show_session_ids = [row[self.id_column] for row in rows]
+        self.held_seats = count_held_seats(show_session_ids)
+        self.show_speakers = ShowSession.get_show_speakers_data(
+            show_session_ids
+        )
+
+    def get_show_speakers(self, row):
+        return self.show_speakers.get(row[self.id_column], [])
+
+    def to_representation(self, row):
+        return {
+            "astronomy_show": row["astronomy_show_title"],
+            "planetarium_dome": row["planetarium_dome_name"],
+            "show_day": row["show_day"].isoformat(),
+            "time_start": row["time_start"].isoformat(),
+            "time_end": row["time_end"].isoformat(),
+            "show_speakers": self.get_show_speakers(row),
+            "tickets_available": (
+                row["tickets_available"]
+                - self.held_seats[row[self.id_column]]
+            ),
+        }
+
+
+class DailyScheduleProjectionSerializer(
+    ShowSessionListProjectionSerializer
+):
+    """
+    Fast variant of DailyScheduleSerializer,
+    speakers are read from rows of daily schedule
+    """
+    id_column = "show_session_id"
+    columns = (
+        "show_session_id",
+        "show_day",
+        "time_start",
+        "time_end",
+        "tickets_available",
+        "astronomy_show_title",
+        "planetarium_dome_name",
+        "show_speakers"
+    )
+    column_expressions = {}
+
+    def prepare(self, rows):
+        self.held_seats = count_held_seats(
+            [row[self.id_column] for row in rows]
+        )
+
+    def get_show_speakers(self, row):
+        return row["show_speakers"]
+
+
+class NormalizedListSerializer(ProjectionListSerializer):
+
+    """List of rows which reference objects side-loaded in included"""
+
+    @property
+    def included(self):
+        return self.child.included
+
+
+class ShowSessionNormalizedSerializer(ProjectionSerializer):
+    """
+    Normalized variant of show sessions list (?format=normalized),
+    sessions reference show, dome and speakers by id and each of them
+    is sent once in included, ordered by id
+    """
+
+    columns = (
+        "id",
+        "astronomy_show_id",
+        "planetarium_dome_id",
+        "show_day",
+        "time_start",
+        "time_end",
+        "tickets_available",
+    )
+    column_expressions = {
+        "astronomy_show_title": F("astronomy_show__title"),
+        "planetarium_dome_name": F("planetarium_dome__name"),
+    }
+
+    class Meta:
+        list_serializer_class = NormalizedListSerializer
+
+    def prepare(self, rows):
+        show_session_ids = [row["id"] for row in rows]
+        self.held_seats = count_held_seats(show_session_ids)
+
+        show_speakers = ShowSession.show_speakers.through.objects.filter(
+            showsession_id__in=show_session_ids
+        ).order_by("showsession_id", "showspeaker_id")
+        self.show_speakers = {}
+        speakers = {}
+        for show_session_id, speaker_id, first_name, last_name, profession in (
+                show_speakers.values_list(
+                    "showsession_id",
+                    "showspeaker_id",
+                    "showspeaker__first_name",
+                    "showspeaker__last_name",
+                    "showspeaker__profession"
+                )
+        ):
+            self.show_speakers.setdefault(show_session_id, []).append(
+                speaker_id
+            )
+            speakers[speaker_id] = {
+                "id": speaker_id,
+                "full_name": f"{first_name} {last_name}",
+                "profession": profession,
+            }
+
+        astronomy_shows = {
+            row["astronomy_show_id"]: {
+                "id": row["astronomy_show_id"],
+                "title": row["astronomy_show_title"],
+            }
+            for row in rows
+        }
+        planetarium_domes = {
+            row["planetarium_dome_id"]: {
+                "id": row["planetarium_dome_id"],
+                "name": row["planetarium_dome_name"],
+            }
+            for row in rows
+        }
+        self.included = {
+            name: [objects[pk] for pk in sorted(objects)]
+            for name, objects in (
+                ("astronomy_shows", astronomy_shows),
+                ("planetarium_domes", planetarium_domes),
+                ("show_speakers", speakers),
+            )
+        }
+
+    def to_representation(self, row):
+        return {
+            "id": row["id"],
+            "astronomy_show": row["astronomy_show_id"],
+            "planetarium_dome": row["planetarium_dome_id"],
+            "show_day": row["show_day"].isoformat(),
+            "time_start": row["time_start"].isoformat(),
+            "time_end": row["time_end"].isoformat(),
+            "show_speakers": self.show_speakers.get(row["id"], []),
+            "tickets_available": (
+                row["tickets_available"] - self.held_seats[row["id"]]
+            ),
+        }
+
+
 class ShowSessionDetailSerializer(ShowSessionSerializer):
     """This serializers now don't have any differences from base serializer"""
     pass
 
 
+class ShowSessionImportRowSerializer(serializers.Serializer):
+    """
+    Row of show sessions import. Shows, domes and speakers are only
+    parsed here, planetarium.imports resolves them once per batch.
+    """
+    astronomy_show = serializers.CharField(max_length=30)
+    planetarium_dome = serializers.CharField(max_length=30)
+    show_speakers = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        default=list
+    )
+    show_day = serializers.DateField()
+    time_start = serializers.TimeField()
+    time_end = serializers.TimeField()
+
+    def validate(self, attrs):
+        if attrs["time_end"] <= attrs["time_start"]:
+            raise ValidationError(
+                {"time_end": "Show session must end after it starts."}
+            )
+        return attrs
+
+
+class ShowSessionImportSerializer(serializers.Serializer):
+    """
+    Upload of CSV or JSON Lines file with show sessions
+    and report of import with errors of rejected rows
+    """
+    file = serializers.FileField(write_only=True)
+    file_format = serializers.ChoiceField(
+        choices=("csv", "jsonl"),
+        required=False,
+        write_only=True,
+        help_text="Format of file (default: by file extension)"
+    )
+    created = serializers.IntegerField(read_only=True)
+    failed = serializers.IntegerField(read_only=True)
+    errors = serializers.ListField(
+        child=serializers.DictField(),
+        read_only=True,
+        help_text="Number of row (line) with its errors"
+    )
+
+
+class ShowSessionSeatMapSerializer(serializers.Serializer):
+    """
+    Read only serializer for seat map of show session.
+    Bitmap is base64 encoded, sold or held seat is set bit
+    in row-major order (look at planetarium.seat_map)
+    """
+    show_session = serializers.IntegerField(read_only=True)
+    rows = serializers.IntegerField(read_only=True)
+    seats_in_row = serializers.IntegerField(read_only=True)
+    capacity = serializers.IntegerField(read_only=True)
+    taken = serializers.IntegerField(read_only=True)
+    held = serializers.IntegerField(read_only=True)
+    available = serializers.IntegerField(read_only=True)
+    version = serializers.IntegerField(read_only=True)
+    bitmap = serializers.CharField(read_only=True)
+
+
+class SeatSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    seat = serializers.IntegerField()
+
+
+class SeatHoldSerializer(serializers.Serializer):
+    """
+    Serializer of time-limited hold of seats of show session
+    during checkout (look at planetarium.holds)
+    """
+    hold = serializers.CharField(read_only=True)
+    show_session = serializers.IntegerField(read_only=True)
+    seats = SeatSerializer(many=True, allow_empty=False)
+    expires_at = serializers.DateTimeField(read_only=True)
+
+
+class ShowSessionRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key field which looks up every show session
+    (together with its planetarium dome) only once per request,
+    however many tickets refer to it
+    """
+
+    def to_internal_value(self, data):
+        show_sessions = self.context.setdefault("show_sessions", {})
+        key = str(data)
+        if key not in show_sessions:
+            show_sessions[key] = super().to_internal_value(data)
+        return show_sessions[key]
+
+
 class TicketSerializer(serializers.ModelSerializer):
-    show_session = serializers.PrimaryKeyRelatedField(
+    show_session = ShowSessionRelatedField(
         many=False,
-        queryset=ShowSession.objects.all()
+        queryset=ShowSession.objects.select_related("planetarium_dome")
     )
     row = serializers.IntegerField()
     seat = serializers.IntegerField()
@@ -267,6 +652,9 @@ class TicketSerializer(serializers.ModelSerializer):
         fields = (
             "id",  "show_session", "row", "seat"
         )
+        # Taken seats are checked for all tickets at once
+        # by planetarium.booking instead of one query per ticket
+        validators = []
 
 
 class TicketListSerializer(TicketSerializer):
@@ -309,8 +697,21 @@ class TicketSeatsSerializer(TicketSerializer):
         fields = ("row", "seat")
 
 
+class BestAvailableSerializer(serializers.Serializer):
+    """
+    Request of adjacent seats which are chosen by server,
+    center rows are preferred (look at SeatMap.find_best_block)
+    """
+    show_session = ShowSessionRelatedField(
+        queryset=ShowSession.objects.select_related("planetarium_dome")
+    )
+    seats = serializers.IntegerField(min_value=1)
+
+
 class ReservationSerializer(serializers.ModelSerializer):
-    tickets = TicketSerializer(many=True, read_only=False)
+    tickets = TicketSerializer(many=True, read_only=False, required=False)
+    hold = serializers.CharField(write_only=True, required=False)
+    best_available = BestAvailableSerializer(write_only=True, required=False)
     astronomy_show_title = serializers.SerializerMethodField()
     taken_places = serializers.SerializerMethodField()
 
@@ -320,30 +721,89 @@ class ReservationSerializer(serializers.ModelSerializer):
             "id",
             "created_at",
             "tickets",
+            "hold",
+            "best_available",
             "astronomy_show_title",
             "taken_places"
         )
 
+    def validate(self, attrs):
+        """
+        Function to check that seats are given one way: as tickets,
+        as hold of seats (look at planetarium.holds) or as number
+        of best available seats, tickets are taken from hold.
+        All seats must be of one show session of reservation.
+        """
+        data = super().validate(attrs)
+        given = [
+            name for name in ("tickets", "hold", "best_available")
+            if data.get(name)
+        ]
+        if len(given) != 1:
+            raise ValidationError(
+                {"tickets": ["Give either tickets, hold or best_available."]}
+            )
+
+        token = data.pop("hold", None)
+        if token is None:
+            show_sessions = {
+                ticket["show_session"].id
+                for ticket in data.get("tickets", [])
+            }
+            if len(show_sessions) > 1:
+                raise ValidationError(
+                    {"tickets": ["All tickets must be of one show session."]}
+                )
+            return data
+
+        hold = get_hold(token)
+        request = self.context.get("request")
+        show_session = None
+        if hold is not None and (
+                not request or hold["user"] == request.user.id
+        ):
+            # Show session could be deleted while its seats were held
+            show_session = ShowSession.objects.select_related(
+                "planetarium_dome"
+            ).filter(pk=hold["show_session"]).first()
+        if show_session is None:
+            raise ValidationError({"hold": ["Hold is expired or not found."]})
+
+        data["tickets"] = [
+            {"show_session": show_session, "row": row, "seat": seat}
+            for row, seat in hold["seats"]
+        ]
+        data["hold"] = hold
+        return data
+
     def create(self, validated_data):
         """
         Changed save method to correctly adding tickets
-        to reservation because of theirs relation type
+        to reservation because of theirs relation type,
+        seats of hold are released when reservation is committed,
+        best available seats are chosen under lock of show session
         """
         with transaction.atomic():
-            tickets_data = validated_data.pop("tickets")
-            reservation = Reservation.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(reservation=reservation, **ticket_data)
+            tickets_data = validated_data.pop("tickets", None)
+            hold = validated_data.pop("hold", None)
+            best_available = validated_data.pop("best_available", None)
+            if best_available:
+                tickets_data = allocate_best_available(
+                    best_available["show_session"], best_available["seats"]
+                )
+            reservation = Reservation.objects.create(
+                show_session=tickets_data[0]["show_session"],
+                **validated_data
+            )
+            book_tickets(reservation, tickets_data, hold and hold["hold"])
+            if hold:
+                transaction.on_commit(lambda: release_hold(hold))
             return reservation
 
     def get_astronomy_show_title(self, obj):
         """Function to take specific astronomy show title by models relations"""
-        try:
-            show_session = obj.tickets.show_session
-        except AttributeError:
-            show_session = None
-        if show_session and show_session.astronomy_show:
-            return show_session.astronomy_show.title
+        if obj.show_session:
+            return obj.show_session.astronomy_show.title
         return None
 
     def get_taken_places(self, obj):
@@ -371,23 +831,20 @@ class ReservationDetailSerializer(ReservationSerializer):
 
     def get_show_session_date(self, obj):
         """Function to take show session date for specific show by models relations"""
-        show_session = obj.tickets.first().show_session
-        if show_session:
-            return show_session.show_day
+        if obj.show_session:
+            return obj.show_session.show_day
         return None
 
     def get_show_session_time_start(self, obj):
         """Function to take show session time start for specific show by models relations"""
-        show_session = obj.tickets.first().show_session
-        if show_session:
-            return show_session.time_start
+        if obj.show_session:
+            return obj.show_session.time_start
         return None
 
     def get_show_session_speakers(self, obj):
         """Function to take show session speakers for specific show by models relations"""
-        show_session = obj.tickets.first().show_session
-        if show_session:
-            speakers = show_session.show_speakers.all()
+        if obj.show_session:
+            speakers = obj.show_session.show_speakers.all()
             return ShowSpeakerListSerializer(speakers, many=True).data
         return []
 
@@ -401,3 +858,64 @@ class ReservationListSerializer(ReservationSerializer):
             "astronomy_show_title",
             "taken_places"
         )
+
+
+class ReservationListProjectionSerializer(ProjectionSerializer):
+    """
+    Fast variant of ReservationListSerializer for list action,
+    seats of the page are read with one query
+    """
+    columns = ("id", "created_at")
+    column_expressions = {
+        "astronomy_show_title": F("show_session__astronomy_show__title"),
+    }
+
+    def prepare(self, rows):
+        tickets = Ticket.objects.filter(
+            reservation_id__in=[reservation["id"] for reservation in rows]
+        ).order_by("row", "seat")
+
+        self.taken_places = {}
+        for reservation_id, row, seat in tickets.values_list(
+                "reservation_id", "row", "seat"
+        ):
+            self.taken_places.setdefault(reservation_id, []).append(
+                {"row": row, "seat": seat}
+            )
+
+    def to_representation(self, row):
+        return {
+            "id": row["id"],
+            "astronomy_show_title": row["astronomy_show_title"],
+            "taken_places": self.taken_places.get(row["id"], []),
+        }
+
+
+class ReservationExportSerializer(serializers.Serializer):
+    """
+    Query parameters of reservations export,
+    dates are dates of reservations (look at planetarium.exports)
+    """
+    file_format = serializers.ChoiceField(
+        choices=("csv", "jsonl"),
+        default="csv",
+        help_text="Format of file"
+    )
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    show = serializers.IntegerField(
+        min_value=1,
+        required=False,
+        help_text="Id of astronomy show"
+    )
+    show_title = serializers.CharField(required=False)
+
+    def validate(self, attrs):
+        if (
+                "date_from" in attrs and "date_to" in attrs
+                and attrs["date_to"] < attrs["date_from"]
+        ):
+            raise ValidationError(
+                {"date_to": "Date to must not be before date from."}
+            )
+        return attrs
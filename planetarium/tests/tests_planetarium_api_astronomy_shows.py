@@ -1,27 +1,31 @@
 """File with all tests astronomy show list and detail endpoints"""
 
+import shutil
 import tempfile
 import os
 
 from PIL import Image
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 
 from rest_framework.test import APIClient
 from rest_framework import status
 
 from planetarium.models import AstronomyShow
+from planetarium.posters import POSTER_VARIANTS, process_poster
 from planetarium.serializers import (
     AstronomyShowListSerializer,
     AstronomyShowDetailSerializer
 )
 from planetarium.tests.sample_functions import (
     sample_astronomy_show,
-    sample_show_session
+    sample_show_session,
+    sample_show_theme
 )
 
 ASTRONOMY_SHOW_URL = reverse("planetarium:astronomyshow-list")
+CACHE_STATS_URL = reverse("planetarium:cache-stats")
 
 
 def poster_upload_url(astronomy_show_id: int):
@@ -121,8 +125,75 @@ class AuthenticatedUserPlanetariumApiTest(TestCase):
         self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
 
 
+class AstronomyShowResponseCacheTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            "admin@test.com",
+            "testpasword"
+        )
+        self.client.force_authenticate(self.user)
+        self.astronomy_show = sample_astronomy_show(
+            title="Cached", show_theme_name="Cached_theme"
+        )
+
+    def test_astronomy_show_list_served_from_cache(self):
+        """Test whether repeated request is served from cache"""
+        stats_before = self.client.get(CACHE_STATS_URL).data
+
+        res = self.client.get(ASTRONOMY_SHOW_URL)
+        self.assertEqual(res["X-Cache"], "MISS")
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ASTRONOMY_SHOW_URL)
+        self.assertEqual(res["X-Cache"], "HIT")
+
+        stats = self.client.get(CACHE_STATS_URL).data
+        self.assertEqual(stats["hits"] - stats_before["hits"], 1)
+        self.assertEqual(stats["misses"] - stats_before["misses"], 1)
+
+    def test_astronomy_show_list_cached_per_scheme(self):
+        """Test whether HTTPS request isn't served HTTP response"""
+        self.client.get(ASTRONOMY_SHOW_URL)
+
+        res = self.client.get(ASTRONOMY_SHOW_URL, secure=True)
+        self.assertEqual(res["X-Cache"], "MISS")
+
+        res = self.client.get(ASTRONOMY_SHOW_URL, secure=True)
+        self.assertEqual(res["X-Cache"], "HIT")
+
+    def test_astronomy_show_list_if_modified_since(self):
+        """Test whether unchanged list is answered with 304"""
+        res = self.client.get(ASTRONOMY_SHOW_URL)
+
+        res = self.client.get(
+            ASTRONOMY_SHOW_URL, HTTP_IF_MODIFIED_SINCE=res["Last-Modified"]
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_astronomy_show_cache_invalidated_by_themes_change(self):
+        """Test whether changing show themes invalidates cached responses"""
+        url = detail_url(self.astronomy_show.id)
+        self.client.get(url)
+
+        self.astronomy_show.show_themes.add(
+            sample_show_theme(name="New_theme")
+        )
+        res = self.client.get(url)
+
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertIn(
+            "New_theme", [theme["name"] for theme in res.data["show_themes"]]
+        )
+
+
 class AstronomyShowPosterUploadTest(TestCase):
     def setUp(self):
+        # Posters and their variants are written to temporary directory
+        self.media_root = tempfile.mkdtemp()
+        self.media_settings = override_settings(MEDIA_ROOT=self.media_root)
+        self.media_settings.enable()
         self.client = APIClient()
         self.user = get_user_model().objects.create_superuser(
             "admin@admin.com", "password"
@@ -135,6 +206,10 @@ class AstronomyShowPosterUploadTest(TestCase):
             astronomy_show=self.astronomy_show
         )
 
+    def tearDown(self):
+        self.media_settings.disable()
+        shutil.rmtree(self.media_root)
+
     def test_upload_poster_to_astronomy_show(self):
         """Test uploading poster to astronomy_show"""
         url = poster_upload_url(self.astronomy_show.id)
@@ -217,3 +292,37 @@ class AstronomyShowPosterUploadTest(TestCase):
             res = self.client.get(ASTRONOMY_SHOW_URL)
 
             self.assertIn("poster", res.data[0].keys())
+
+    def test_poster_variants_are_created_after_upload(self):
+        """Test whether poster variants are processed after commit"""
+        url = poster_upload_url(self.astronomy_show.id)
+        with tempfile.NamedTemporaryFile(suffix=".jpg") as ntf:
+            img = Image.new("RGB", (640, 320))
+            img.save(ntf, format="JPEG")
+            ntf.seek(0)
+            with self.captureOnCommitCallbacks() as callbacks:
+                res = self.client.post(
+                    url, {"poster": ntf}, format="multipart"
+                )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsNone(res.data["poster_variants"])
+        self.assertTrue(callbacks)
+
+        process_poster(self.astronomy_show.id)
+        self.astronomy_show.refresh_from_db()
+        variants = self.astronomy_show.poster_variants
+        self.assertEqual(set(variants), set(POSTER_VARIANTS))
+
+        storage = self.astronomy_show.poster.storage
+        with storage.open(variants["card"]["webp"]) as variant_file:
+            variant = Image.open(variant_file)
+            self.assertEqual(variant.format, "WEBP")
+            self.assertEqual(variant.size, (480, 240))
+
+        res = self.client.get(detail_url(self.astronomy_show.id))
+        self.assertTrue(
+            res.data["poster_variants"]["thumbnail"]["jpeg"].startswith(
+                "http://testserver/media/"
+            )
+        )
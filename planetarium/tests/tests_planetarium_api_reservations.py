@@ -1,13 +1,31 @@
 """File with all tests reservation list and detail endpoints"""
 
+import csv
+import json
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest import mock
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from rest_framework.test import APIClient
 from rest_framework import status
 
-from planetarium.models import Reservation, Ticket
+from planetarium.holds import get_held_seats, update_index
+from planetarium.models import (
+    DailySchedule,
+    Reservation,
+    ShowSessionTicketCounter,
+    Ticket
+)
 from planetarium.serializers import (
     ReservationListSerializer,
     ReservationDetailSerializer
@@ -15,10 +33,17 @@ from planetarium.serializers import (
 from planetarium.tests.sample_functions import (
     sample_reservation,
     sample_astronomy_show,
+    sample_planetarium_dome,
     sample_show_session
 )
+from planetarium.versions import get_cache
+from planetarium.views import ReservationViewSet
 
 RESERVATIONS_URL = reverse("planetarium:reservation-list")
+SHOW_SESSIONS_URL = reverse("planetarium:showsession-list")
+EXPORT_URL = reverse("planetarium:reservation-export")
+
+logger = logging.getLogger(__name__)
 
 
 def detail_url(reservation_id):
@@ -29,6 +54,27 @@ def detail_url(reservation_id):
     )
 
 
+def show_session_url(show_session_id):
+    return reverse(
+        "planetarium:showsession-detail",
+        args=[show_session_id]
+    )
+
+
+def seat_map_url(show_session_id):
+    return reverse(
+        "planetarium:showsession-seat-map",
+        args=[show_session_id]
+    )
+
+
+def hold_url(show_session_id):
+    return reverse(
+        "planetarium:showsession-hold",
+        args=[show_session_id]
+    )
+
+
 class AuthenticatedUserPlanetariumApiTest(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -65,6 +111,24 @@ class AuthenticatedUserPlanetariumApiTest(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data["results"], serializer.data)
 
+    def test_reservation_keyset_pagination(self):
+        """Test whether cursor pages go through all reservations in order"""
+        for _ in range(12):
+            sample_reservation(user=self.user)
+
+        res = self.client.get(RESERVATIONS_URL, {"cursor": ""})
+        results = res.data["results"]
+        res = self.client.get(res.data["next"])
+        results += res.data["results"]
+
+        serializer = ReservationListSerializer(
+            Reservation.objects.order_by("-created_at", "id"), many=True
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsNone(res.data["next"])
+        self.assertEqual(results, serializer.data)
+
     def test_reservation_filter_by_show_session_title(self):
         """Test whether filtering working correctly"""
         astronomy_show_1 = sample_astronomy_show(
@@ -81,8 +145,8 @@ class AuthenticatedUserPlanetariumApiTest(TestCase):
             astronomy_show=astronomy_show_2
         )
 
-        reservation_1 = sample_reservation()
-        reservation_2 = sample_reservation()
+        reservation_1 = sample_reservation(show_session=show_session_1)
+        reservation_2 = sample_reservation(show_session=show_session_2)
 
         Ticket.objects.create(
             reservation=reservation_1,
@@ -98,7 +162,7 @@ class AuthenticatedUserPlanetariumApiTest(TestCase):
         )
 
         queryset = Reservation.objects.filter(
-            tickets__show_session__astronomy_show__title__icontains="First"
+            show_session__astronomy_show__title__icontains="First"
         )
 
         res = self.client.get(
@@ -119,16 +183,20 @@ class AuthenticatedUserPlanetariumApiTest(TestCase):
         show_session_1 = sample_show_session(
             astronomy_show=astronomy_show_1
         )
-        reservation_1 = sample_reservation()
-        Ticket.objects.create(
-            reservation=reservation_1,
-            show_session=show_session_1,
-            row=1,
-            seat=1
-        )
+        reservation_1 = sample_reservation(show_session=show_session_1)
+        for seat in range(1, 6):
+            Ticket.objects.create(
+                reservation=reservation_1,
+                show_session=show_session_1,
+                row=1,
+                seat=seat
+            )
 
         url = detail_url(reservation_1.id)
-        res = self.client.get(url)
+        # Reservation with its show session and show,
+        # tickets and speakers, whatever the number of tickets
+        with self.assertNumQueries(3):
+            res = self.client.get(url)
 
         reservation = Reservation.objects.get(pk=reservation_1.id)
 
@@ -136,6 +204,29 @@ class AuthenticatedUserPlanetariumApiTest(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["astronomy_show_title"], "First")
+        self.assertEqual(str(res.data["show_session_date"]), "2025-01-01")
+        self.assertEqual(len(res.data["show_session_speakers"]), 1)
+
+    def test_reservation_show_session_backfill(self):
+        """Test whether old reservations get show session from tickets"""
+        show_session = sample_show_session()
+        reservation = sample_reservation()
+        Ticket.objects.create(
+            reservation=reservation,
+            show_session=show_session,
+            row=1,
+            seat=1
+        )
+        empty_reservation = sample_reservation()
+
+        call_command("backfill_reservation_show_sessions", stdout=StringIO())
+
+        reservation.refresh_from_db()
+        empty_reservation.refresh_from_db()
+        self.assertEqual(reservation.show_session, show_session)
+        self.assertIsNone(empty_reservation.show_session)
+        self.assertEqual(Reservation.backfill_show_sessions(), 0)
 
     def test_reservation_create_forbidden(self):
         """Test whether creation with incorrect data forbidden"""
@@ -150,3 +241,629 @@ class AuthenticatedUserPlanetariumApiTest(TestCase):
         res = self.client.post(RESERVATIONS_URL, payload)
 
         self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_reservation_export_forbidden(self):
+        """Test whether only admin can export reservations"""
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class AdminReservationApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            "admin@test.com",
+            "testpasword"
+        )
+        self.client.force_authenticate(self.user)
+        self.show_session = sample_show_session()
+
+    def test_reservation_create_with_many_tickets(self):
+        """Test whether all tickets of reservation created at once"""
+        payload = {
+            "tickets": [
+                {"show_session": self.show_session.id, "row": 1, "seat": seat}
+                for seat in range(1, 11)
+            ]
+        }
+
+        res = self.client.post(RESERVATIONS_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            Ticket.objects.filter(reservation_id=res.data["id"]).count(), 10
+        )
+
+    def test_reservation_create_reports_all_invalid_seats(self):
+        """Test whether every incorrect seat reported in one error"""
+        payload = {
+            "tickets": [
+                {"show_session": self.show_session.id, "row": 1, "seat": 1},
+                {"show_session": self.show_session.id, "row": 1, "seat": 2},
+                {"show_session": self.show_session.id, "row": 1, "seat": 1},
+                {"show_session": self.show_session.id, "row": 50, "seat": 1},
+            ]
+        }
+
+        res = self.client.post(RESERVATIONS_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = res.data["tickets"]
+        self.assertEqual(errors[0], {})
+        self.assertEqual(errors[1], {})
+        self.assertIn("seat", errors[2])
+        self.assertIn("row", errors[3])
+        self.assertEqual(Reservation.objects.count(), 0)
+
+    def test_reservation_create_reports_all_taken_seats(self):
+        """Test whether every already sold seat reported with conflict"""
+        for seat in (2, 4):
+            Ticket.objects.create(
+                reservation=sample_reservation(),
+                show_session=self.show_session,
+                row=1,
+                seat=seat
+            )
+        payload = {
+            "tickets": [
+                {"show_session": self.show_session.id, "row": 1, "seat": seat}
+                for seat in range(1, 6)
+            ]
+        }
+
+        res = self.client.post(RESERVATIONS_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            res.data["seats"],
+            [
+                {"show_session": self.show_session.id, "row": 1, "seat": 2},
+                {"show_session": self.show_session.id, "row": 1, "seat": 4},
+            ]
+        )
+        self.assertEqual(Reservation.objects.count(), 2)
+
+    def test_reservation_create_and_cancel_update_tickets_sold(self):
+        """Test whether tickets sold counter follows reservations"""
+        payload = {
+            "tickets": [
+                {"show_session": self.show_session.id, "row": 2, "seat": seat}
+                for seat in range(1, 4)
+            ]
+        }
+
+        res = self.client.post(RESERVATIONS_URL, payload, format="json")
+        self.assertEqual(self._tickets_sold(), 3)
+
+        res = self.client.delete(detail_url(res.data["id"]))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self._tickets_sold(), 0)
+
+    def test_reservation_cancel_returns_seats_at_once(self):
+        """Test whether cancelled tickets are subtracted per show session"""
+        payload = {
+            "tickets": [
+                {
+                    "show_session": self.show_session.id,
+                    "row": row,
+                    "seat": seat
+                }
+                for row in range(1, 5)
+                for seat in range(1, 11)
+            ]
+        }
+        res = self.client.post(RESERVATIONS_URL, payload, format="json")
+        self.assertEqual(self._tickets_sold(), 40)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.delete(detail_url(res.data["id"]))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self._tickets_sold(), 0)
+        # Random shard is updated, any other one if it isn't created yet
+        self.assertLessEqual(
+            sum(
+                query["sql"].startswith(
+                    f'UPDATE "{ShowSessionTicketCounter._meta.db_table}"'
+                )
+                for query in queries
+            ),
+            2
+        )
+        self.assertLess(len(queries), 20)
+
+    def test_cascade_and_queryset_deletes_update_tickets_sold(self):
+        """
+        Test whether tickets deleted with their user or with queryset
+        of reservations are returned to show session
+        """
+        other_user = get_user_model().objects.create_user(
+            "other@test.com", "testpasword"
+        )
+        for user, seats in ((other_user, (1, 2)), (self.user, (3, 4, 5))):
+            reservation = sample_reservation(
+                user=user, show_session=self.show_session
+            )
+            for seat in seats:
+                Ticket.objects.create(
+                    reservation=reservation,
+                    show_session=self.show_session,
+                    row=1,
+                    seat=seat
+                )
+        capacity = self.show_session.planetarium_dome.capacity
+        self.assertEqual(self._tickets_sold(), 5)
+
+        other_user.delete()
+
+        self.assertEqual(Ticket.objects.count(), 3)
+        self.assertEqual(self._tickets_sold(), 3)
+        self.assertEqual(
+            DailySchedule.objects.get(
+                show_session=self.show_session
+            ).tickets_available,
+            capacity - 3
+        )
+
+        Ticket.objects.filter(seat=5).delete()
+
+        self.assertEqual(self._tickets_sold(), 2)
+
+        Reservation.objects.filter(user=self.user).delete()
+
+        self.assertEqual(Ticket.objects.count(), 0)
+        self.assertEqual(self._tickets_sold(), 0)
+        self.assertEqual(
+            DailySchedule.objects.get(
+                show_session=self.show_session
+            ).tickets_available,
+            capacity
+        )
+
+        # Counters of deleted show session aren't created again
+        Ticket.objects.create(
+            reservation=sample_reservation(user=self.user),
+            show_session=self.show_session,
+            row=1,
+            seat=1
+        )
+        self.show_session.delete()
+
+        self.assertFalse(ShowSessionTicketCounter.objects.exists())
+
+    def test_seat_hold_converted_to_reservation(self):
+        """Test whether held seats are unavailable until reservation"""
+        res = self.client.post(
+            hold_url(self.show_session.id),
+            {"seats": [{"row": 1, "seat": 1}, {"row": 1, "seat": 2}]},
+            format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        hold = res.data["hold"]
+
+        seat_map = self.client.get(seat_map_url(self.show_session.id)).data
+        self.assertEqual(seat_map["held"], 2)
+        self.assertEqual(seat_map["available"], 98)
+        res = self.client.get(show_session_url(self.show_session.id))
+        self.assertEqual(res.data["tickets_available"], 98)
+        res = self.client.get(
+            SHOW_SESSIONS_URL, {"date": self.show_session.show_day}
+        )
+        self.assertEqual(res.data["results"][0]["tickets_available"], 98)
+
+        res = self.client.post(
+            RESERVATIONS_URL,
+            {
+                "tickets": [
+                    {"show_session": self.show_session.id, "row": 1, "seat": 1}
+                ]
+            },
+            format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                RESERVATIONS_URL, {"hold": hold}, format="json"
+            )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            Ticket.objects.filter(reservation_id=res.data["id"]).count(), 2
+        )
+
+        seat_map = self.client.get(seat_map_url(self.show_session.id)).data
+        self.assertEqual(seat_map["held"], 0)
+        self.assertEqual(seat_map["taken"], 2)
+        res = self.client.post(
+            RESERVATIONS_URL, {"hold": hold}, format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_seat_hold_conflict_lists_lost_seats(self):
+        """Test whether nothing is held if any seat is already held"""
+        url = hold_url(self.show_session.id)
+        self.client.post(
+            url, {"seats": [{"row": 1, "seat": 1}]}, format="json"
+        )
+
+        res = self.client.post(
+            url,
+            {"seats": [{"row": 1, "seat": 1}, {"row": 1, "seat": 3}]},
+            format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            res.data["seats"],
+            [{"show_session": self.show_session.id, "row": 1, "seat": 1}]
+        )
+        seat_map = self.client.get(seat_map_url(self.show_session.id)).data
+        self.assertEqual(seat_map["held"], 1)
+
+    def test_seat_hold_release(self):
+        """Test whether released seats are available again"""
+        res = self.client.post(
+            hold_url(self.show_session.id),
+            {"seats": [{"row": 3, "seat": 3}]},
+            format="json"
+        )
+
+        res = self.client.delete(
+            f"{hold_url(self.show_session.id)}{res.data['hold']}/"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        seat_map = self.client.get(seat_map_url(self.show_session.id)).data
+        self.assertEqual(seat_map["held"], 0)
+        self.assertEqual(seat_map["available"], 100)
+
+    def test_seat_hold_of_deleted_show_session(self):
+        """Test whether hold of deleted show session is rejected"""
+        res = self.client.post(
+            hold_url(self.show_session.id),
+            {"seats": [{"row": 3, "seat": 3}]},
+            format="json"
+        )
+        self.show_session.delete()
+
+        res = self.client.post(
+            RESERVATIONS_URL, {"hold": res.data["hold"]}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["hold"], ["Hold is expired or not found."]
+        )
+
+    def test_concurrent_holds_keep_all_seats_in_index(self):
+        """Test whether concurrent updates of index don't lose seats"""
+        cache = get_cache()
+
+        class SlowCache:
+            """Cache which waits after reading, so updates overlap"""
+
+            def get(self, key, default=None):
+                value = cache.get(key, default)
+                time.sleep(0.01)
+                return value
+
+            def __getattr__(self, name):
+                return getattr(cache, name)
+
+        def hold(seat):
+            try:
+                update_index(
+                    self.show_session.id,
+                    f"token-{seat}",
+                    [(1, seat)],
+                    time.time() + 60
+                )
+            finally:
+                connection.close()
+
+        with mock.patch("planetarium.holds.get_cache", SlowCache):
+            with ThreadPoolExecutor(max_workers=10) as executor:
+                list(executor.map(hold, range(1, 11)))
+
+        held, _ = get_held_seats(self.show_session.id)
+        self.assertEqual(set(held), {(1, seat) for seat in range(1, 11)})
+
+    def test_reservation_best_available_seats(self):
+        """Test whether adjacent seats are chosen closer to center"""
+        for seat in range(3, 9):
+            Ticket.objects.create(
+                reservation=sample_reservation(),
+                show_session=self.show_session,
+                row=5,
+                seat=seat
+            )
+        payload = {
+            "best_available": {
+                "show_session": self.show_session.id, "seats": 3
+            }
+        }
+
+        res = self.client.post(RESERVATIONS_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [
+                (ticket["row"], ticket["seat"])
+                for ticket in res.data["tickets"]
+            ],
+            [(6, 4), (6, 5), (6, 6)]
+        )
+
+    def test_reservation_best_available_seats_not_found(self):
+        """Test whether too large block is rejected with conflict"""
+        payload = {
+            "best_available": {
+                "show_session": self.show_session.id, "seats": 11
+            }
+        }
+
+        res = self.client.post(RESERVATIONS_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(Reservation.objects.count(), 0)
+
+    def test_reservation_create_stores_show_session(self):
+        """Test whether reservation keeps show session of its tickets"""
+        other_show_session = sample_show_session(
+            astronomy_show=self.show_session.astronomy_show,
+            planetarium_dome=self.show_session.planetarium_dome,
+            time_start="16:00:00",
+            time_end="17:00:00"
+        )
+        payload = {
+            "tickets": [
+                {"show_session": self.show_session.id, "row": 1, "seat": 1},
+                {"show_session": other_show_session.id, "row": 1, "seat": 2}
+            ]
+        }
+
+        res = self.client.post(RESERVATIONS_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("tickets", res.data)
+
+        payload["tickets"].pop()
+        res = self.client.post(RESERVATIONS_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            Reservation.objects.get(pk=res.data["id"]).show_session,
+            self.show_session
+        )
+        self.assertEqual(
+            res.data["astronomy_show_title"],
+            self.show_session.astronomy_show.title
+        )
+
+    def test_reservation_seats_given_one_way(self):
+        """Test whether tickets and best available can't be mixed"""
+        payload = {
+            "tickets": [
+                {"show_session": self.show_session.id, "row": 1, "seat": 1}
+            ],
+            "best_available": {
+                "show_session": self.show_session.id, "seats": 2
+            }
+        }
+
+        res = self.client.post(RESERVATIONS_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reservation_export(self):
+        """Test whether export streams tickets filtered by date and show"""
+        other_show_session = sample_show_session(
+            astronomy_show=sample_astronomy_show(
+                title="Other", show_theme_name="other_test"
+            ),
+            planetarium_dome=self.show_session.planetarium_dome,
+            time_start="16:00:00",
+            time_end="17:00:00"
+        )
+        reservation = sample_reservation(user=self.user)
+        for seat in (1, 2):
+            Ticket.objects.create(
+                reservation=reservation,
+                show_session=self.show_session,
+                row=1,
+                seat=seat
+            )
+        other_reservation = sample_reservation()
+        Ticket.objects.create(
+            reservation=other_reservation,
+            show_session=other_show_session,
+            row=2,
+            seat=1
+        )
+        old_reservation = sample_reservation()
+        Ticket.objects.create(
+            reservation=old_reservation,
+            show_session=self.show_session,
+            row=3,
+            seat=1
+        )
+        Reservation.objects.filter(pk=old_reservation.pk).update(
+            created_at="2020-01-01T12:00:00Z"
+        )
+        today = reservation.created_at.date().isoformat()
+
+        res = self.client.get(EXPORT_URL, {"date_from": today})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(
+            b"".join(res.streaming_content).decode().splitlines()
+        ))
+        self.assertEqual(
+            [(row["reservation"], row["seat"]) for row in rows],
+            [
+                (str(reservation.id), "1"),
+                (str(reservation.id), "2"),
+                (str(other_reservation.id), "1")
+            ]
+        )
+        self.assertEqual(rows[0]["user"], self.user.email)
+        self.assertEqual(rows[0]["show_day"], "2025-01-01")
+        self.assertEqual(rows[2]["astronomy_show"], "Other")
+
+        res = self.client.get(
+            EXPORT_URL,
+            {
+                "file_format": "jsonl",
+                "date_to": "2020-01-01",
+                "show": self.show_session.astronomy_show_id
+            }
+        )
+
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        rows = [
+            json.loads(line)
+            for line in b"".join(res.streaming_content).splitlines()
+        ]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["reservation"], old_reservation.id)
+        self.assertEqual(rows[0]["row"], 3)
+
+        res = self.client.get(
+            EXPORT_URL, {"show_title": "oth", "file_format": "jsonl"}
+        )
+
+        self.assertEqual(
+            [
+                json.loads(line)["ticket"]
+                for line in b"".join(res.streaming_content).splitlines()
+            ],
+            list(other_reservation.tickets.values_list("id", flat=True))
+        )
+
+    def test_reservation_export_invalid_dates(self):
+        """Test whether export rejects date range ending before start"""
+        res = self.client.get(
+            EXPORT_URL, {"date_from": "2025-01-02", "date_to": "2025-01-01"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("date_to", res.data)
+
+    def _tickets_sold(self):
+        return sum(
+            ShowSessionTicketCounter.objects.filter(
+                show_session=self.show_session
+            ).values_list("tickets_sold", flat=True)
+        )
+
+
+def run_concurrent_reservations(user, show_session, requests_count,
+                                threads_count, seats_per_request):
+    """
+    Function to send reservations of random seats of show session
+    from several threads at once, every thread uses its own
+    database connection. Returns (status, seats) of every request
+    and throughput in requests per second.
+    """
+    planetarium_dome = show_session.planetarium_dome
+    all_seats = [
+        (row, seat)
+        for row in range(1, planetarium_dome.rows + 1)
+        for seat in range(1, planetarium_dome.seats_in_row + 1)
+    ]
+
+    def reserve(index):
+        client = APIClient()
+        client.force_authenticate(user)
+        seats = random.Random(index).sample(all_seats, seats_per_request)
+        try:
+            res = client.post(
+                RESERVATIONS_URL,
+                {
+                    "tickets": [
+                        {
+                            "show_session": show_session.id,
+                            "row": row,
+                            "seat": seat
+                        }
+                        for row, seat in seats
+                    ]
+                },
+                format="json"
+            )
+            return res.status_code, seats, res.data
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    with mock.patch.object(ReservationViewSet, "throttle_classes", []):
+        with ThreadPoolExecutor(max_workers=threads_count) as executor:
+            results = list(executor.map(reserve, range(requests_count)))
+    elapsed = time.perf_counter() - started
+
+    return results, requests_count / elapsed
+
+
+class ReservationConcurrencyTest(TransactionTestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser(
+            "admin@test.com",
+            "testpasword"
+        )
+        self.show_session = sample_show_session(
+            planetarium_dome=sample_planetarium_dome(rows=5, seats_in_row=5)
+        )
+
+    def test_concurrent_reservations_never_oversell(self):
+        """
+        Test whether hundreds of concurrent reservations of one session
+        end with created reservation or conflict and no seat sold twice
+        """
+        results, throughput = run_concurrent_reservations(
+            self.user,
+            self.show_session,
+            requests_count=200,
+            threads_count=8,
+            seats_per_request=2
+        )
+        logger.info("Concurrent reservations: %.1f requests/s", throughput)
+
+        statuses = {status_code for status_code, _, _ in results}
+        self.assertLessEqual(
+            statuses, {status.HTTP_201_CREATED, status.HTTP_409_CONFLICT}
+        )
+
+        sold = [
+            seat
+            for status_code, seats, _ in results
+            if status_code == status.HTTP_201_CREATED
+            for seat in seats
+        ]
+        self.assertEqual(len(sold), len(set(sold)))
+        self.assertLessEqual(len(sold), 25)
+        self.assertEqual(
+            set(
+                Ticket.objects.filter(
+                    show_session=self.show_session
+                ).values_list("row", "seat")
+            ),
+            set(sold)
+        )
+        self.assertEqual(
+            sum(
+                ShowSessionTicketCounter.objects.filter(
+                    show_session=self.show_session
+                ).values_list("tickets_sold", flat=True)
+            ),
+            len(sold)
+        )
+
+        for status_code, seats, data in results:
+            if status_code == status.HTTP_409_CONFLICT:
+                lost = {(seat["row"], seat["seat"]) for seat in data["seats"]}
+                self.assertTrue(lost)
+                self.assertLessEqual(lost, set(seats) & set(sold))
@@ -0,0 +1,95 @@
+"""File with all tests of search endpoint and search filters"""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from planetarium.tests.sample_functions import (
+    sample_astronomy_show,
+    sample_show_session,
+    sample_show_speaker
+)
+
+SEARCH_URL = reverse("planetarium:search-list")
+ASTRONOMY_SHOW_URL = reverse("planetarium:astronomyshow-list")
+SHOW_SESSION_URL = reverse("planetarium:showsession-list")
+SHOW_SPEAKERS_URL = reverse("planetarium:showspeaker-list")
+
+
+class AuthenticatedUserPlanetariumApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpasword"
+        )
+        self.client.force_authenticate(self.user)
+
+        self.andromeda = sample_astronomy_show(
+            title="Andromeda galaxy", show_theme_name="Galaxies"
+        )
+        self.black_holes = sample_astronomy_show(
+            title="Black holes", show_theme_name="Gravity"
+        )
+        sample_show_speaker(
+            first_name="Carl", last_name="Sagan", profession="Astronomer"
+        )
+        sample_show_speaker(
+            first_name="Vera", last_name="Rubin", profession="Astronomer"
+        )
+
+    def test_search_finds_every_kind_by_prefix(self):
+        """Test whether search finds shows, speakers and themes by prefix"""
+        res = self.client.get(SEARCH_URL, {"q": "gal"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [show["title"] for show in res.data["astronomy_shows"]],
+            ["Andromeda galaxy"]
+        )
+        self.assertEqual(
+            [theme["name"] for theme in res.data["show_themes"]],
+            ["Galaxies"]
+        )
+        self.assertEqual(res.data["show_speakers"], [])
+
+    def test_search_matches_all_words(self):
+        """Test whether every word of query should be found"""
+        res = self.client.get(SEARCH_URL, {"q": "astro rub"})
+
+        self.assertEqual(
+            [speaker["last_name"] for speaker in res.data["show_speakers"]],
+            ["Rubin"]
+        )
+
+    def test_search_without_query_rejected(self):
+        """Test whether search without query returns bad request"""
+        res = self.client.get(SEARCH_URL, {"q": " "})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_viewsets_search_filter(self):
+        """Test whether list endpoints filter by search parameter"""
+        sample_show_session(astronomy_show=self.black_holes)
+        sample_show_session(
+            astronomy_show=self.andromeda, show_day="2025-01-02"
+        )
+
+        res = self.client.get(ASTRONOMY_SHOW_URL, {"search": "black"})
+        self.assertEqual(
+            [show["title"] for show in res.data], ["Black holes"]
+        )
+
+        res = self.client.get(SHOW_SPEAKERS_URL, {"search": "sagan"})
+        self.assertEqual(
+            [speaker["full_name"] for speaker in res.data], ["Carl Sagan"]
+        )
+
+        res = self.client.get(SHOW_SESSION_URL, {"search": "androm"})
+        self.assertEqual(
+            [session["astronomy_show"] for session in res.data["results"]],
+            ["Andromeda galaxy"]
+        )
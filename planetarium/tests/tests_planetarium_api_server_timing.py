@@ -0,0 +1,113 @@
+"""File with tests of Server-Timing header and timing log"""
+
+import re
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import (
+    APIClient,
+    APIRequestFactory,
+    force_authenticate
+)
+from rest_framework import status
+
+from planetarium.serializers import ShowThemeListSerializer
+from planetarium.tests.sample_functions import sample_show_theme
+from planetarium.timing import RequestTiming, current_timing
+from planetarium.versions import get_cache
+from planetarium.views import ShowThemeViewSet
+
+SHOW_THEMES_URL = reverse("planetarium:showtheme-list")
+
+SERVER_TIMING = re.compile(
+    r'db;dur=[\d.]+;desc="(\d+) queries", serialize;dur=[\d.]+, '
+    r"view;dur=[\d.]+, total;dur=[\d.]+"
+)
+
+
+class ServerTimingTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpasword"
+        )
+        self.admin = get_user_model().objects.create_superuser(
+            "admin@test.com",
+            "testpasword"
+        )
+        sample_show_theme()
+
+    @override_settings(PLANETARIUM_SERVER_TIMING_SAMPLE_RATE=0)
+    def test_staff_gets_server_timing(self):
+        """Test whether staff gets timings with number of queries"""
+        self.client.force_authenticate(self.admin)
+
+        res = self.client.get(SHOW_THEMES_URL, {"name": "Test"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        match = SERVER_TIMING.fullmatch(res["Server-Timing"])
+        self.assertIsNotNone(match)
+        self.assertGreater(int(match.group(1)), 0)
+
+    @override_settings(PLANETARIUM_SERVER_TIMING_SAMPLE_RATE=0)
+    def test_not_sampled_request_has_no_server_timing(self):
+        """Test whether timings aren't sent to users out of sample"""
+        self.client.force_authenticate(self.user)
+
+        res = self.client.get(SHOW_THEMES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Server-Timing", res)
+
+    @override_settings(PLANETARIUM_SERVER_TIMING_SAMPLE_RATE=1)
+    def test_sampled_request_has_server_timing(self):
+        """Test whether timings are sent with sampled responses"""
+        self.client.force_authenticate(self.user)
+
+        res = self.client.get(SHOW_THEMES_URL)
+
+        self.assertRegex(res["Server-Timing"], SERVER_TIMING)
+
+    @override_settings(PLANETARIUM_SERVER_TIMING=False)
+    def test_server_timing_can_be_switched_off(self):
+        """Test whether disabled middleware doesn't send timings"""
+        self.client.force_authenticate(self.admin)
+
+        res = self.client.get(SHOW_THEMES_URL)
+
+        self.assertNotIn("Server-Timing", res)
+
+    @override_settings(PLANETARIUM_SERVER_TIMING_LOG_INTERVAL=0)
+    def test_timings_are_logged_by_viewset_action(self):
+        """Test whether averages of viewset action are logged"""
+        self.client.force_authenticate(self.user)
+
+        with self.assertLogs("planetarium.timing", "INFO") as logs:
+            self.client.get(SHOW_THEMES_URL)
+
+        self.assertIn("ShowThemeViewSet.list: 1 requests", logs.output[0])
+
+    def test_serializers_are_timed_by_viewsets(self):
+        """
+        Test whether data of list is measured as serialization
+        without replacing classes of serializers
+        """
+        get_cache().clear()
+        request = APIRequestFactory().get(SHOW_THEMES_URL)
+        force_authenticate(request, self.user)
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        try:
+            res = ShowThemeViewSet.as_view({"get": "list"})(request)
+        finally:
+            current_timing.reset(token)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIs(
+            type(res.data.serializer.child), ShowThemeListSerializer
+        )
+        self.assertGreater(timing.serialize, 0)
+        self.assertFalse(timing.serializing)
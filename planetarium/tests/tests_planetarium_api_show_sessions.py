@@ -1,15 +1,35 @@
 """File with all tests show session list and detail endpoints"""
 
+import base64
+import csv
+import json
+import os
+import tempfile
+import time
+from io import StringIO
+
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.db.models import F, Count
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F, Count, Prefetch
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from rest_framework.test import APIClient
 from rest_framework import status
 
-from planetarium.models import ShowSession
+from planetarium.holds import update_index
+from planetarium.models import (
+    DailySchedule,
+    ShowSession,
+    ShowSessionTicketCounter,
+    ShowSpeaker,
+    Ticket
+)
+from planetarium.scheduling import SpeakerScheduleIndex
 from planetarium.serializers import (
     ShowSessionListSerializer,
     ShowSessionDetailSerializer
@@ -17,10 +37,13 @@ from planetarium.serializers import (
 from planetarium.tests.sample_functions import (
     sample_show_session,
     sample_astronomy_show,
-    sample_show_speaker
+    sample_show_speaker,
+    sample_planetarium_dome,
+    sample_reservation
 )
 
 SHOW_SESSION_URL = reverse("planetarium:showsession-list")
+IMPORT_URL = reverse("planetarium:showsession-import-sessions")
 
 
 def detail_url(show_session_id):
@@ -31,6 +54,14 @@ def detail_url(show_session_id):
     )
 
 
+def seat_map_url(show_session_id):
+    """Return URL for seat map endpoint of given id"""
+    return reverse(
+        "planetarium:showsession-seat-map",
+        args=[show_session_id]
+    )
+
+
 class AuthenticatedUserPlanetariumApiTest(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -207,3 +238,639 @@ class AuthenticatedUserPlanetariumApiTest(TestCase):
                 time_start="14:00:00",
                 time_end="15:00:00"
             )
+
+    def test_show_session_seat_map(self):
+        """Test whether seat map marks taken seats in packed bitmap"""
+        show_session = sample_show_session(
+            planetarium_dome=sample_planetarium_dome(rows=2, seats_in_row=5)
+        )
+        reservation = sample_reservation(user=self.user)
+        Ticket.objects.create(
+            reservation=reservation, show_session=show_session, row=1, seat=1
+        )
+        Ticket.objects.create(
+            reservation=reservation, show_session=show_session, row=2, seat=4
+        )
+
+        res = self.client.get(seat_map_url(show_session.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["capacity"], 10)
+        self.assertEqual(res.data["taken"], 2)
+        self.assertEqual(res.data["available"], 8)
+        self.assertEqual(
+            base64.b64decode(res.data["bitmap"]),
+            bytes([0b10000000, 0b10000000])
+        )
+
+    def test_show_session_seat_map_version_changes(self):
+        """Test whether seat map version changes after ticket sale"""
+        show_session = sample_show_session()
+        url = seat_map_url(show_session.id)
+
+        version = self.client.get(url).data["version"]
+        self.assertEqual(self.client.get(url).data["version"], version)
+
+        Ticket.objects.create(
+            reservation=sample_reservation(user=self.user),
+            show_session=show_session,
+            row=3,
+            seat=3
+        )
+
+        self.assertNotEqual(self.client.get(url).data["version"], version)
+
+    def test_show_session_speaker_in_containing_session_forbidden(self):
+        """
+        Test whether session which fully contains other
+        session of the same speaker is forbidden
+        """
+        show_speaker = sample_show_speaker()
+        sample_show_session(
+            show_speaker=show_speaker,
+            time_start="14:00:00",
+            time_end="15:00:00"
+        )
+
+        with self.assertRaises(ValidationError):
+            ShowSession.validate_show_speakers(
+                [show_speaker],
+                "2025-01-01",
+                "13:00:00",
+                "16:00:00"
+            )
+
+    def test_show_session_speaker_back_to_back_allowed(self):
+        """Test whether speaker can host session which starts as other ends"""
+        show_speaker = sample_show_speaker()
+        sample_show_session(
+            show_speaker=show_speaker,
+            time_start="14:00:00",
+            time_end="15:00:00"
+        )
+
+        ShowSession.validate_show_speakers(
+            [show_speaker],
+            "2025-01-01",
+            "15:00:00",
+            "16:00:00"
+        )
+
+    def test_show_session_with_speaker_can_be_changed(self):
+        """Test whether saving session doesn't conflict with itself"""
+        show_session = sample_show_session()
+        show_session.time_end = "15:30:00"
+
+        show_session.save()
+
+    def test_show_session_update_checks_new_speakers(self):
+        """
+        Test whether update is checked with new speakers,
+        not with speakers which are replaced
+        """
+        astronomy_show = sample_astronomy_show()
+        old_speaker = sample_show_speaker()
+        new_speaker = sample_show_speaker()
+        sample_show_session(
+            show_speaker=old_speaker,
+            astronomy_show=astronomy_show,
+            time_start="16:00:00",
+            time_end="17:00:00"
+        )
+        show_session = sample_show_session(
+            show_speaker=old_speaker, astronomy_show=astronomy_show
+        )
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                "admin@test.com", "testpasword"
+            )
+        )
+
+        res = self.client.patch(
+            detail_url(show_session.id),
+            {
+                "time_start": "16:00:00",
+                "time_end": "17:00:00",
+                "show_speakers": [new_speaker.id],
+            }
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(show_session.show_speakers.all()), [new_speaker]
+        )
+
+        res = self.client.patch(
+            detail_url(show_session.id), {"show_speakers": [old_speaker.id]}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_speaker_schedule_index(self):
+        """Test whether schedule index finds conflicts without queries"""
+        show_speaker = sample_show_speaker()
+        show_session = sample_show_session(
+            show_speaker=show_speaker,
+            time_start="14:00:00",
+            time_end="15:00:00"
+        )
+        show_session.refresh_from_db()
+
+        index = SpeakerScheduleIndex.load(
+            show_session.show_day, show_session.show_day
+        )
+
+        with self.assertNumQueries(0):
+            with self.assertRaises(ValidationError):
+                index.validate_show_speakers(
+                    [show_speaker],
+                    show_session.show_day,
+                    show_session.time_start,
+                    show_session.time_end
+                )
+            index.validate_show_speakers(
+                [show_speaker],
+                show_session.show_day,
+                show_session.time_start,
+                show_session.time_end,
+                exclude_show_session_id=show_session.id
+            )
+
+    def test_show_session_tickets_available_after_counters_rebuild(self):
+        """Test whether rebuilding counters repairs tickets available"""
+        show_session = sample_show_session()
+        Ticket.objects.create(
+            reservation=sample_reservation(user=self.user),
+            show_session=show_session,
+            row=1,
+            seat=1
+        )
+        ShowSessionTicketCounter.objects.update(tickets_sold=50)
+
+        call_command("rebuild_ticket_counters", stdout=StringIO())
+
+        res = self.client.get(detail_url(show_session.id))
+        self.assertEqual(res.data["tickets_available"], 99)
+
+    def test_show_session_keyset_pagination(self):
+        """Test whether cursor pages go through all sessions in order"""
+        astronomy_show = sample_astronomy_show()
+        for show_day, time_start in [
+            ("2025-01-01", "10:00:00"),
+            ("2025-01-01", "12:00:00"),
+            ("2025-01-01", "12:00:00"),
+            ("2025-01-02", "09:00:00"),
+            ("2025-01-03", "09:00:00"),
+            ("2025-01-03", "11:00:00"),
+            ("2025-01-04", "08:00:00"),
+        ]:
+            sample_show_session(
+                astronomy_show=astronomy_show,
+                show_day=show_day,
+                time_start=time_start,
+                time_end="23:00:00"
+            )
+        expected = ShowSessionListSerializer(
+            ShowSession.objects.annotate(
+                tickets_available=(
+                        F("planetarium_dome__rows")
+                        * F("planetarium_dome__seats_in_row")
+                        - Count("tickets")
+                )
+            ).order_by("-show_day", "-time_start", "-time_end", "id"),
+            many=True
+        ).data
+
+        pages = []
+        res = self.client.get(SHOW_SESSION_URL, {"cursor": ""})
+        self.assertNotIn("count", res.data)
+        self.assertIsNone(res.data["previous"])
+        pages.append(res.data["results"])
+        while res.data["next"]:
+            res = self.client.get(res.data["next"])
+            pages.append(res.data["results"])
+
+        self.assertEqual([len(page) for page in pages], [5, 2])
+        self.assertEqual(sum(pages, []), expected)
+
+        res = self.client.get(res.data["previous"])
+        self.assertEqual(res.data["results"], pages[0])
+        self.assertIsNone(res.data["previous"])
+
+    def test_show_session_keyset_pagination_invalid_cursor(self):
+        """Test whether broken cursor is rejected"""
+        res = self.client.get(SHOW_SESSION_URL, {"cursor": "broken"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_show_session_detail_conditional_get(self):
+        """
+        Test whether unchanged session is answered with 304
+        without queries and ticket sale changes its ETag
+        """
+        show_session = sample_show_session()
+        url = detail_url(show_session.id)
+
+        res = self.client.get(url)
+        etag = res["ETag"]
+
+        with self.assertNumQueries(0):
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Ticket.objects.create(
+            reservation=sample_reservation(user=self.user),
+            show_session=show_session,
+            row=1,
+            seat=1
+        )
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+        self.assertEqual(res.data["tickets_available"], 99)
+
+    def test_show_session_conditional_get_after_hold_lapses(self):
+        """Test whether lapsed hold changes ETag of detail and list"""
+        show_session = sample_show_session()
+        update_index(
+            show_session.id, "token", [(1, 1), (1, 2)], time.time() + 1
+        )
+        url = detail_url(show_session.id)
+
+        detail = self.client.get(url)
+        listed = self.client.get(SHOW_SESSION_URL)
+        self.assertEqual(detail.data["tickets_available"], 98)
+        self.assertEqual(
+            self.client.get(
+                url, HTTP_IF_NONE_MATCH=detail["ETag"]
+            ).status_code,
+            status.HTTP_304_NOT_MODIFIED
+        )
+
+        time.sleep(1)
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=detail["ETag"])
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["tickets_available"], 100)
+
+        res = self.client.get(
+            SHOW_SESSION_URL, HTTP_IF_NONE_MATCH=listed["ETag"]
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"][0]["tickets_available"], 100)
+
+    def date_list_expected(self, show_day):
+        """Function to serialize sessions of the day from their sources"""
+        return ShowSessionListSerializer(
+            ShowSession.objects.filter(show_day=show_day).prefetch_related(
+                Prefetch(
+                    "show_speakers",
+                    queryset=ShowSpeaker.objects.order_by("id")
+                )
+            ).annotate(
+                tickets_available=(
+                        F("planetarium_dome__rows")
+                        * F("planetarium_dome__seats_in_row")
+                        - Count("tickets")
+                )
+            ).order_by("-show_day", "-time_start", "-time_end", "id"),
+            many=True
+        ).data
+
+    def test_show_session_date_list_reads_daily_schedule(self):
+        """
+        Test whether sessions of the day are read from daily schedule
+        without joins and it follows changes of sessions and sources
+        """
+        show_session = sample_show_session(show_day="2025-01-02")
+        sample_show_session(
+            show_day="2025-01-02",
+            time_start="16:00:00",
+            time_end="17:00:00",
+            astronomy_show=sample_astronomy_show(
+                show_theme_name="Second", title="Second title"
+            ),
+            show_speaker=sample_show_speaker(first_name="Alice")
+        )
+        Ticket.objects.create(
+            reservation=sample_reservation(user=self.user),
+            show_session=show_session,
+            row=1,
+            seat=1
+        )
+        show_session.astronomy_show.title = "Changed title"
+        show_session.astronomy_show.save()
+        show_session.planetarium_dome.rows = 20
+        show_session.planetarium_dome.save()
+        show_session.show_speakers.add(sample_show_speaker(last_name="New"))
+        speaker = show_session.show_speakers.get(last_name="Obo")
+        speaker.profession = "Astronomer"
+        speaker.save()
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(SHOW_SESSION_URL, {"date": "2025-01-02"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"], self.date_list_expected(
+            "2025-01-02"
+        ))
+        self.assertEqual(res.data["results"][1]["tickets_available"], 199)
+        for query in queries:
+            self.assertNotIn("JOIN", query["sql"])
+
+        speaker.delete()
+        show_session.tickets.get().reservation.delete()
+        show_session.show_day = "2025-01-03"
+        show_session.save()
+
+        for show_day in ("2025-01-02", "2025-01-03"):
+            res = self.client.get(SHOW_SESSION_URL, {"date": show_day})
+            self.assertEqual(
+                res.data["results"], self.date_list_expected(show_day)
+            )
+        self.assertEqual(res.data["results"][0]["tickets_available"], 200)
+
+    def test_show_session_date_list_keyset_pagination(self):
+        """Test whether cursor pages of daily schedule are in order"""
+        astronomy_show = sample_astronomy_show()
+        for time_start in ("10:00:00", "12:00:00", "12:00:00", "14:00:00",
+                           "15:00:00", "16:00:00", "18:00:00"):
+            sample_show_session(
+                astronomy_show=astronomy_show,
+                show_day="2025-01-02",
+                time_start=time_start,
+                time_end="23:00:00"
+            )
+
+        pages = []
+        res = self.client.get(
+            SHOW_SESSION_URL, {"date": "2025-01-02", "cursor": ""}
+        )
+        pages.append(res.data["results"])
+        while res.data["next"]:
+            res = self.client.get(res.data["next"])
+            pages.append(res.data["results"])
+
+        self.assertEqual([len(page) for page in pages], [5, 2])
+        self.assertEqual(
+            sum(pages, []), self.date_list_expected("2025-01-02")
+        )
+
+    def test_show_session_normalized_list(self):
+        """
+        Test whether normalized list references show, dome and speakers
+        by id and sends every one of them once
+        """
+        astronomy_show = sample_astronomy_show()
+        planetarium_dome = sample_planetarium_dome()
+        show_speaker = sample_show_speaker()
+        for hour in range(10, 14):
+            sample_show_session(
+                astronomy_show=astronomy_show,
+                planetarium_dome=planetarium_dome,
+                show_speaker=show_speaker,
+                show_day="2025-01-02",
+                time_start=f"{hour:02d}:00:00",
+                time_end=f"{hour:02d}:45:00"
+            )
+        show_session = sample_show_session(
+            astronomy_show=sample_astronomy_show(
+                title="Second", show_theme_name="Second"
+            ),
+            planetarium_dome=planetarium_dome,
+            show_speaker=show_speaker,
+            show_day="2025-01-02",
+            time_start="16:00:00",
+            time_end="17:00:00"
+        )
+        show_session.show_speakers.add(sample_show_speaker(first_name="Ann"))
+
+        params = {"date": "2025-01-02"}
+        res = self.client.get(
+            SHOW_SESSION_URL, {**params, "format": "normalized"}
+        )
+        default = self.client.get(SHOW_SESSION_URL, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        included = res.data["included"]
+        self.assertEqual(len(included["astronomy_shows"]), 2)
+        self.assertEqual(len(included["planetarium_domes"]), 1)
+        self.assertEqual(len(included["show_speakers"]), 2)
+        self.assertEqual(res.data["results"][0]["id"], show_session.id)
+
+        astronomy_shows = {
+            show["id"]: show["title"] for show in included["astronomy_shows"]
+        }
+        planetarium_domes = {
+            dome["id"]: dome["name"]
+            for dome in included["planetarium_domes"]
+        }
+        show_speakers = {
+            speaker["id"]: {
+                "full_name": speaker["full_name"],
+                "profession": speaker["profession"],
+            }
+            for speaker in included["show_speakers"]
+        }
+        self.assertEqual(
+            [
+                {
+                    **row,
+                    "astronomy_show": astronomy_shows[row["astronomy_show"]],
+                    "planetarium_dome": planetarium_domes[
+                        row["planetarium_dome"]
+                    ],
+                    "show_speakers": [
+                        show_speakers[speaker]
+                        for speaker in row["show_speakers"]
+                    ],
+                }
+                for row in json.loads(res.content)["results"]
+            ],
+            [
+                {"id": row_id, **row}
+                for row_id, row in zip(
+                    [row["id"] for row in res.data["results"]],
+                    json.loads(default.content)["results"]
+                )
+            ]
+        )
+        self.assertNotIn("included", default.data)
+        self.assertLess(len(res.content), len(default.content))
+
+        res = self.client.get(
+            detail_url(show_session.id), {"format": "normalized"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_daily_schedule_rebuild_command(self):
+        """Test whether rows changed bypassing models are repaired"""
+        show_session = sample_show_session(show_day="2025-01-02")
+        DailySchedule.objects.update(astronomy_show_title="Broken")
+        ShowSession.objects.filter(id=show_session.id).update(
+            time_start="13:00:00"
+        )
+
+        call_command("rebuild_daily_schedule", stdout=StringIO())
+
+        res = self.client.get(SHOW_SESSION_URL, {"date": "2025-01-02"})
+        self.assertEqual(
+            res.data["results"], self.date_list_expected("2025-01-02")
+        )
+
+
+class ShowSessionImportTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_superuser(
+            "admin@test.com",
+            "testpasword"
+        )
+        self.client.force_authenticate(self.admin)
+        self.astronomy_show = sample_astronomy_show()
+        self.planetarium_dome = sample_planetarium_dome()
+        self.speaker = sample_show_speaker()
+        sample_show_session(
+            astronomy_show=self.astronomy_show,
+            planetarium_dome=self.planetarium_dome,
+            show_speaker=self.speaker,
+            show_day="2025-01-02",
+            time_start="10:00:00",
+            time_end="11:00:00"
+        )
+
+    def upload(self, name, content):
+        return self.client.post(
+            IMPORT_URL,
+            {"file": SimpleUploadedFile(name, content.encode())},
+            format="multipart"
+        )
+
+    def test_import_csv_creates_valid_rows_and_reports_others(self):
+        """
+        Test whether valid sessions are created with speakers
+        and unknown shows, overlaps and invalid values are reported
+        """
+        other_dome = sample_planetarium_dome(name="Other_dome")
+        speaker = self.speaker.id
+        res = self.upload("season.csv", (
+            "astronomy_show,planetarium_dome,show_day,"
+            "time_start,time_end,show_speakers\n"
+            f"Title test,Test_dome,2025-01-02,12:00,13:00,{speaker}\n"
+            "Unknown,Test_dome,2025-01-02,14:00,15:00,\n"
+            "Title test,Test_dome,2025-01-02,10:30,11:30,\n"
+            f"Title test,Other_dome,2025-01-02,12:30,13:30,{speaker}\n"
+            "Title test,Other_dome,2025-01-02,12:30,13:30,\n"
+            "Title test,Other_dome,2025-01-32,15:00,14:00,\n"
+        ))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["created"], 2)
+        self.assertEqual(res.data["failed"], 4)
+        errors = {
+            error["row"]: error["errors"] for error in res.data["errors"]
+        }
+        self.assertEqual(sorted(errors), [2, 3, 4, 6])
+        self.assertIn("astronomy_show", errors[2])
+        self.assertIn("Test_dome", errors[3]["non_field_errors"][0])
+        self.assertIn("Bob Obo", errors[4]["non_field_errors"][0])
+        self.assertIn("show_day", errors[6])
+
+        show_session = ShowSession.objects.get(time_start="12:00")
+        self.assertEqual(
+            list(show_session.show_speakers.all()), [self.speaker]
+        )
+        self.assertTrue(
+            ShowSession.objects.filter(
+                planetarium_dome=other_dome, time_start="12:30"
+            ).exists()
+        )
+        res = self.client.get(SHOW_SESSION_URL, {"date": "2025-01-02"})
+        self.assertEqual(res.data["count"], 3)
+
+    def test_import_jsonl_command(self):
+        """Test whether dry run saves nothing and import saves sessions"""
+        rows = [
+            {
+                "astronomy_show": "Title test",
+                "planetarium_dome": "Test_dome",
+                "show_day": f"2025-02-{day:02}",
+                "time_start": "10:00:00",
+                "time_end": "11:00:00",
+                "show_speakers": [self.speaker.id],
+            }
+            for day in range(1, 11)
+        ]
+        with tempfile.NamedTemporaryFile(
+                "w", suffix=".jsonl", delete=False
+        ) as file:
+            file.write("\n".join(json.dumps(row) for row in rows))
+            file.write("\nnot json\n")
+        self.addCleanup(os.remove, file.name)
+
+        out = StringIO()
+        call_command(
+            "import_show_sessions", file.name, "--dry-run", stdout=out
+        )
+        self.assertIn("Validated 10 show sessions, 1 rows rejected",
+                      out.getvalue())
+        self.assertEqual(ShowSession.objects.count(), 1)
+
+        call_command(
+            "import_show_sessions", file.name, "--batch-size", "3",
+            stdout=StringIO()
+        )
+        self.assertEqual(
+            ShowSession.objects.filter(
+                show_speakers=self.speaker, show_day__month=2
+            ).count(),
+            10
+        )
+
+    def test_import_reports_undecodable_files(self):
+        """
+        Test whether file which isn't UTF-8 and invalid CSV rows
+        are reported instead of failing the import
+        """
+        header = (
+            "astronomy_show,planetarium_dome,show_day,"
+            "time_start,time_end,show_speakers\n"
+        )
+        for name, content in (
+                ("season.csv", header.encode() + "Зорі\n".encode("cp1251")),
+                ("season.jsonl", b'{"astronomy_show": "\xff"}\n'),
+        ):
+            with self.subTest(name=name):
+                res = self.client.post(
+                    IMPORT_URL,
+                    {"file": SimpleUploadedFile(name, content)},
+                    format="multipart"
+                )
+
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertEqual(res.data["created"], 0)
+                self.assertEqual(res.data["errors"][0]["row"], 1)
+                self.assertIn("file", res.data["errors"][0]["errors"])
+
+        res = self.upload("season.csv", (
+            header
+            + "Title test,Test_dome,2025-02-01,10:00:00,11:00:00,\n"
+            # Field larger than limit of csv module
+            + "x" * (csv.field_size_limit() + 1) + "\n"
+            + "Title test,Test_dome,2025-02-03,10:00:00,11:00:00,\n"
+        ))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["created"], 2)
+        self.assertEqual(res.data["errors"][0]["row"], 2)
+        self.assertIn("row", res.data["errors"][0]["errors"])
+
+    def test_import_forbidden_for_not_admin(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("test@test.com", "test")
+        )
+
+        res = self.upload("season.csv", "astronomy_show\n")
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
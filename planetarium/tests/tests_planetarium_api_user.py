@@ -1,11 +1,20 @@
 """File with all tests for user model"""
 
+from unittest import mock
+
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from planetarium.versions import get_cache, get_versions, object_key
+from user.authentication import USER_KEY_PREFIX
 
 
 ASTRONOMY_SHOW_URL = reverse("planetarium:astronomyshow-list")
@@ -95,3 +104,100 @@ class AuthenticatedUserPlanetariumApiTest(TestCase):
             getattr(self.user, "username"),
             None
         )
+
+
+class CachedJWTAuthenticationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpasword"
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=(
+                f"Bearer {RefreshToken.for_user(self.user).access_token}"
+            )
+        )
+        throttle_patcher = mock.patch.object(APIView, "throttle_classes", [])
+        throttle_patcher.start()
+        self.addCleanup(throttle_patcher.stop)
+
+    def user_queries(self, url):
+        """Return response and number of queries of users table"""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url)
+        return res, sum(
+            get_user_model()._meta.db_table in query["sql"]
+            for query in queries
+        )
+
+    def test_user_is_read_from_database_once(self):
+        """Test whether the next requests read user from cache"""
+        res, queries = self.user_queries(USER_ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(queries, 1)
+
+        res, queries = self.user_queries(USER_ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(queries, 0)
+        self.assertEqual(res.data["email"], "test@test.com")
+
+    def test_password_hash_is_not_cached(self):
+        """Test whether cached user keeps password hash in database"""
+        self.client.get(USER_ME_URL)
+        version = get_versions([object_key(get_user_model(), self.user.id)])
+        values = get_cache().get(
+            f"{USER_KEY_PREFIX}:{self.user.id}:{version[0]}"
+        )
+        self.assertEqual(values["email"], "test@test.com")
+        self.assertNotIn("password", values)
+
+        res = self.client.patch(USER_ME_URL, {"email": "new@test.com"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("testpasword"))
+
+    def test_update_of_user_invalidates_cache(self):
+        """Test whether user updated through API is read again"""
+        self.client.get(USER_ME_URL)
+
+        res = self.client.patch(USER_ME_URL, {"email": "new@test.com"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res, queries = self.user_queries(USER_ME_URL)
+        self.assertEqual(queries, 1)
+        self.assertEqual(res.data["email"], "new@test.com")
+
+    def test_is_staff_and_is_active_changes_invalidate_cache(self):
+        """Test whether access changes on the next request"""
+        res = self.client.post(SHOW_THEMES_URL, {"name": "Black holes"})
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+        res = self.client.post(SHOW_THEMES_URL, {"name": "Black holes"})
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.get(SHOW_THEMES_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_is_not_authenticated(self):
+        self.client.get(USER_ME_URL)
+        self.user.delete()
+
+        res = self.client.get(USER_ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_schema_has_jwt_security(self):
+        """Test whether schema documents cached JWT authentication"""
+        res = self.client.get(reverse("schema"), {"format": "json"})
+        schema = res.json()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("jwtAuth", schema["components"]["securitySchemes"])
+        self.assertIn(
+            {"jwtAuth": []},
+            schema["paths"]["/api/user/me/"]["get"]["security"]
+        )
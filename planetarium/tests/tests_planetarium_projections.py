@@ -0,0 +1,228 @@
+"""File with parity tests of projection serializers of list endpoints"""
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from drf_spectacular.drainage import GENERATOR_STATS
+from drf_spectacular.generators import SchemaGenerator
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+
+from planetarium.holds import hold_seats
+from planetarium.models import (
+    DailySchedule,
+    Reservation,
+    ShowSession,
+    ShowSpeaker,
+    Ticket
+)
+from planetarium.serializers import (
+    DailyScheduleProjectionSerializer,
+    DailyScheduleSerializer,
+    ReservationListProjectionSerializer,
+    ReservationListSerializer,
+    ShowSessionListProjectionSerializer,
+    ShowSessionListSerializer
+)
+from planetarium.tests.sample_functions import (
+    sample_astronomy_show,
+    sample_planetarium_dome,
+    sample_reservation,
+    sample_show_session,
+    sample_show_speaker
+)
+from planetarium.views import ShowSessionViewSet
+
+SHOW_SESSIONS_URL = reverse("planetarium:showsession-list")
+RESERVATIONS_URL = reverse("planetarium:reservation-list")
+
+
+def render(serializer_class, rows):
+    return JSONRenderer().render(serializer_class(rows, many=True).data)
+
+
+class ProjectionParityTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser(
+            "admin@test.com",
+            "testpasword"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        planetarium_dome = sample_planetarium_dome(name="Купол")
+        speakers = [
+            sample_show_speaker(first_name="Zoe", last_name="O'Brien"),
+            sample_show_speaker(first_name="Bob", profession="Astronomer"),
+            sample_show_speaker(first_name="Ann"),
+        ]
+        astronomy_shows = [
+            sample_astronomy_show(
+                title=f"Show «{number}»", show_theme_name=f"theme_{number}"
+            )
+            for number in range(3)
+        ]
+        self.show_sessions = []
+        for number in range(7):
+            show_session = sample_show_session(
+                astronomy_show=astronomy_shows[number % 3],
+                planetarium_dome=planetarium_dome,
+                show_speaker=speakers[number % 3],
+                show_day=f"2025-01-0{number % 2 + 1}",
+                time_start=f"1{number}:00:00",
+                time_end=f"1{number}:45:30"
+            )
+            # Sessions without speakers and with all of them
+            if number == 0:
+                show_session.show_speakers.clear()
+            if number == 1:
+                show_session.show_speakers.set(reversed(speakers))
+            self.show_sessions.append(show_session)
+
+        for number, show_session in enumerate(self.show_sessions[:3]):
+            reservation = sample_reservation(
+                user=self.user, show_session=show_session
+            )
+            for seat in range(number + 1, 0, -1):
+                Ticket.objects.create(
+                    reservation=reservation,
+                    show_session=show_session,
+                    row=2,
+                    seat=seat
+                )
+        sample_reservation(user=self.user)
+        hold_seats(self.show_sessions[1], [(5, 5), (5, 6)], self.user)
+
+    def get(self, url, params):
+        with mock.patch.object(APIView, "throttle_classes", []):
+            return self.client.get(url, params)
+
+    def test_show_session_list_projection_matches_serializer(self):
+        """Test whether projection renders the same bytes as serializer"""
+        queryset = ShowSessionViewSet.queryset.order_by(
+            "-show_day", "-time_start", "-time_end"
+        )
+
+        self.assertEqual(
+            render(
+                ShowSessionListProjectionSerializer,
+                ShowSessionListProjectionSerializer.project(queryset)
+            ),
+            render(ShowSessionListSerializer, queryset)
+        )
+
+    def test_daily_schedule_projection_matches_serializer(self):
+        """Test whether projection of daily schedule renders the same bytes"""
+        queryset = DailySchedule.objects.order_by(
+            "-show_day", "-time_start", "-time_end", "show_session_id"
+        )
+
+        self.assertEqual(
+            render(
+                DailyScheduleProjectionSerializer,
+                DailyScheduleProjectionSerializer.project(queryset)
+            ),
+            render(DailyScheduleSerializer, queryset)
+        )
+
+    def test_reservation_list_projection_matches_serializer(self):
+        """Test whether projection of reservations renders the same bytes"""
+        queryset = Reservation.objects.select_related(
+            "show_session__astronomy_show"
+        ).prefetch_related("tickets")
+
+        self.assertEqual(
+            render(
+                ReservationListProjectionSerializer,
+                ReservationListProjectionSerializer.project(queryset)
+            ),
+            render(ReservationListSerializer, queryset)
+        )
+
+    def test_list_endpoints_match_serializers(self):
+        """Test whether every page of list endpoints is the same as before"""
+        cases = [
+            (SHOW_SESSIONS_URL, {}),
+            (SHOW_SESSIONS_URL, {"page": 2}),
+            (SHOW_SESSIONS_URL, {"show_title": "«1»"}),
+            (SHOW_SESSIONS_URL, {"cursor": ""}),
+            (SHOW_SESSIONS_URL, {"date": "2025-01-01"}),
+            (SHOW_SESSIONS_URL, {"date": "2025-01-02", "cursor": ""}),
+            (RESERVATIONS_URL, {}),
+            (RESERVATIONS_URL, {"cursor": ""}),
+        ]
+        for url, params in cases:
+            with self.subTest(url=url, params=params):
+                res = self.get(url, params)
+
+                self.assertEqual(res.status_code, 200)
+                with override_settings(PLANETARIUM_LIST_PROJECTIONS=False):
+                    expected = self.get(url, params)
+
+                self.assertEqual(res.content, expected.content)
+                self.assertTrue(res.json()["results"])
+
+    def test_list_endpoints_match_schema(self):
+        """
+        Test whether rows of projections have the fields which schema
+        documents with serializers the projections replace
+        """
+        # Warnings of other views aren't what is tested
+        with GENERATOR_STATS.silence():
+            schema = SchemaGenerator().get_schema(request=None, public=True)
+        components = schema["components"]["schemas"]
+        cases = [
+            ("/api/planetarium/show_sessions/", SHOW_SESSIONS_URL, {}),
+            (
+                "/api/planetarium/show_sessions/",
+                SHOW_SESSIONS_URL,
+                {"date": "2025-01-01"}
+            ),
+            ("/api/planetarium/reservations/", RESERVATIONS_URL, {}),
+        ]
+        for path, url, params in cases:
+            with self.subTest(url=url, params=params):
+                page = schema["paths"][path]["get"]["responses"]["200"][
+                    "content"
+                ]["application/json"]["schema"]["$ref"].split("/")[-1]
+                row = components[page]["properties"]["results"]["items"][
+                    "$ref"
+                ].split("/")[-1]
+
+                res = self.get(url, params)
+
+                self.assertEqual(
+                    set(res.json()["results"][0]),
+                    set(components[row]["properties"])
+                )
+
+    def test_projection_reads_page_with_fixed_queries(self):
+        """Test whether number of queries doesn't depend on rows"""
+        show_session = self.show_sessions[2]
+        for number in range(5):
+            ShowSession.objects.get(pk=show_session.pk).show_speakers.add(
+                ShowSpeaker.objects.create(
+                    first_name=f"Speaker {number}",
+                    last_name="Test",
+                    profession="Test"
+                )
+            )
+        queryset = ShowSessionListProjectionSerializer.project(
+            ShowSessionViewSet.queryset.order_by("id")
+        )
+
+        # Rows and speakers of all rows
+        with self.assertNumQueries(2):
+            data = ShowSessionListProjectionSerializer(
+                queryset, many=True
+            ).data
+
+        self.assertEqual(len(data), len(self.show_sessions))
+        self.assertEqual(
+            data[2]["tickets_available"],
+            show_session.planetarium_dome.capacity - 3
+        )
@@ -0,0 +1,104 @@
+"""File with tests of query plan inspector and index advisor"""
+
+from io import StringIO
+
+from django.apps import apps
+from django.core.management import call_command
+from django.test import TestCase
+
+from planetarium.models import Ticket
+from planetarium.query_plans import IndexAdvisor, format_operation
+from planetarium.seeding import seed
+from planetarium.versions import get_collection_versions
+
+
+def sample_plan(node):
+    return {"Plan": {"Node Type": "Aggregate", "Plans": [node]}}
+
+
+class IndexAdvisorTest(TestCase):
+    def setUp(self):
+        self.advisor = IndexAdvisor(min_rows=0)
+
+    def test_seq_scan_with_filter_gets_index(self):
+        """Test whether index is proposed for filtered column"""
+        problems = self.advisor.check(sample_plan({
+            "Node Type": "Seq Scan",
+            "Relation Name": "planetarium_ticket",
+            "Filter": "(\"row\" = 3)",
+        }))
+
+        self.assertEqual(problems[0].kind, "seq_scan")
+        model, fields, name = problems[0].index
+        self.assertEqual(model, Ticket)
+        self.assertEqual(fields, ["row"])
+        self.assertLessEqual(len(name), 30)
+        self.assertIn(
+            'migrations.AddIndex(model_name="ticket"',
+            format_operation(model, fields, name)
+        )
+
+    def test_existing_index_is_not_proposed(self):
+        """Test whether sort by columns of existing index needs no index"""
+        problems = self.advisor.check(sample_plan({
+            "Node Type": "Sort",
+            "Sort Method": "external merge",
+            "Sort Key": [
+                "planetarium_showsession.show_day",
+                "planetarium_showsession.time_start",
+            ],
+            "Plans": [{
+                "Node Type": "Seq Scan",
+                "Relation Name": "planetarium_showsession",
+            }],
+        }))
+
+        self.assertEqual(
+            [problem.kind for problem in problems],
+            ["disk_sort", "seq_scan"]
+        )
+        self.assertEqual([problem.index for problem in problems], [None, None])
+
+    def test_pattern_match_needs_trigram_index(self):
+        """Test whether LIKE filters aren't given B-tree indexes"""
+        problems = self.advisor.check(sample_plan({
+            "Node Type": "Seq Scan",
+            "Relation Name": "planetarium_astronomyshow",
+            "Filter": "(upper((title)::text) ~~ '%MOON%'::text)",
+        }))
+
+        self.assertIn("trigram", problems[0].message)
+        self.assertIsNone(problems[0].index)
+
+
+class ExplainQueriesCommandTest(TestCase):
+    def test_command_explains_queries_of_endpoints(self):
+        """Test whether every endpoint case is explained"""
+        seed(
+            planetarium_domes=1,
+            show_themes=2,
+            show_speakers=2,
+            astronomy_shows=2,
+            show_sessions=4,
+            users=2,
+            reservations=10,
+            tickets=20
+        )
+        tickets = Ticket.objects.count()
+        models = list(apps.get_app_config("planetarium").get_models())
+        versions = get_collection_versions(models)
+        out = StringIO()
+
+        call_command("explain_queries", "--plans", stdout=out)
+
+        output = out.getvalue()
+        for case in (
+                "show_sessions.list[date]",
+                "show_sessions.seat_map",
+                "reservations.retrieve",
+                "search.list",
+        ):
+            self.assertIn(case, output)
+        self.assertIn("Index Scan", output)
+        self.assertEqual(Ticket.objects.count(), tickets)
+        self.assertEqual(get_collection_versions(models), versions)
@@ -0,0 +1,137 @@
+"""File with tests of JSON and MessagePack renderers and parser"""
+
+import datetime
+import decimal
+import json
+import uuid
+from unittest import mock
+
+import msgpack
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework.utils.serializer_helpers import ReturnDict
+from rest_framework.views import APIView
+
+from planetarium.models import ShowTheme
+from planetarium.renderers import FastJSONRenderer, MessagePackRenderer
+from planetarium.tests.sample_functions import sample_show_session
+
+SHOW_SESSION_URL = reverse("planetarium:showsession-list")
+SHOW_THEMES_URL = reverse("planetarium:showtheme-list")
+MSGPACK = "application/msgpack"
+
+DATA = ReturnDict(
+    {
+        "id": 1,
+        "title": "Зоряне небо\u2028\u2029 \"quoted\"",
+        "created_at": timezone.make_aware(
+            datetime.datetime(2025, 1, 2, 10, 30, 15, 123456),
+            datetime.timezone.utc
+        ),
+        "show_day": datetime.date(2025, 1, 2),
+        "time_start": datetime.time(10, 30),
+        "price": decimal.Decimal("12.50"),
+        "token": uuid.UUID(int=1),
+        "tickets": [{"row": 1, "seat": 2}, {"row": 1, "seat": 3}],
+        "held_seats": {5: [1, 2]},
+        "ratio": 0.1,
+        "empty": None,
+    },
+    serializer=None
+)
+
+
+class RenderersTest(SimpleTestCase):
+    def test_fast_json_renders_same_bytes_as_json_renderer(self):
+        """Test whether orjson output is the same as of DRF renderer"""
+        for media_type in ("application/json", "application/json; indent=4"):
+            with self.subTest(media_type=media_type):
+                self.assertEqual(
+                    FastJSONRenderer().render(DATA, media_type),
+                    JSONRenderer().render(DATA, media_type)
+                )
+
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+        self.assertEqual(
+            FastJSONRenderer().render({"big": 2 ** 70}),
+            JSONRenderer().render({"big": 2 ** 70})
+        )
+
+    def test_msgpack_has_the_same_data_as_json(self):
+        # Keys of MessagePack maps aren't converted to strings
+        data = {
+            key: value for key, value in DATA.items() if key != "held_seats"
+        }
+
+        self.assertEqual(
+            msgpack.unpackb(MessagePackRenderer().render(data)),
+            json.loads(JSONRenderer().render(data))
+        )
+
+
+class MessagePackApiTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            "admin@test.com",
+            "testpasword"
+        )
+        self.client.force_authenticate(self.user)
+        sample_show_session()
+
+    def get(self, url, **headers):
+        with mock.patch.object(APIView, "throttle_classes", []):
+            return self.client.get(url, **headers)
+
+    def test_list_negotiated_by_accept_header(self):
+        """Test whether MessagePack is rendered when it's accepted"""
+        expected = self.get(SHOW_SESSION_URL)
+        res = self.get(SHOW_SESSION_URL, HTTP_ACCEPT=MSGPACK)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], MSGPACK)
+        self.assertEqual(msgpack.unpackb(res.content), expected.json())
+        self.assertIn("Accept", res["Vary"])
+        self.assertNotEqual(res["ETag"], expected["ETag"])
+
+        not_modified = self.get(
+            SHOW_SESSION_URL,
+            HTTP_ACCEPT=MSGPACK,
+            HTTP_IF_NONE_MATCH=res["ETag"]
+        )
+        self.assertEqual(
+            not_modified.status_code, status.HTTP_304_NOT_MODIFIED
+        )
+
+    def test_create_from_msgpack_body(self):
+        """Test whether MessagePack request body is parsed"""
+        with mock.patch.object(APIView, "throttle_classes", []):
+            res = self.client.post(
+                SHOW_THEMES_URL,
+                msgpack.packb({"name": "Black holes"}),
+                content_type=MSGPACK,
+                HTTP_ACCEPT=MSGPACK
+            )
+            invalid = [
+                self.client.post(SHOW_THEMES_URL, body, content_type=MSGPACK)
+                # Reserved byte, truncated, extra data, too deep, bad key
+                for body in (
+                    b"\xc1",
+                    b"\x81\xa4name",
+                    b"\x80\x01",
+                    b"\x91" * 2000,
+                    b"\x81\x90\x01",
+                )
+            ]
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(msgpack.unpackb(res.content)["name"], "Black holes")
+        self.assertTrue(ShowTheme.objects.filter(name="Black holes").exists())
+        for res in invalid:
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
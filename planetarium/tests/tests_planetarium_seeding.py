@@ -0,0 +1,118 @@
+"""File with tests of synthetic data generator"""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.test import TestCase
+
+from planetarium.models import (
+    ShowSession,
+    ShowSessionTicketCounter,
+    Ticket
+)
+from planetarium.scheduling import SpeakerScheduleIndex
+from planetarium.seeding import START_DAY, seed
+
+VOLUMES = {
+    "planetarium_domes": 2,
+    "show_themes": 3,
+    "show_speakers": 5,
+    "astronomy_shows": 4,
+    "show_sessions": 40,
+    "users": 3,
+    "reservations": 300,
+    "tickets": 1000,
+}
+
+
+def data_signature():
+    """Function to describe seeded data independently of ids"""
+    return sorted(
+        Ticket.objects.values_list(
+            "show_session__show_day",
+            "show_session__time_start",
+            "show_session__planetarium_dome__name",
+            "show_session__astronomy_show__title",
+            "row",
+            "seat",
+            "reservation__created_at",
+            "reservation__user__email",
+        )
+    )
+
+
+class SeedPlanetariumTest(TestCase):
+    def test_seed_command_creates_requested_volumes(self):
+        """Test whether command creates catalog and sells tickets"""
+        out = StringIO()
+
+        call_command(
+            "seed_planetarium",
+            "--seed", "3",
+            *(
+                f"--{name.replace('_', '-')}={volume}"
+                for name, volume in VOLUMES.items()
+            ),
+            stdout=out
+        )
+
+        self.assertIn("40 show_sessions", out.getvalue())
+        self.assertEqual(ShowSession.objects.count(), 40)
+        self.assertAlmostEqual(Ticket.objects.count(), 1000, delta=300)
+
+    def test_seeded_data_respects_model_invariants(self):
+        """Test whether seats are valid and speakers are never busy twice"""
+        counts = seed(random_seed=1, **VOLUMES)
+
+        self.assertFalse(
+            Ticket.objects.filter(
+                Q(row__lt=1)
+                | Q(seat__lt=1)
+                | Q(row__gt=F("show_session__planetarium_dome__rows"))
+                | Q(seat__gt=F(
+                    "show_session__planetarium_dome__seats_in_row"
+                ))
+            ).exists()
+        )
+
+        index = SpeakerScheduleIndex.load(
+            START_DAY, ShowSession.objects.latest("show_day").show_day
+        )
+        for show_session in ShowSession.objects.prefetch_related(
+                "show_speakers"
+        ):
+            self.assertTrue(show_session.show_speakers.all())
+            index.validate_show_speakers(
+                show_session.show_speakers.all(),
+                show_session.show_day,
+                show_session.time_start,
+                show_session.time_end,
+                exclude_show_session_id=show_session.id
+            )
+
+        tickets_sold = dict(
+            Ticket.objects.values("show_session_id").annotate(
+                count=Count("id")
+            ).values_list("show_session_id", "count")
+        )
+        counters = dict(
+            ShowSessionTicketCounter.objects.values_list(
+                "show_session_id", "tickets_sold"
+            )
+        )
+        self.assertEqual(counters, tickets_sold)
+        self.assertEqual(counts["tickets"], sum(tickets_sold.values()))
+
+    def test_the_same_seed_gives_the_same_data(self):
+        """Test whether data is reproducible from seed"""
+        signatures = []
+        for _ in range(2):
+            with transaction.atomic():
+                seed(random_seed=2, **VOLUMES)
+                signatures.append(data_signature())
+                transaction.set_rollback(True)
+
+        self.assertEqual(signatures[0], signatures[1])
+        self.assertTrue(signatures[0])
@@ -0,0 +1,322 @@
+"""
+Per-request timing of SQL queries, serialization and views.
+
+ServerTimingMiddleware measures every request: number and time
+of SQL queries (execute wrapper of every database connection),
+time of serializers and rendering of response (serialize), the rest
+of view time (view) and the whole request (total). Measured parts
+don't overlap: queries run by serializers are counted as db.
+Serializers are timed by views: ServerTimingMixin times data
+of list and retrieve of viewsets, other views use timed_serialization.
+
+Timings are sent in Server-Timing header, which browsers show in
+developer tools, to staff users and to sampled part of requests
+(PLANETARIUM_SERVER_TIMING_SAMPLE_RATE), and aggregated by viewset
+action: averages are logged to "planetarium.timing" logger every
+PLANETARIUM_SERVER_TIMING_LOG_INTERVAL seconds.
+
+Measurement is a few clock reads per request and per query,
+so middleware can be kept on in production (look at the
+server_timing benchmark), PLANETARIUM_SERVER_TIMING = False
+removes it completely.
+"""
+
+import contextvars
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils.functional import SimpleLazyObject, empty
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+current_timing = contextvars.ContextVar("current_timing", default=None)
+
+
+def is_enabled():
+    return getattr(settings, "PLANETARIUM_SERVER_TIMING", True)
+
+
+class RequestTiming:
+
+    """Timings of one request in seconds"""
+
+    __slots__ = (
+        "queries", "db", "serialize", "serializing", "view", "view_started"
+    )
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.serializing = False
+        self.view = 0.0
+        self.view_started = None
+
+    def start_view(self):
+        self.view_started = (time.perf_counter(), self.db, self.serialize)
+
+    def finish_view(self):
+        """Function to take view time without queries and serialization"""
+        if self.view_started is None:
+            return
+        started, db, serialize = self.view_started
+        self.view_started = None
+        self.view = (
+            time.perf_counter() - started
+            - (self.db - db) - (self.serialize - serialize)
+        )
+
+    def header(self, total):
+        return ", ".join(
+            (
+                f'db;dur={self.db * 1000:.2f};desc="{self.queries} queries"',
+                f"serialize;dur={self.serialize * 1000:.2f}",
+                f"view;dur={self.view * 1000:.2f}",
+                f"total;dur={total * 1000:.2f}",
+            )
+        )
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper of connections which counts queries of request"""
+    timing = current_timing.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.queries += 1
+        timing.db += time.perf_counter() - started
+
+
+def add_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def timed_serialization():
+    """
+    Context manager to count time of block as serialization
+    of current request, only the outermost block is counted
+    """
+    timing = current_timing.get()
+    if timing is None or timing.serializing:
+        yield
+        return
+
+    timing.serializing = True
+    started, db = time.perf_counter(), timing.db
+    try:
+        yield
+    finally:
+        timing.serializing = False
+        timing.serialize += time.perf_counter() - started - (timing.db - db)
+
+
+class ServerTimingMixin:
+
+    """
+    Mixin for viewsets to count data of serializers of list and retrieve
+    as serialization time of Server-Timing, it's put right before
+    the viewset class, serializers of other actions are counted as view
+    """
+
+    # Actions have no docstrings, schema takes descriptions from them
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            with timed_serialization():
+                data = serializer.data
+            return self.get_paginated_response(data)
+
+        serializer = self.get_serializer(queryset, many=True)
+        with timed_serialization():
+            data = serializer.data
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        serializer = self.get_serializer(self.get_object())
+        with timed_serialization():
+            data = serializer.data
+        return Response(data)
+
+
+def connect_timing():
+    """Function to record queries of every database connection"""
+    if not is_enabled():
+        return
+
+    connection_created.connect(add_query_recorder)
+    for connection in connections.all(initialized_only=True):
+        add_query_recorder(connection)
+
+
+def get_action(request):
+    """Function to get name of viewset action (or view method) of request"""
+    resolver_match = getattr(request, "resolver_match", None)
+    if resolver_match is None:
+        return None
+
+    view = resolver_match.func
+    view_class = getattr(view, "cls", None) or getattr(
+        view, "view_class", None
+    )
+    if view_class is None:
+        return resolver_match.view_name
+
+    method = request.method.lower()
+    actions = getattr(view, "actions", None) or {}
+    return f"{view_class.__name__}.{actions.get(method, method)}"
+
+
+def is_staff(request):
+    """
+    Function to check user of request without loading it
+    from session, it can't be done in async context
+    """
+    user = getattr(request, "user", None)
+    if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+        return False
+    return user is not None and user.is_staff
+
+
+class TimingAggregates:
+
+    """Sums of timings by action which are logged and reset periodically"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.actions = {}
+        self.logged_at = time.monotonic()
+
+    def add(self, action, timing, total):
+        with self.lock:
+            stats = self.actions.setdefault(
+                action,
+                {
+                    "requests": 0, "queries": 0, "db": 0.0,
+                    "serialize": 0.0, "view": 0.0, "total": 0.0, "max": 0.0
+                }
+            )
+            stats["requests"] += 1
+            stats["queries"] += timing.queries
+            stats["db"] += timing.db
+            stats["serialize"] += timing.serialize
+            stats["view"] += timing.view
+            stats["total"] += total
+            stats["max"] = max(stats["max"], total)
+
+            if time.monotonic() - self.logged_at < self.interval:
+                return
+            actions, self.actions = self.actions, {}
+            self.logged_at = time.monotonic()
+
+        for action, stats in sorted(actions.items()):
+            count = stats["requests"]
+            logger.info(
+                "%s: %d requests, avg %.2f ms (db %.2f ms, %.1f queries, "
+                "serialize %.2f ms, view %.2f ms), max %.2f ms",
+                action,
+                count,
+                stats["total"] * 1000 / count,
+                stats["db"] * 1000 / count,
+                stats["queries"] / count,
+                stats["serialize"] * 1000 / count,
+                stats["view"] * 1000 / count,
+                stats["max"] * 1000
+            )
+
+
+class ServerTimingMiddleware:
+
+    """
+    Middleware which measures requests (look at module docstring),
+    it should be the first one to measure the whole request
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not is_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(
+            settings, "PLANETARIUM_SERVER_TIMING_SAMPLE_RATE", 0.01
+        )
+        self.aggregates = TimingAggregates(
+            getattr(settings, "PLANETARIUM_SERVER_TIMING_LOG_INTERVAL", 60)
+        )
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        return self.finish(request, response, timing, started)
+
+    async def __acall__(self, request):
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        return self.finish(request, response, timing, started)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timing = current_timing.get()
+        if timing is not None:
+            timing.start_view()
+
+    def process_template_response(self, request, response):
+        """Function to time rendering of response (e.g. to JSON)"""
+        timing = current_timing.get()
+        if timing is None:
+            return response
+
+        timing.finish_view()
+        started = time.perf_counter()
+
+        def finish_rendering(response):
+            timing.serialize += time.perf_counter() - started
+
+        response.add_post_render_callback(finish_rendering)
+        return response
+
+    def finish(self, request, response, timing, started):
+        timing.finish_view()
+        total = time.perf_counter() - started
+
+        action = get_action(request)
+        if action is not None:
+            self.aggregates.add(action, timing, total)
+
+        if is_staff(request) or random.random() < self.sample_rate:
+            response["Server-Timing"] = timing.header(total)
+        return response
@@ -9,7 +9,9 @@ from planetarium.views import (
     ShowSessionViewSet,
     PlanetariumDomeViewSet,
     ShowThemeViewSet,
-    AstronomyShowViewSet
+    AstronomyShowViewSet,
+    SearchViewSet,
+    CacheStatsView
 )
 
 app_name = "planetarium"
@@ -22,5 +24,9 @@ router.register("show_sessions", ShowSessionViewSet)
 router.register("show_themes", ShowThemeViewSet)
 router.register("planetarium_domes", PlanetariumDomeViewSet)
 router.register("astronomy_shows", AstronomyShowViewSet)
+router.register("search", SearchViewSet, basename="search")
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path("", include(router.urls)),
+    path("cache_stats/", CacheStatsView.as_view(), name="cache-stats"),
+]
@@ -0,0 +1,187 @@
+"""
+Versions of model collections and objects for conditional GET requests.
+
+Version is time in microseconds of the last change, it's kept in Django
+cache: one key per model (collection) and one key per object.
+Every change of model bumps its collection version, changes of single
+object (e.g. ticket sales of show session) also bump object version.
+If version is missing in cache (evicted), it's set to current time,
+so it never goes back to older value.
+
+Viewsets answer If-None-Match / If-Modified-Since with 304 response
+after reading versions only, without querying database and serializing.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+KEY_PREFIX = "planetarium:version"
+
+
+def get_cache():
+    return caches[getattr(settings, "PLANETARIUM_CACHE_ALIAS", "default")]
+
+
+def now():
+    return time.time_ns() // 1000
+
+
+def collection_key(model):
+    return f"{KEY_PREFIX}:{model._meta.label_lower}"
+
+
+def object_key(model, pk):
+    return f"{KEY_PREFIX}:{model._meta.label_lower}:{pk}"
+
+
+def get_versions(keys):
+    """Function to read versions of given keys with one cache request"""
+    cache = get_cache()
+    versions = cache.get_many(keys)
+    missing = {key: now() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def get_collection_versions(models):
+    return get_versions([collection_key(model) for model in models])
+
+
+def bump(model, pk=None):
+    """Function to set new version of model collection (and its object)"""
+    version = now()
+    keys = {collection_key(model): version}
+    if pk is not None:
+        keys[object_key(model, pk)] = version
+    get_cache().set_many(keys, timeout=None)
+
+
+def invalidate(model, pk=None):
+    """
+    Function to bump version now and once more after commit,
+    so response built from data read before commit isn't reused
+    """
+    bump(model, pk)
+    transaction.on_commit(lambda: bump(model, pk))
+
+
+class ConditionalGetMixin:
+
+    """
+    Mixin for viewsets to answer conditional list and retrieve requests.
+    version_dependencies - models which data is shown in responses,
+    retrieve also depends on version of object itself.
+    """
+
+    version_dependencies = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_versions(self, kwargs):
+        keys = [collection_key(model) for model in self.version_dependencies]
+        if self.detail:
+            keys.append(
+                object_key(
+                    self.queryset.model,
+                    kwargs[self.lookup_url_kwarg or self.lookup_field]
+                )
+            )
+        return get_versions(keys)
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        versions = self.get_versions(kwargs)
+        etag = quote_etag(
+            hashlib.md5(
+                repr((
+                    self.action,
+                    self.get_serializer_class().__name__,
+                    sorted(request.query_params.lists()),
+                    # JSON and MessagePack are different representations
+                    getattr(request, "accepted_media_type", None),
+                    versions,
+                )).encode()
+            ).hexdigest()
+        )
+        last_modified = max(versions) // 1_000_000 if versions else None
+
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if not_modified is not None:
+            return not_modified
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            patch_vary_headers(response, ["Accept"])
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
+
+
+def connect_version_signals(models, tickets_sold_changed):
+    """
+    Function to bump versions when models or their many-to-many
+    relations are changed and when tickets of show session are sold
+    """
+    owners = {}
+
+    def invalidate_instance(sender, instance, **kwargs):
+        invalidate(sender, instance.pk)
+
+    def invalidate_relation(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+        if not action.startswith("post_"):
+            return
+        owner = owners[sender]
+        if not reverse:
+            invalidate(owner, instance.pk)
+        elif pk_set:
+            for pk in pk_set:
+                invalidate(owner, pk)
+        else:
+            invalidate(owner)
+
+    def invalidate_show_session(sender, show_session_id, **kwargs):
+        invalidate(sender, show_session_id)
+
+    for model in models:
+        for signal in (post_save, post_delete):
+            signal.connect(
+                invalidate_instance,
+                sender=model,
+                weak=False,
+                dispatch_uid=f"{KEY_PREFIX}:{model._meta.label_lower}"
+            )
+        for field in model._meta.many_to_many:
+            through = field.remote_field.through
+            owners[through] = model
+            m2m_changed.connect(
+                invalidate_relation,
+                sender=through,
+                weak=False,
+                dispatch_uid=f"{KEY_PREFIX}:{through._meta.label_lower}"
+            )
+
+    tickets_sold_changed.connect(
+        invalidate_show_session,
+        weak=False,
+        dispatch_uid=f"{KEY_PREFIX}:tickets_sold"
+    )
@@ -1,65 +1,122 @@
 """All views of this project"""
 
 
-from datetime import datetime
+from datetime import datetime, timezone
 
+from django.conf import settings
 from django.db.models import (
     F,
-    Count,
     ExpressionWrapper,
     IntegerField,
     Prefetch
 )
+from django.http import StreamingHttpResponse
 
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 
 from rest_framework import viewsets, status
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
 from rest_framework.response import Response
 
 
 from planetarium.models import (
+    DailySchedule,
     PlanetariumDome,
     ShowTheme,
     ShowSession,
+    ShowSessionTicketCounter,
     ShowSpeaker,
     AstronomyShow,
     Ticket,
     Reservation
 )
 from planetarium.serializers import (
+    DailyScheduleProjectionSerializer,
+    DailyScheduleSerializer,
     PlanetariumDomeSerializer,
     ShowThemeSerializer,
+    AstronomyShowSerializer,
     ShowSessionSerializer,
     ShowSpeakerSerializer,
     TicketSerializer,
     ReservationSerializer,
     AstronomyShowPosterSerializer,
     ReservationListSerializer,
+    ReservationListProjectionSerializer,
     ReservationDetailSerializer,
+    ReservationExportSerializer,
     ShowSpeakerListSerializer,
     ShowSpeakerDetailSerializer,
     ShowThemeListSerializer,
     ShowThemeDetailSerializer,
     ShowSessionListSerializer,
+    ShowSessionListProjectionSerializer,
+    ShowSessionNormalizedSerializer,
     ShowSessionDetailSerializer,
+    ShowSessionSeatMapSerializer,
+    SeatHoldSerializer,
+    ShowSessionImportSerializer,
+    ProjectionSerializer,
     AstronomyShowListSerializer,
     AstronomyShowDetailSerializer
 )
+from planetarium.cache import CachedResponseMixin, get_stats
+from planetarium.exports import CONTENT_TYPES, export_reservations
+from planetarium.holds import (
+    get_hold,
+    get_holds_version,
+    hold_seats,
+    release_hold
+)
+from planetarium.imports import get_format, import_show_sessions
+from planetarium.pagination import PageNumberOrKeysetPagination
+from planetarium.renderers import NormalizedJSONRenderer
+from planetarium.posters import schedule_poster_processing
+from planetarium.search import search, search_astronomy_shows
+from planetarium.seat_map import build_seat_map
+from planetarium.timing import ServerTimingMixin, timed_serialization
+from planetarium.versions import ConditionalGetMixin
+
+
+def uses_list_projections():
+    return getattr(settings, "PLANETARIUM_LIST_PROJECTIONS", True)
+
+
+class ListProjectionMixin:
 
+    """
+    Mixin for viewsets which list is served by projection serializer
+    (look at ProjectionSerializer) unless PLANETARIUM_LIST_PROJECTIONS
+    is off, queryset is turned into rows of the serializer
+    """
 
-class PlanetariumDomeViewSet(viewsets.ModelViewSet):
+    def project_for_list(self, queryset):
+        serializer_class = self.get_serializer_class()
+        if issubclass(serializer_class, ProjectionSerializer):
+            return serializer_class.project(queryset)
+        return queryset
+
+
+class PlanetariumDomeViewSet(
+    CachedResponseMixin,
+    ServerTimingMixin,
+    viewsets.ModelViewSet
+):
     queryset = PlanetariumDome.objects.all()
     serializer_class = PlanetariumDomeSerializer
+    cache_dependencies = (PlanetariumDome,)
 
     def get_queryset(self):
         """
         Get correct queryset to avoid N+1 problem
         and filter it by capacity
         """
-        queryset = self.queryset
+        queryset = self.queryset.all()
 
         capacity = self.request.query_params.get("capacity", None)
 
@@ -92,9 +149,14 @@ class PlanetariumDomeViewSet(viewsets.ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class ShowThemeViewSet(viewsets.ModelViewSet):
+class ShowThemeViewSet(
+    CachedResponseMixin,
+    ServerTimingMixin,
+    viewsets.ModelViewSet
+):
     queryset = ShowTheme.objects.all()
     serializer_class = ShowThemeSerializer
+    cache_dependencies = (ShowTheme,)
 
     def get_serializer_class(self):
         """Function to choose correct serializer"""
@@ -111,13 +173,17 @@ class ShowThemeViewSet(viewsets.ModelViewSet):
         Get correct queryset to avoid N+1 problem
         and filter it by name
         """
-        queryset = self.queryset
+        queryset = self.queryset.all()
 
         name = self.request.query_params.get("name")
+        text = self.request.query_params.get("search")
 
         if name:
             queryset = queryset.filter(name__icontains=name)
 
+        if text:
+            queryset = search(queryset, text)
+
         return queryset
 
     @extend_schema(
@@ -126,6 +192,14 @@ class ShowThemeViewSet(viewsets.ModelViewSet):
                 name="name",
                 type=OpenApiTypes.STR,
                 description="Find show theme by name (ex. ?name=name)"
+            ),
+            OpenApiParameter(
+                name="search",
+                type=OpenApiTypes.STR,
+                description=(
+                    "Fuzzy search by name, "
+                    "ordered by relevance (ex. ?search=text)"
+                )
             )
         ]
     )
@@ -134,12 +208,25 @@ class ShowThemeViewSet(viewsets.ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class ShowSessionPagination(PageNumberPagination):
+class ShowSessionPagination(PageNumberOrKeysetPagination):
     page_size = 5
     max_page_size = 10
+    keyset_ordering = ("-show_day", "-time_start", "-time_end", "id")
+
+
+class DailySchedulePagination(ShowSessionPagination):
+    # Values are the same as in ShowSessionPagination, so are cursors
+    keyset_ordering = (
+        "-show_day", "-time_start", "-time_end", "show_session_id"
+    )
 
 
-class ShowSessionViewSet(viewsets.ModelViewSet):
+class ShowSessionViewSet(
+    ConditionalGetMixin,
+    ListProjectionMixin,
+    ServerTimingMixin,
+    viewsets.ModelViewSet
+):
     queryset = (
         ShowSession.objects.all()
         .select_related(
@@ -147,26 +234,83 @@ class ShowSessionViewSet(viewsets.ModelViewSet):
             "planetarium_dome"
         )
         .prefetch_related(
-            "show_speakers"
+            # The same order of speakers as in daily schedule
+            Prefetch(
+                "show_speakers",
+                queryset=ShowSpeaker.objects.order_by("id")
+            )
         )
         .annotate(
             tickets_available=(
                     F("planetarium_dome__rows")
                     * F("planetarium_dome__seats_in_row")
-                    - Count("tickets")
+                    - ShowSessionTicketCounter.tickets_sold_expression()
             )
         )
     )
     serializer_class = ShowSessionSerializer
     pagination_class = ShowSessionPagination
+    version_dependencies = (
+        ShowSession, AstronomyShow, PlanetariumDome, ShowSpeaker
+    )
+
+    def get_versions(self, kwargs):
+        """
+        Held seats are subtracted from tickets available,
+        so responses change when hold lapses as well
+        """
+        return super().get_versions(kwargs) + [get_holds_version()]
+
+    @property
+    def paginator(self):
+        if self.uses_daily_schedule():
+            self.pagination_class = DailySchedulePagination
+        return super().paginator
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if self.action == "list":
+            renderers.append(NormalizedJSONRenderer())
+        return renderers
+
+    def uses_normalized_format(self):
+        return self.action == "list" and isinstance(
+            getattr(self.request, "accepted_renderer", None),
+            NormalizedJSONRenderer
+        )
+
+    def uses_daily_schedule(self):
+        # Daily schedule doesn't keep ids of shows, domes and speakers
+        return (
+            self.action == "list"
+            and not self.uses_normalized_format()
+            and self.is_daily_schedule_query(self.request.query_params)
+        )
 
     def get_serializer_class(self):
         """Function to choose correct serializer"""
         serializer_class = self.serializer_class
         if self.action == "list":
-            serializer_class = ShowSessionListSerializer
+            projections = uses_list_projections()
+            serializer_class = (
+                ShowSessionListProjectionSerializer if projections
+                else ShowSessionListSerializer
+            )
+            if self.uses_daily_schedule():
+                serializer_class = (
+                    DailyScheduleProjectionSerializer if projections
+                    else DailyScheduleSerializer
+                )
+            if self.uses_normalized_format():
+                serializer_class = ShowSessionNormalizedSerializer
         if self.action == "retrieve":
             serializer_class = ShowSessionDetailSerializer
+        if self.action == "seat_map":
+            serializer_class = ShowSessionSeatMapSerializer
+        if self.action in ("hold", "release_hold"):
+            serializer_class = SeatHoldSerializer
+        if self.action == "import_sessions":
+            serializer_class = ShowSessionImportSerializer
 
         return serializer_class
 
@@ -175,25 +319,90 @@ class ShowSessionViewSet(viewsets.ModelViewSet):
         Get correct queryset to avoid N+1 problem
         and filter it by date and show title
         """
-        queryset = self.queryset
+        if self.action in ("seat_map", "hold", "release_hold"):
+            return ShowSession.objects.select_related("planetarium_dome")
+
+        if self.uses_daily_schedule():
+            queryset = self.filter_daily_schedule(self.request.query_params)
+        else:
+            queryset = self.filter_by_query_params(
+                self.queryset, self.request.query_params
+            )
 
-        date = self.request.query_params.get("date")
-        show_title = self.request.query_params.get("show_title")
+        return self.project_for_list(queryset)
+
+    def get_paginated_response(self, data):
+        """Function to add objects side-loaded by normalized list"""
+        response = super().get_paginated_response(data)
+        if self.uses_normalized_format():
+            response.data["included"] = data.serializer.included
+        return response
+
+    @staticmethod
+    def parse_date(date):
+        try:
+            return datetime.strptime(date, "%Y-%m-%d").date()
+        except ValueError:
+            raise ValueError(
+                "Incorrect date format, should be YYYY-MM-DD"
+            )
+
+    @staticmethod
+    def is_daily_schedule_query(query_params):
+        """
+        Function to check whether sessions list is read from
+        daily schedule: sessions of one date without search
+        """
+        return bool(query_params.get("date")) and not query_params.get(
+            "search"
+        )
+
+    @staticmethod
+    def filter_daily_schedule(query_params):
+        """
+        Function to filter rows of daily schedule by date and show title
+        """
+        queryset = DailySchedule.objects.filter(
+            show_day=ShowSessionViewSet.parse_date(query_params["date"])
+        )
+
+        show_title = query_params.get("show_title")
+
+        if show_title:
+            queryset = queryset.filter(
+                astronomy_show_title__icontains=show_title
+            )
+
+        return queryset.order_by(
+            "-show_day", "-time_start", "-time_end", "show_session_id"
+        )
+
+    @staticmethod
+    def filter_by_query_params(queryset, query_params):
+        """
+        Function to filter show sessions by date, show title
+        and search text
+        """
+        date = query_params.get("date")
+        show_title = query_params.get("show_title")
 
         if date:
-            try:
-                date = datetime.strptime(date, "%Y-%m-%d").date()
-                queryset = queryset.filter(show_day=date)
-            except ValueError:
-                raise ValueError(
-                    "Incorrect date format, should be YYYY-MM-DD"
-                )
+            queryset = queryset.filter(
+                show_day=ShowSessionViewSet.parse_date(date)
+            )
 
         if show_title:
             queryset = queryset.filter(
                 astronomy_show__title__icontains=show_title
             )
 
+        text = query_params.get("search")
+
+        if text:
+            queryset = queryset.filter(
+                astronomy_show__in=search_astronomy_shows(text)
+            )
+
         return queryset.order_by("-show_day", "-time_start", "-time_end")
 
     @extend_schema(
@@ -213,16 +422,163 @@ class ShowSessionViewSet(viewsets.ModelViewSet):
                         "(ex. ?date=2022-10-23)"
                 ),
             ),
-        ]
+            OpenApiParameter(
+                name="search",
+                type=OpenApiTypes.STR,
+                description=(
+                    "Fuzzy search by astronomy show title, "
+                    "ordered by relevance (ex. ?search=text)"
+                )
+            ),
+            OpenApiParameter(
+                name="format",
+                type=OpenApiTypes.STR,
+                enum=["json", "msgpack", "normalized"],
+                description=(
+                    "normalized: sessions reference show, dome "
+                    "and speakers by id, they are sent once "
+                    "in included (ex. ?format=normalized)"
+                )
+            )
+        ],
+        # Rows are built by projection serializer with the same output
+        responses=ShowSessionListSerializer(many=True)
     )
     def list(self, request, *args, **kwargs):
         """Added filter by date and show title"""
         return super().list(request, *args, **kwargs)
 
+    @action(
+        methods=["get"],
+        detail=True,
+        url_path="seat_map",
+    )
+    def seat_map(self, request, pk=None):
+        """
+        Function to get taken and free seats of show session
+        as packed bitmap with its version
+        """
+        show_session = self.get_object()
+        seat_map, version = build_seat_map(show_session)
+
+        serializer = self.get_serializer(
+            self.seat_map_data(show_session, seat_map, version)
+        )
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @staticmethod
+    def seat_map_data(show_session, seat_map, version):
+        return {
+            "show_session": show_session.id,
+            "rows": seat_map.rows,
+            "seats_in_row": seat_map.seats_in_row,
+            "capacity": seat_map.capacity,
+            "taken": seat_map.taken,
+            "held": seat_map.held,
+            "available": seat_map.available,
+            "version": version,
+            "bitmap": seat_map.to_base64(),
+        }
 
-class ShowSpeakerViewSet(viewsets.ModelViewSet):
+    @action(
+        methods=["post"],
+        detail=True,
+        url_path="hold",
+    )
+    def hold(self, request, pk=None):
+        """
+        Function to hold seats of show session during checkout,
+        returned hold is given instead of tickets to create reservation
+        """
+        show_session = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        hold = hold_seats(
+            show_session,
+            [
+                (seat["row"], seat["seat"])
+                for seat in serializer.validated_data["seats"]
+            ],
+            request.user
+        )
+        return Response(
+            self.get_serializer(self.hold_data(hold)).data,
+            status=status.HTTP_201_CREATED
+        )
+
+    @action(
+        methods=["delete"],
+        detail=True,
+        url_path=r"hold/(?P<token>[0-9a-f]+)",
+    )
+    def release_hold(self, request, pk=None, token=None):
+        """Function to release held seats before hold is expired"""
+        hold = get_hold(token)
+        if (
+                hold is None
+                or hold["show_session"] != int(pk)
+                or hold["user"] != request.user.id
+        ):
+            raise NotFound("Hold is expired or not found.")
+
+        release_hold(hold)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @staticmethod
+    def hold_data(hold):
+        return {
+            "hold": hold["hold"],
+            "show_session": hold["show_session"],
+            "seats": [
+                {"row": row, "seat": seat} for row, seat in hold["seats"]
+            ],
+            "expires_at": datetime.fromtimestamp(
+                hold["expires_at"], tz=timezone.utc
+            ),
+        }
+
+    @action(
+        methods=["post"],
+        detail=False,
+        url_path="import",
+        parser_classes=[MultiPartParser],
+    )
+    def import_sessions(self, request):
+        """
+        Function to import show sessions from uploaded CSV or JSON Lines
+        file, valid rows are created and the others are reported
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        file = serializer.validated_data["file"]
+
+        try:
+            file_format = get_format(
+                file.name, serializer.validated_data.get("file_format")
+            )
+        except ValueError as error:
+            raise ValidationError({"file_format": [str(error)]})
+
+        report = import_show_sessions(file, file_format)
+        return Response(
+            self.get_serializer(report).data,
+            status=(
+                status.HTTP_400_BAD_REQUEST
+                if report["failed"] and not report["created"]
+                else status.HTTP_201_CREATED
+            )
+        )
+
+
+class ShowSpeakerViewSet(
+    CachedResponseMixin,
+    ServerTimingMixin,
+    viewsets.ModelViewSet
+):
     queryset = ShowSpeaker.objects.all()
     serializer_class = ShowSpeakerSerializer
+    cache_dependencies = (ShowSpeaker,)
 
     def get_serializer_class(self):
         """Function to choose correct serializer"""
@@ -239,7 +595,7 @@ class ShowSpeakerViewSet(viewsets.ModelViewSet):
         Get correct queryset to avoid N+1 problem
         and filter it by first/last name and profession
         """
-        queryset = self.queryset
+        queryset = self.queryset.all()
 
         first_name = self.request.query_params.get("first_name")
         last_name = self.request.query_params.get("last_name")
@@ -254,6 +610,11 @@ class ShowSpeakerViewSet(viewsets.ModelViewSet):
         if profession:
             queryset = queryset.filter(profession__icontains=profession)
 
+        text = self.request.query_params.get("search")
+
+        if text:
+            queryset = search(queryset, text)
+
         return queryset
 
     @extend_schema(
@@ -279,6 +640,14 @@ class ShowSpeakerViewSet(viewsets.ModelViewSet):
                     "Filter by speaker profession (ex. ?profession=profession)"
                 )
             ),
+            OpenApiParameter(
+                name="search",
+                type=OpenApiTypes.STR,
+                description=(
+                    "Fuzzy search by first/last name and profession, "
+                    "ordered by relevance (ex. ?search=text)"
+                )
+            ),
         ]
     )
     def list(self, request, *args, **kwargs):
@@ -286,17 +655,22 @@ class ShowSpeakerViewSet(viewsets.ModelViewSet):
         return super().list(request, *args, **kwargs)
 
 
-class TicketSerializerViewSet(viewsets.ModelViewSet):
+class TicketSerializerViewSet(ServerTimingMixin, viewsets.ModelViewSet):
     queryset = Ticket.objects.all().select_related()
     serializer_class = TicketSerializer
 
 
-class ReservationPagination(PageNumberPagination):
+class ReservationPagination(PageNumberOrKeysetPagination):
     page_size = 10
     max_page_size = 30
+    keyset_ordering = ("-created_at", "id")
 
 
-class ReservationViewSet(viewsets.ModelViewSet):
+class ReservationViewSet(
+    ListProjectionMixin,
+    ServerTimingMixin,
+    viewsets.ModelViewSet
+):
     queryset = Reservation.objects.all()
     serializer_class = ReservationSerializer
     pagination_class = ReservationPagination
@@ -310,7 +684,17 @@ class ReservationViewSet(viewsets.ModelViewSet):
                     "Filter by astronomy_show_title (ex. ?show_title=title)"
                 ),
             ),
-        ]
+            OpenApiParameter(
+                name="search",
+                type=OpenApiTypes.STR,
+                description=(
+                    "Fuzzy search by astronomy show title, "
+                    "ordered by relevance (ex. ?search=text)"
+                )
+            )
+        ],
+        # Rows are built by projection serializer with the same output
+        responses=ReservationListSerializer(many=True)
     )
     def list(self, request, *args, **kwargs):
         """Added filter by show title"""
@@ -321,44 +705,94 @@ class ReservationViewSet(viewsets.ModelViewSet):
         serializer_class = self.serializer_class
         if self.action == "list":
             serializer_class = ReservationListSerializer
+            if uses_list_projections():
+                serializer_class = ReservationListProjectionSerializer
         if self.action == "retrieve":
             serializer_class = ReservationDetailSerializer
+        if self.action == "export":
+            serializer_class = ReservationExportSerializer
         return serializer_class
 
     def get_queryset(self):
         """
         Get correct queryset to avoid N+1 problem
-        and filter it by show title
+        and filter it by show title, show session is stored
+        on reservation, so it's joined instead of found by tickets
         """
         queryset = (
-            self.queryset.select_related("user")
-            .prefetch_related(
-                Prefetch(
-                    "tickets",
-                    queryset=Ticket.objects.select_related(
-                        "show_session",
-                        "show_session__astronomy_show",
-                        "show_session__planetarium_dome"
-                    )
-                )
+            self.queryset.select_related(
+                "user", "show_session__astronomy_show"
             )
+            .prefetch_related("tickets")
         )
 
+        if self.action == "retrieve":
+            queryset = queryset.prefetch_related(
+                "show_session__show_speakers"
+            )
+
         show_title = self.request.query_params.get("show_title")
 
         if show_title:
             queryset = queryset.filter(
-                tickets__show_session__astronomy_show__title__icontains=show_title
+                show_session__astronomy_show__title__icontains=show_title
             )
 
-        return queryset
+        text = self.request.query_params.get("search")
+
+        if text:
+            queryset = queryset.filter(
+                show_session__astronomy_show__in=(
+                    search_astronomy_shows(text)
+                )
+            )
+
+        return self.project_for_list(queryset)
+
+    @extend_schema(
+        parameters=[ReservationExportSerializer],
+        responses={
+            (200, content_type): OpenApiTypes.BINARY
+            for content_type in CONTENT_TYPES.values()
+        }
+    )
+    @action(
+        methods=["get"],
+        detail=False,
+        permission_classes=[IsAdminUser],
+        pagination_class=None,
+    )
+    def export(self, request):
+        """
+        Function to stream all tickets of reservations as CSV
+        or JSON Lines file, filtered by dates of reservations and show
+        """
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        filters = dict(serializer.validated_data)
+        file_format = filters.pop("file_format")
+
+        response = StreamingHttpResponse(
+            export_reservations(file_format, **filters),
+            content_type=CONTENT_TYPES[file_format]
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="reservations.{file_format}"'
+        )
+        return response
 
 
-class AstronomyShowViewSet(viewsets.ModelViewSet):
+class AstronomyShowViewSet(
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    ServerTimingMixin,
+    viewsets.ModelViewSet
+):
     queryset = (AstronomyShow.objects.prefetch_related(
         "show_themes"
     ))
     serializer_class = AstronomyShowListSerializer
+    cache_dependencies = version_dependencies = (AstronomyShow, ShowTheme)
 
     def get_serializer_class(self):
         """Function to choose correct serializer"""
@@ -376,13 +810,17 @@ class AstronomyShowViewSet(viewsets.ModelViewSet):
         Get correct queryset to avoid N+1 problem
         and filter it by title
         """
-        queryset = self.queryset
+        queryset = self.queryset.all()
 
         title = self.request.query_params.get("title")
+        text = self.request.query_params.get("search")
 
         if title:
             queryset = queryset.filter(title__icontains=title)
 
+        if text:
+            queryset = search(queryset, text)
+
         return queryset
 
     @action(
@@ -391,12 +829,17 @@ class AstronomyShowViewSet(viewsets.ModelViewSet):
         url_path="upload-poster",
     )
     def upload_poster(self, request, pk=None):
-        """Function for uploading poster to astronomy show"""
+        """
+        Function for uploading poster to astronomy show,
+        its variants are created in background after response
+        """
         astronomy_show = self.get_object()
+        old_poster_variants = astronomy_show.poster_variants
         serializer = self.get_serializer(astronomy_show, data=request.data)
 
         if serializer.is_valid():
-            serializer.save()
+            astronomy_show = serializer.save(poster_variants=None)
+            schedule_poster_processing(astronomy_show, old_poster_variants)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -409,9 +852,73 @@ class AstronomyShowViewSet(viewsets.ModelViewSet):
                 description=(
                     "Filter by astronomy show title (ex. ?title=title)"
                 )
+            ),
+            OpenApiParameter(
+                name="search",
+                type=OpenApiTypes.STR,
+                description=(
+                    "Fuzzy search by title, "
+                    "ordered by relevance (ex. ?search=text)"
+                )
             )
         ]
     )
     def list(self, request, *args, **kwargs):
         """Added filter by title"""
         return super().list(request, *args, **kwargs)
+
+
+class SearchViewSet(viewsets.ViewSet):
+
+    """Unified search over astronomy shows, show speakers and themes"""
+
+    results_limit = 10
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="q",
+                type=OpenApiTypes.STR,
+                required=True,
+                description=(
+                    "Text to search, typos are tolerated (ex. ?q=text)"
+                )
+            )
+        ]
+    )
+    def list(self, request):
+        """Function to find best matches of every kind ordered by relevance"""
+        text = request.query_params.get("q", "")
+        if not text.strip():
+            raise ValidationError({"q": "This query parameter is required."})
+
+        limit = self.results_limit
+        astronomy_shows = search(
+            AstronomyShow.objects.prefetch_related("show_themes"), text
+        )[:limit]
+        show_speakers = search(ShowSpeaker.objects.all(), text)[:limit]
+        show_themes = search(ShowTheme.objects.all(), text)[:limit]
+
+        with timed_serialization():
+            data = {
+                "astronomy_shows": AstronomyShowSerializer(
+                    astronomy_shows, many=True, context={"request": request}
+                ).data,
+                "show_speakers": ShowSpeakerSerializer(
+                    show_speakers, many=True
+                ).data,
+                "show_themes": ShowThemeSerializer(
+                    show_themes, many=True
+                ).data,
+            }
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class CacheStatsView(APIView):
+
+    """Hit and miss counters of catalog response cache"""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(get_stats(), status=status.HTTP_200_OK)
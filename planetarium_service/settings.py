@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "planetarium",
     "user",
     "rest_framework",
@@ -49,6 +50,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "planetarium.timing.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -74,8 +76,19 @@ REST_FRAMEWORK = {
     ],
     "DEFAULT_THROTTLE_RATES": {"anon": "10/day", "user": "30/day"},
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
     ),
+    "DEFAULT_RENDERER_CLASSES": [
+        "planetarium.renderers.FastJSONRenderer",
+        "planetarium.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "rest_framework.parsers.JSONParser",
+        "planetarium.renderers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 SPECTACULAR_SETTINGS = {
@@ -126,6 +139,65 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Shared Redis cache when REDIS_URL is set, otherwise memory of process
+
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Time in seconds for which catalog responses are cached
+PLANETARIUM_CACHE_TIMEOUT = 300
+
+# Number of background threads which create variants of uploaded posters
+PLANETARIUM_POSTER_WORKERS = 2
+
+# Time for which seats are held during checkout
+PLANETARIUM_SEAT_HOLD_MINUTES = 10
+
+# List actions of show sessions and reservations build rows from
+# values() projections instead of model serializers, output is the same
+PLANETARIUM_LIST_PROJECTIONS = True
+
+# Time in seconds for which users of JWT requests are cached,
+# saving user invalidates its cache right away
+PLANETARIUM_USER_CACHE_TIMEOUT = 60
+
+# Server-Timing header with SQL, serialization and view time is sent
+# to staff and to this part of requests, averages by viewset action
+# are logged every PLANETARIUM_SERVER_TIMING_LOG_INTERVAL seconds
+PLANETARIUM_SERVER_TIMING = True
+PLANETARIUM_SERVER_TIMING_SAMPLE_RATE = 0.01
+PLANETARIUM_SERVER_TIMING_LOG_INTERVAL = 60
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+        },
+    },
+    "loggers": {
+        "planetarium.timing": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
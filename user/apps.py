@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class UserConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'user'
+
+    def ready(self):
+        from user.authentication import connect_user_signals
+        # Registers OpenAPI security scheme of cached JWT authentication
+        import user.schema  # noqa: F401
+
+        connect_user_signals(self.get_model("User"))
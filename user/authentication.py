@@ -0,0 +1,94 @@
+"""
+JWT authentication which reads users from cache.
+
+Token already identifies the user, so the user is read from Django
+cache under key with user id and version of the user
+(see planetarium.versions), the database is read only on cache miss.
+Saving or deleting the user (ManageUserView, admin, changes
+of is_active or is_staff) bumps the version, so the next request reads
+the user from the database. Changes made with QuerySet.update() don't
+send signals, they are seen after PLANETARIUM_USER_CACHE_TIMEOUT.
+
+Password hash is never put to the shared cache, users read from cache
+have it deferred, so it's read from database only when it's used, and
+saving such a user doesn't overwrite it.
+"""
+
+from django.conf import settings
+from django.db import router
+from django.db.models.signals import post_delete, post_save
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from planetarium.versions import (
+    KEY_PREFIX,
+    get_cache,
+    get_versions,
+    invalidate,
+    object_key
+)
+
+USER_KEY_PREFIX = "user:authentication"
+
+
+def get_timeout():
+    return getattr(settings, "PLANETARIUM_USER_CACHE_TIMEOUT", 60)
+
+
+def dump_user(user):
+    """Function to return values of user fields except password hash"""
+    return {
+        field.attname: getattr(user, field.attname)
+        for field in user._meta.concrete_fields
+        if field.attname != "password"
+    }
+
+
+def load_user(user_model, values):
+    """Function to build user with deferred password hash from values"""
+    return user_model.from_db(
+        router.db_for_read(user_model),
+        list(values),
+        list(values.values())
+    )
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+
+    """JWT authentication which reads users from cache"""
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        # Tokens revoked by password change are checked against database
+        if user_id is None or api_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)
+
+        # Version is read before user, so user read from database
+        # before its change is cached under the old version
+        version = get_versions([object_key(self.user_model, user_id)])[0]
+        key = f"{USER_KEY_PREFIX}:{user_id}:{version}"
+
+        cache = get_cache()
+        values = cache.get(key)
+        if values is not None:
+            return load_user(self.user_model, values)
+
+        # Users which aren't found or inactive aren't cached
+        user = super().get_user(validated_token)
+        cache.set(key, dump_user(user), get_timeout())
+        return user
+
+
+def connect_user_signals(user_model):
+    """Function to bump version of user when it's saved or deleted"""
+
+    def invalidate_user(sender, instance, **kwargs):
+        invalidate(sender, instance.pk)
+
+    for signal in (post_save, post_delete):
+        signal.connect(
+            invalidate_user,
+            sender=user_model,
+            weak=False,
+            dispatch_uid=f"{KEY_PREFIX}:{user_model._meta.label_lower}"
+        )
@@ -0,0 +1,10 @@
+"""OpenAPI extensions of user app, loaded by drf-spectacular on ready"""
+
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+
+    """The same jwtAuth security scheme as of simplejwt authentication"""
+
+    target_class = "user.authentication.CachedJWTAuthentication"